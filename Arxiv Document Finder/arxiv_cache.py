@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+import arxiv
+
+from common.llm_cache import DiskLRUStore
+
+# Boolean operators of the arXiv query syntax; they are case-sensitive, unlike search terms.
+QUERY_OPERATORS = ('AND', 'OR', 'ANDNOT')
+
+
+def normalize_query(query):
+    """Collapses whitespace and lowercases search terms, so trivially different spellings share a cache entry."""
+    return ' '.join(word if word in QUERY_OPERATORS else word.lower() for word in query.split())
+
+
+def paper_record(result):
+    """Converts an arxiv.Result to the JSON-compatible dict the agents receive."""
+    return {
+        "title": result.title,
+        "authors": [a.name for a in result.authors],
+        "published": result.published.strftime("%Y-%m-%d"),
+        "summary": result.summary,
+        "pdf_url": result.pdf_url,
+    }
+
+
+class JSONDiskStore(DiskLRUStore):
+    """A DiskLRUStore for plain JSON values such as lists of paper records."""
+
+    def _dump(self, value):
+        return value
+
+    def _load(self, data):
+        return data
+
+
+class ArxivSearchCache:
+    """
+    Runs arXiv searches through one shared client and caches their results.
+
+    The shared client keeps its HTTP session and spaces its requests by its `delay_seconds`, as the arXiv terms
+    of use ask; it is not thread-safe, so searches that reach it run one at a time. Results are cached by
+    normalized query, `max_results` and sort order. Concurrent identical searches are coalesced: the first one
+    queries arXiv and the others wait for its result instead of sending their own request.
+
+    Failed searches are not cached; every caller waiting on one gets its exception. A search whose results
+    cannot be indexed or stored still returns them, and so do the callers waiting on it.
+
+    With a paper `index`, relevance-sorted searches are answered from it first when it holds at least
+    `max_results` matching papers, and every paper fetched from arXiv is added to it. Date-sorted searches
+    always go to arXiv, since the newest papers are the ones the index is least likely to hold.
+
+    Args:
+        store (CacheStore | None): Where results are kept, usually a JSONDiskStore with a TTL. None only
+            coalesces concurrent searches.
+        client (arxiv.Client | None): The client to share. Defaults to a new arxiv.Client().
+        index (PaperIndex | None): Local paper index to answer from and grow. None disables it.
+    """
+
+    def __init__(self, store=None, client=None, index=None):
+        self.store = store
+        self.client = client or arxiv.Client()
+        self.index = index
+        self._lock = threading.Lock()
+        self._client_lock = threading.Lock()
+        self._pending = {}
+
+    @staticmethod
+    def _key(query, max_results, sort_by, sort_order):
+        parts = [normalize_query(query), max_results, sort_by.value, sort_order.value]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def _fetch(self, query, max_results, sort_by, sort_order):
+        search = arxiv.Search(query=query, max_results=max_results, sort_by=sort_by, sort_order=sort_order)
+        with self._client_lock:
+            return [paper_record(result) for result in self.client.results(search)]
+
+    def search(self, query, max_results=5, sort_by=arxiv.SortCriterion.Relevance,
+               sort_order=arxiv.SortOrder.Descending):
+        """
+        Returns the papers matching `query`, from the local index or the cache when they can answer it.
+
+        Args:
+            query (str): arXiv query.
+            max_results (int): Number of papers to return at most.
+            sort_by (arxiv.SortCriterion | str): Sort criterion, e.g. 'relevance' or 'submittedDate'.
+            sort_order (arxiv.SortOrder | str): 'descending' or 'ascending'.
+
+        Returns:
+            list[dict]: Paper records with title, authors, published, summary and pdf_url.
+
+        Raises:
+            ValueError: If the sort criterion or order is unknown.
+        """
+        sort_by, sort_order = arxiv.SortCriterion(sort_by), arxiv.SortOrder(sort_order)
+        if self.index is not None and sort_by == arxiv.SortCriterion.Relevance:
+            papers = self.index.search(query, max_results)
+            if papers is not None and len(papers) >= max_results:
+                return papers
+        key = self._key(query, max_results, sort_by, sort_order)
+        with self._lock:
+            papers = self.store.get(key) if self.store is not None else None
+            if papers is not None:
+                return papers
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            papers = self._fetch(query, max_results, sort_by, sort_order)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        try:
+            if self.index is not None:
+                self.index.add(papers)
+            # Stored before the search stops being pending, so no caller can miss both
+            with self._lock:
+                if self.store is not None:
+                    self.store.set(key, papers)
+        except Exception as e:
+            print(f"Failed to keep arXiv results: {e}")
+        finally:
+            with self._lock:
+                del self._pending[key]
+            future.set_result(papers)
+        return papers
@@ -1,73 +1,69 @@
 import streamlit as st
 import asyncio
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
+import atexit
+import threading
+import sys
+from pathlib import Path
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 import os
-import arxiv
 from typing import List, Dict
-from datetime import datetime
+# The repository root holds the common/ modules shared with the other projects
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.llm_cache import DiskLRUStore, RecordReplayChatCompletionCache
+from arxiv_cache import ArxivSearchCache, JSONDiskStore
+from paper_index import PaperIndex
+from review_team import get_review_team
+
+@st.cache_resource
+def get_event_loop():
+    """Return a background event loop shared by every rerun and session."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_openai_brain():
+    """Return the process-wide OpenAI client; its connections are reused across reviews and closed at exit."""
+    client = OpenAIChatCompletionClient(
+        model='gpt-4o',
+        api_key=os.getenv('OPENAI_API_KEY') or 'replay'
+    )
+    # Optionally record responses to disk or replay them offline (LLM_CACHE_MODE=record|replay)
+    cache_mode = os.getenv('LLM_CACHE_MODE', 'off')
+    if cache_mode != 'off':
+        client = RecordReplayChatCompletionCache(
+            client, DiskLRUStore(os.getenv('LLM_CACHE_DIR', '.llm_cache')), mode=cache_mode
+        )
+    atexit.register(lambda: asyncio.run_coroutine_threadsafe(client.close(), get_event_loop()).result(timeout=5))
+    return client
 
 # Initialize OpenAI client
-openai_brain = OpenAIChatCompletionClient(
-    model='gpt-4o',
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+openai_brain = get_openai_brain()
+
+@st.cache_resource
+def get_arxiv_search_cache():
+    """Return the process-wide arXiv search cache; every search shares its client, results and in-flight requests."""
+    # Results are kept on disk for ARXIV_CACHE_TTL seconds (ARXIV_CACHE_DIR=off keeps nothing)
+    cache_dir = os.getenv('ARXIV_CACHE_DIR', '.arxiv_cache')
+    store = None
+    if cache_dir != 'off':
+        store = JSONDiskStore(cache_dir, max_entries=1000, ttl_seconds=float(os.getenv('ARXIV_CACHE_TTL', '86400')))
+    # Fetched papers build up a local full-text index that answers later searches first (ARXIV_INDEX_PATH=off disables it)
+    index_path = os.getenv('ARXIV_INDEX_PATH', '.arxiv_index.db')
+    index = PaperIndex(index_path) if index_path != 'off' else None
+    if index is not None:
+        atexit.register(index.close)
+    return ArxivSearchCache(store, index=index)
 
-def arxiv_search(query: str, max_results: int = 5) -> List[Dict]:
-    """Return a list of arXiv papers matching the query."""
+def arxiv_search(query: str, max_results: int = 5, sort_by: str = "relevance") -> List[Dict]:
+    """Return a list of arXiv papers matching the query, sorted by 'relevance', 'submittedDate' or 'lastUpdatedDate'."""
     try:
-        client = arxiv.Client()
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance,
-        )
-        papers = []
-        for result in client.results(search):
-            papers.append({
-                "title": result.title,
-                "authors": [a.name for a in result.authors],
-                "published": result.published.strftime("%Y-%m-%d"),
-                "summary": result.summary,
-                "pdf_url": result.pdf_url,
-            })
-        return papers
+        return get_arxiv_search_cache().search(query, max_results, sort_by)
     except Exception as e:
         return [{"error": f"arXiv search failed: {str(e)}"}]
 
-# Configure agents
-arxiv_researcher_agent = AssistantAgent(
-    name='arxiv_search_agent',
-    description='Creates arXiv queries and retrieves candidate papers',
-    model_client=openai_brain,
-    tools=[arxiv_search],
-    system_message=(
-        "Given a user topic, craft an optimal arXiv query. When the tool "
-        "returns results, select exactly the number of papers requested and "
-        "pass them as concise JSON to the summarizer."
-    ),
-)
-
-summarizer_agent = AssistantAgent(
-    name='summarizer_agent',
-    description='Summarizes research papers',
-    model_client=openai_brain,
-    system_message=(
-        "You are an expert researcher. When you receive a JSON list of papers, "
-        "write a literature review in Markdown:\n"
-        "1. Start with a 2–3 sentence introduction of the topic.\n"
-        "2. Include one bullet per paper with: title (as Markdown link), "
-        "authors, specific problem tackled, and key contribution.\n"
-        "3. End with a single-sentence takeaway."
-    ),
-)
-
 # Set up team
-team = RoundRobinGroupChat(
-    participants=[arxiv_researcher_agent, summarizer_agent],
-    max_turns=2
-)
+team = get_review_team(openai_brain, arxiv_search)
 
 # Streamlit app
 st.title("arXiv Literature Review Generator")
@@ -93,15 +89,17 @@ def main():
         if not topic.strip():
             st.error("Please enter a valid research topic.")
             return
-        if not os.getenv('OPENAI_API_KEY'):
+        if not os.getenv('OPENAI_API_KEY') and os.getenv('LLM_CACHE_MODE') != 'replay':
             st.error("OPENAI_API_KEY environment variable not set.")
             return
         
         with result_container:
             with st.spinner("Generating literature review..."):
                 try:
-                    # Run the async task in Streamlit
-                    result = asyncio.run(run_search(topic, num_papers))
+                    # Run on the shared loop so the cached client keeps its connections
+                    result = asyncio.run_coroutine_threadsafe(
+                        run_search(topic, num_papers), get_event_loop()
+                    ).result()
                     st.markdown(result)
                 except Exception as e:
                     st.error(f"Error generating review: {str(e)}")
@@ -0,0 +1,140 @@
+import json
+import re
+import sqlite3
+import threading
+
+# arXiv field prefixes the index can answer, mapped to its columns; 'all' searches every column.
+FIELDS = {'ti': 'title', 'au': 'authors', 'abs': 'summary', 'all': None}
+# arXiv boolean operators and their FTS5 equivalents.
+OPERATORS = {'AND': 'AND', 'OR': 'OR', 'ANDNOT': 'NOT'}
+# Relevance weights of the title, authors and summary columns; a match in the title counts most.
+COLUMN_WEIGHTS = (5.0, 1.0, 1.0)
+
+TOKEN = re.compile(r'\w+:"[^"]*"|"[^"]*"|[()]|[^\s()"]+')
+WORD = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    pdf_url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    published TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(title, authors, summary);
+"""
+
+
+def _phrase(text):
+    # Quoted words only, so nothing in the user's query is read as FTS5 syntax
+    words = WORD.findall(text)
+    return '"' + ' '.join(words) + '"' if words else None
+
+
+def to_match_query(query):
+    """
+    Translates an arXiv query (e.g. 'ti:"multi agent" AND abs:planning') to an FTS5 MATCH expression.
+
+    Search terms and quoted phrases become FTS5 phrases, the ti:, au:, abs: and all: prefixes select columns,
+    AND, OR and ANDNOT become AND, OR and NOT, and parentheses are kept. Adjacent terms must all match.
+
+    Returns:
+        str | None: The MATCH expression, or None when the query uses anything the index cannot answer,
+            such as a cat: or id: prefix.
+    """
+    parts = []
+    for token in TOKEN.findall(query):
+        if token in ('(', ')'):
+            parts.append(token)
+            continue
+        if token in OPERATORS:
+            parts.append(OPERATORS[token])
+            continue
+        column = None
+        prefix, colon, rest = token.partition(':')
+        if colon and not token.startswith('"'):
+            if prefix not in FIELDS or not rest:
+                return None
+            column, token = FIELDS[prefix], rest
+        phrase = _phrase(token)
+        if phrase is not None:
+            parts.append(f'{column}:{phrase}' if column else phrase)
+    return ' '.join(parts) or None
+
+
+class PaperIndex:
+    """
+    Local SQLite store of arXiv papers with an FTS5 index over their title, authors and summary.
+
+    Papers are keyed by pdf_url, so adding a paper again updates it. One connection is shared by all threads
+    and serialized with a lock.
+
+    Args:
+        path (str | Path): Database file; ':memory:' keeps the index in memory.
+    """
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM papers').fetchone()[0]
+
+    def add(self, papers):
+        """
+        Stores paper records (title, authors, published, summary, pdf_url) and indexes them.
+
+        Args:
+            papers (list[dict]): Records as returned by arxiv_search.
+        """
+        with self._lock, self._connection:
+            for paper in papers:
+                row = (paper['title'], json.dumps(paper['authors']), paper['published'], paper['summary'])
+                paper_id = self._connection.execute(
+                    'INSERT INTO papers (pdf_url, title, authors, published, summary) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (pdf_url) DO UPDATE SET title = excluded.title, authors = excluded.authors, '
+                    'published = excluded.published, summary = excluded.summary RETURNING id',
+                    (paper['pdf_url'], *row),
+                ).fetchone()[0]
+                self._connection.execute('DELETE FROM papers_fts WHERE rowid = ?', (paper_id,))
+                self._connection.execute(
+                    'INSERT INTO papers_fts (rowid, title, authors, summary) VALUES (?, ?, ?, ?)',
+                    (paper_id, paper['title'], ', '.join(paper['authors']), paper['summary']),
+                )
+
+    def search(self, query, limit):
+        """
+        Returns the indexed papers matching an arXiv query, best BM25 match first.
+
+        Returns:
+            list[dict] | None: Up to `limit` paper records, or None when the query cannot be answered locally.
+        """
+        match = to_match_query(query)
+        if match is None:
+            return None
+        with self._lock:
+            try:
+                rows = self._connection.execute(
+                    'SELECT p.title, p.authors, p.published, p.summary, p.pdf_url '
+                    'FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid '
+                    'WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts, ?, ?, ?) LIMIT ?',
+                    (match, *COLUMN_WEIGHTS, limit),
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # A query that translates to invalid FTS5 syntax, e.g. a dangling operator
+                return None
+        return [
+            {"title": title, "authors": json.loads(authors), "published": published, "summary": summary,
+             "pdf_url": pdf_url}
+            for title, authors, published, summary, pdf_url in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
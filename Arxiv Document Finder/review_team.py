@@ -0,0 +1,47 @@
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+
+def get_review_team(model_client, search_tool):
+    """
+    Returns the literature review team: an arXiv researcher that queries arXiv with `search_tool` and passes
+    the chosen papers to a summarizer, which writes the review. Kept free of Streamlit so the team can be built
+    outside the app, e.g. by the benchmarks.
+
+    Args:
+        model_client (ChatCompletionClient): Client used by both agents.
+        search_tool (Callable | BaseTool): The arXiv search tool, usually `arxiv_search`.
+
+    Returns:
+        RoundRobinGroupChat: The researcher and the summarizer, one turn each.
+    """
+    arxiv_researcher_agent = AssistantAgent(
+        name='arxiv_search_agent',
+        description='Creates arXiv queries and retrieves candidate papers',
+        model_client=model_client,
+        tools=[search_tool],
+        system_message=(
+            "Given a user topic, craft an optimal arXiv query. When the tool "
+            "returns results, select exactly the number of papers requested and "
+            "pass them as concise JSON to the summarizer."
+        ),
+    )
+
+    summarizer_agent = AssistantAgent(
+        name='summarizer_agent',
+        description='Summarizes research papers',
+        model_client=model_client,
+        system_message=(
+            "You are an expert researcher. When you receive a JSON list of papers, "
+            "write a literature review in Markdown:\n"
+            "1. Start with a 2–3 sentence introduction of the topic.\n"
+            "2. Include one bullet per paper with: title (as Markdown link), "
+            "authors, specific problem tackled, and key contribution.\n"
+            "3. End with a single-sentence takeaway."
+        ),
+    )
+
+    return RoundRobinGroupChat(
+        participants=[arxiv_researcher_agent, summarizer_agent],
+        max_turns=2
+    )
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules import each other as top-level modules, and the shared ones from the repository root
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(PROJECT_DIR), str(PROJECT_DIR.parent)]
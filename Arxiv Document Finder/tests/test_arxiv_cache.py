@@ -0,0 +1,190 @@
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from arxiv_cache import ArxivSearchCache, JSONDiskStore
+from paper_index import PaperIndex, to_match_query
+
+
+def paper(number, title, summary='A study of cooperating agents.'):
+    return {
+        "title": title,
+        "authors": ["Ada Lovelace", "Alan Turing"],
+        "published": "2026-01-0%d" % number,
+        "summary": summary,
+        "pdf_url": f"http://arxiv.org/pdf/2601.0000{number}",
+    }
+
+
+def arxiv_result(record):
+    # The attributes of arxiv.Result that paper_record reads
+    return SimpleNamespace(
+        title=record["title"],
+        authors=[SimpleNamespace(name=name) for name in record["authors"]],
+        published=datetime.strptime(record["published"], "%Y-%m-%d"),
+        summary=record["summary"],
+        pdf_url=record["pdf_url"],
+    )
+
+
+class FakeClient:
+    """Stands in for arxiv.Client and records the queries that reached it."""
+
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def results(self, search):
+        self.queries.append(search.query)
+        return [arxiv_result(record) for record in self.records[:search.max_results]]
+
+
+class BlockingClient(FakeClient):
+    """A FakeClient whose requests wait for `release`, so other searches can arrive while one is in flight."""
+
+    def __init__(self, records):
+        super().__init__(records)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def results(self, search):
+        self.entered.set()
+        assert self.release.wait(timeout=5)
+        return super().results(search)
+
+
+class WatchedStore(dict):
+    """An in-memory store that signals `second_lookup` once two searches have looked a key up."""
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+        self.second_lookup = threading.Event()
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        if self.lookups == 2:
+            self.second_lookup.set()
+        return super().get(key, default)
+
+    def set(self, key, value):
+        self[key] = value
+
+
+class FailingIndex(PaperIndex):
+    def add(self, papers):
+        raise RuntimeError("disk full")
+
+
+@pytest.fixture
+def index():
+    index = PaperIndex(':memory:')
+    index.add([
+        paper(1, "Multi agent planning with language models"),
+        paper(2, "Agents that write code", summary="Planning and code execution by agents."),
+        paper(3, "A survey of graph neural networks", summary="Message passing on graphs."),
+    ])
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('ti:"multi agent" AND abs:planning', 'title:"multi agent" AND summary:"planning"'),
+    ('au:Turing ANDNOT (ti:survey OR ti:review)', 'authors:"Turing" NOT ( title:"survey" OR title:"review" )'),
+    ('LLM-based agents', '"LLM based" "agents"'),
+    ('all:graphs', '"graphs"'),
+    ('cat:cs.AI', None),
+    ('id:2601.00001', None),
+    ('ti:', None),
+    ('', None),
+])
+def test_to_match_query(query, expected):
+    assert to_match_query(query) == expected
+
+
+def test_index_answers_fielded_and_boolean_queries(index):
+    titles = [p["title"] for p in index.search('ti:agents OR ti:agent', 5)]
+    assert sorted(titles) == ["Agents that write code", "Multi agent planning with language models"]
+    assert [p["title"] for p in index.search('ti:planning ANDNOT abs:code', 5)] == [
+        "Multi agent planning with language models"]
+    assert index.search('cat:cs.AI', 5) is None
+
+
+def test_search_is_answered_from_the_index_when_it_holds_enough_papers(index):
+    client = FakeClient([])
+    cache = ArxivSearchCache(client=client, index=index)
+    papers = cache.search('planning', max_results=2)
+    assert {p["title"] for p in papers} == {"Multi agent planning with language models", "Agents that write code"}
+    assert client.queries == []
+
+
+def test_search_goes_to_arxiv_when_the_index_holds_too_few_papers(index):
+    fetched = [paper(4, "Planning for robot swarms"), paper(5, "Planning under uncertainty")]
+    client = FakeClient(fetched)
+    cache = ArxivSearchCache(client=client, index=index)
+    assert cache.search('planning', max_results=5) == fetched
+    assert client.queries == ['planning']
+    # The fetched papers were indexed for later searches
+    assert len(index) == 5
+    assert [p["title"] for p in index.search('swarms', 5)] == ["Planning for robot swarms"]
+
+
+def test_date_sorted_search_always_goes_to_arxiv(index):
+    client = FakeClient([paper(4, "Planning for robot swarms")])
+    cache = ArxivSearchCache(client=client, index=index)
+    cache.search('planning', max_results=1, sort_by='submittedDate')
+    assert client.queries == ['planning']
+
+
+def test_failing_index_does_not_leave_the_search_pending():
+    client = FakeClient([paper(1, "Multi agent planning with language models")])
+    index = FailingIndex(':memory:')
+    cache = ArxivSearchCache(client=client, index=index)
+    assert cache.search('agents', max_results=1)[0]["title"] == "Multi agent planning with language models"
+    assert cache._pending == {}
+
+    # Before the fix an identical search waited forever on the abandoned request
+    results = []
+    thread = threading.Thread(target=lambda: results.append(cache.search('agents', max_results=1)), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert len(results) == 1 and client.queries == ['agents', 'agents']
+    index.close()
+
+
+def test_concurrent_identical_searches_send_one_request():
+    client = BlockingClient([paper(1, "Multi agent planning with language models")])
+    store = WatchedStore()
+    cache = ArxivSearchCache(store=store, client=client)
+    results = []
+
+    def search():
+        results.append(cache.search('Agents', max_results=1))
+
+    first = threading.Thread(target=search, daemon=True)
+    first.start()
+    assert client.entered.wait(timeout=5)
+    # The second search looks the key up while the first one's request is in flight, and waits for it
+    second = threading.Thread(target=search, daemon=True)
+    second.start()
+    assert store.second_lookup.wait(timeout=5)
+    client.release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+    assert client.queries == ['Agents']
+    assert len(results) == 2 and results[0] == results[1]
+
+
+def test_expired_results_are_fetched_again(tmp_path):
+    client = FakeClient([paper(1, "Multi agent planning with language models")])
+    cache = ArxivSearchCache(store=JSONDiskStore(tmp_path, ttl_seconds=0.2), client=client)
+    first = cache.search('agents', max_results=1)
+    assert cache.search('agents', max_results=1) == first
+    assert client.queries == ['agents']
+    time.sleep(0.3)
+    assert cache.search('agents', max_results=1) == first
+    assert client.queries == ['agents', 'agents']
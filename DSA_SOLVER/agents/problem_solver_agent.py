@@ -2,9 +2,14 @@ from autogen_agentchat.agents import AssistantAgent
 
 
 
-def get_problem_solver_expert(model_client):
+def get_problem_solver_expert(model_client, model_context=None):
     """
     Returns an instance of the ProblemSolverExpert agent configured to solve DSA problems.
+
+    Args:
+        model_client (ChatCompletionClient): The model client the agent uses.
+        model_context (ChatCompletionContext | None): Controls which history is sent to the model on every call.
+            Defaults to the full, unbounded history.
     
     Returns:
         AssistantAgent: Configured problem solver expert agent.
@@ -14,6 +19,7 @@ def get_problem_solver_expert(model_client):
         name='ProblemSolverExpert',
         description="An expert agent that solves problems using code execution.",
         model_client=model_client,
+        model_context=model_context,
         system_message='You are a problem solver agent that is an expert in solving DSA problems,' \
         'You will be working with code executor agent to execute code' \
         'You will be give a task and you should first provide a way to solve the task/problem' \
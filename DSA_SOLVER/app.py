@@ -1,59 +1,167 @@
 import streamlit as st
 import asyncio
-from main import get_team_and_docker, run_team
-from config.docker_utils import get_docker_executor, start_docker_executor, stop_docker_executor
-from config.model_client import get_model_client
+import atexit
+import threading
+import time
+from autogen_core import CancellationToken
+from main import get_team_and_docker, new_run_trace
+from config.executor_pool import DockerExecutorPool
+from config.workspace import new_run_id
+from config.solution_cache import get_solution_cache, run_cached_solution, remember_solution
 from autogen_agentchat.messages import TextMessage
 from autogen_agentchat.base import TaskResult
 
+# How often a running solve is checked for new messages
+POLL_INTERVAL = 0.2
+# Seconds allowed for stopping the idle containers at exit
+POOL_CLOSE_TIMEOUT = 60
+
 st.set_page_config(page_title="DSA Solver", page_icon="🧑‍💻")
 st.title("DSA Solver by Furquan")
 st.write("A Streamlit app to solve Data Structures and Algorithms problems using Autogen.")
 
-# Initialize session state for message history
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
 # Input for DSA question
 task = st.text_input("Enter your DSA Question", value="Can you give me a solution to add 2 numbers?", placeholder="e.g., Find the sum of two numbers")
 
-async def run(team, task, docker):
-    try:
-        await start_docker_executor(docker)
-        async for message in team.run_stream(task=task):
-            if isinstance(message, TextMessage):
-                yield {"source": message.source, "content": message.content}
-            elif isinstance(message, TaskResult):
-                yield {"source": "TaskResult", "content": f"Task completed: {message.stop_reason}"}
-    except Exception as e:
-        yield {"source": "Error", "content": f"An error occurred: {str(e)}"}
-    finally:
-        await stop_docker_executor(docker)
-
-async def collect_messages(task):
-    if not task.strip():
-        st.error("Please enter a valid DSA question.")
-        return
-    team, docker = await get_team_and_docker()
-    async for msg in run(team, task, docker):
-        st.session_state.messages.append(msg)
-        with st.chat_message(msg["source"], avatar={
-            "user": "👤",
-            "ProblemSolverExpert": "🧑‍💻",
-            "CodeExecutorAgent": "🤖",
-            "TaskResult": "✅",
-            "Error": "❌"
-        }.get(msg["source"], "ℹ️")):
-            if msg["source"] == "CodeExecutorAgent" and "```" in msg["content"]:
-                # Extract code block if present
-                code = msg["content"].split("```")[1].strip()
-                st.code(code, language="python")
-            else:
-                st.markdown(msg["content"])
-
-if st.button("Solve"):
-    with st.spinner("Solving your question..."):
+@st.cache_resource
+def get_event_loop():
+    # One background loop for the whole process; every session's solves run on it
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_executor_pool():
+    # Shared across reruns and sessions so containers stay warm between questions; stopped when the server exits
+    pool = DockerExecutorPool()
+    atexit.register(lambda: asyncio.run_coroutine_threadsafe(pool.close(), get_event_loop()).result(timeout=POOL_CLOSE_TIMEOUT))
+    return pool
+
+class SolverSession:
+    """
+    The messages and running solve of one browser session, kept across reruns.
+
+    Each question leases an executor from the pool for the length of its solve only, so idle sessions hold no
+    container; the pool health checks and resets an executor before another question gets it. A rephrasing
+    of an already solved question re-runs the stored solution from the solution cache instead of the team.
+
+    Solves run on the background loop and append their messages to `messages`; the script only reads them,
+    so a rerun (e.g. the Cancel button) never interrupts a solve.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.trace = None
+        self.started = None
+        self._future = None
+        self._cancellation_token = None
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def start(self, task):
+        self._cancellation_token = CancellationToken()
+        self.started = time.monotonic()
+        self._future = asyncio.run_coroutine_threadsafe(self._solve(task, self._cancellation_token), get_event_loop())
+
+    def cancel(self):
+        if self.running:
+            # CancellationToken is not thread safe; cancel it on the loop that runs the solve
+            get_event_loop().call_soon_threadsafe(self._cancellation_token.cancel)
+
+    async def _solve(self, task, cancellation_token):
+        pool = get_executor_pool()
+        run_id = new_run_id()
+        self.trace = trace = new_run_trace(run_id)
         try:
-            asyncio.run(collect_messages(task))
-        except RuntimeError:
-            st.error("Asyncio event loop error. Please try again.")
\ No newline at end of file
+            with trace.span('lease'):
+                docker = await pool.acquire()
+            try:
+                solution_cache = get_solution_cache()
+                cached = None
+                if solution_cache is not None:
+                    with trace.span('solution_cache'):
+                        cached = await run_cached_solution(solution_cache, task, docker)
+                if cached:
+                    entry, result = cached
+                    self.messages.append({"source": "CodeExecutorAgent", "content": f"```python\n{entry['solution']}\n```\n{result.output}"})
+                    self.messages.append({"source": "TaskResult", "content": f"Solved from the solution cache: {entry['problem']}"})
+                    return
+                with trace.span('setup'):
+                    team, docker = await get_team_and_docker(docker)
+                stream = team.run_stream(task=task, cancellation_token=cancellation_token)
+                async for message in trace.instrument(stream):
+                    if isinstance(message, TextMessage):
+                        self.messages.append({"source": message.source, "content": message.content})
+                    elif isinstance(message, TaskResult):
+                        self.messages.append({"source": "TaskResult", "content": f"Task completed: {message.stop_reason}"})
+                if solution_cache is not None:
+                    with trace.span('solution_cache'):
+                        await remember_solution(solution_cache, task, docker)
+            finally:
+                # Keep this question's files before the pool resets the work dir for the next lease
+                pool.workspaces.collect(docker.work_dir, run_id, {"task": task})
+                await pool.release(docker)
+        except asyncio.CancelledError:
+            self.messages.append({"source": "TaskResult", "content": "Task cancelled."})
+        except Exception as e:
+            self.messages.append({"source": "Error", "content": f"An error occurred: {str(e)}"})
+
+def get_solver_session():
+    if "solver" not in st.session_state:
+        st.session_state.solver = SolverSession()
+    return st.session_state.solver
+
+def render_message(msg):
+    with st.chat_message(msg["source"], avatar={
+        "user": "👤",
+        "ProblemSolverExpert": "🧑‍💻",
+        "CodeExecutorAgent": "🤖",
+        "TaskResult": "✅",
+        "Error": "❌"
+    }.get(msg["source"], "ℹ️")):
+        if msg["source"] == "CodeExecutorAgent" and "```" in msg["content"]:
+            # Extract code block if present
+            code = msg["content"].split("```")[1].strip()
+            st.code(code, language="python")
+        else:
+            st.markdown(msg["content"])
+
+solver = get_solver_session()
+
+col_solve, col_cancel = st.columns(2)
+with col_solve:
+    if st.button("Solve", disabled=solver.running):
+        if not task.strip():
+            st.error("Please enter a valid DSA question.")
+        else:
+            solver.start(task)
+with col_cancel:
+    if st.button("Cancel", disabled=not solver.running):
+        solver.cancel()
+
+# Earlier messages are drawn once per rerun; while a solve runs only the new ones are added
+rendered = len(solver.messages)
+for msg in solver.messages[:rendered]:
+    render_message(msg)
+
+if solver.running:
+    new_messages = st.container()
+    status = st.empty()
+    while solver.running or rendered < len(solver.messages):
+        with new_messages:
+            for msg in solver.messages[rendered:]:
+                render_message(msg)
+                rendered += 1
+        # Streamlit only notices a click (e.g. Cancel) when the script writes to the page, so the status is
+        # rewritten on every poll; a loop that only slept would hold the click until the solve ended
+        status.info(f"Solving your question... {time.monotonic() - solver.started:.0f}s")
+        time.sleep(POLL_INTERVAL)
+    status.empty()
+    # Redraw so the buttons reflect that the solve is over
+    st.rerun()
+
+if solver.trace is not None and solver.trace.spans:
+    with st.expander("Run timings"):
+        st.code(solver.trace.summary(), language="text")
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import time
+from main import get_team_and_docker
+from config.executor_pool import DockerExecutorPool
+from config.model_client import close_model_clients
+from config.solution_cache import get_solution_cache, run_cached_solution, remember_solution
+from config.workspace import new_run_id
+from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.base import TaskResult
+
+
+def load_problems(path):
+    """
+    Reads problems from a JSONL file. Each line needs a "task" and may carry an "id".
+
+    Args:
+        path (str): Path to the JSONL file.
+
+    Returns:
+        list[dict]: Problems with an "id" filled in from the line number when missing.
+    """
+    problems = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            problem = json.loads(line)
+            if not problem.get("task"):
+                raise ValueError(f"Line {line_number} of {path} has no 'task'.")
+            problem.setdefault("id", str(line_number))
+            problems.append(problem)
+    return problems
+
+
+async def solve_problem(pool, problem):
+    """
+    Solves one problem with its own team and a leased executor, and returns its result record.
+
+    A rephrasing of an already solved problem re-runs the stored solution from the solution cache instead of
+    the team; a newly solved problem is stored once its solutions.py has been re-run successfully.
+
+    Latency is reported per stage: waiting for an executor, the solution cache, building the team, the whole
+    solve, and the time spent producing each agent's messages (model time for ProblemSolverExpert, run time
+    for CodeExecutorAgent).
+    """
+    record = {"id": problem["id"], "run_id": new_run_id(), "task": problem["task"], "final_answer": None,
+              "stop_reason": None, "turns": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency": {},
+              "artifacts": [], "error": None}
+    latency = record["latency"]
+    started = time.perf_counter()
+
+    try:
+        async with pool.lease() as docker:
+            latency["lease"] = time.perf_counter() - started
+
+            solution_cache = get_solution_cache()
+            cached = None
+            if solution_cache is not None:
+                stage_start = time.perf_counter()
+                cached = await run_cached_solution(solution_cache, problem["task"], docker)
+                latency["solution_cache"] = time.perf_counter() - stage_start
+
+            if cached:
+                entry, result = cached
+                record["stop_reason"] = f"Solved from the solution cache ({entry['problem']})"
+                record["final_answer"] = result.output
+            else:
+                stage_start = time.perf_counter()
+                team, docker = await get_team_and_docker(docker)
+                latency["setup"] = time.perf_counter() - stage_start
+
+                solve_start = last_message_at = time.perf_counter()
+                async for message in team.run_stream(task=problem["task"]):
+                    now = time.perf_counter()
+                    if isinstance(message, TaskResult):
+                        record["stop_reason"] = message.stop_reason
+                        continue
+                    if message.source != "user":
+                        record["turns"] += 1
+                        latency[message.source] = latency.get(message.source, 0.0) + now - last_message_at
+                    if message.models_usage:
+                        record["prompt_tokens"] += message.models_usage.prompt_tokens
+                        record["completion_tokens"] += message.models_usage.completion_tokens
+                    if isinstance(message, TextMessage) and message.source == "ProblemSolverExpert":
+                        record["final_answer"] = message.content
+                    last_message_at = now
+                latency["solve"] = time.perf_counter() - solve_start
+
+                if solution_cache is not None:
+                    await remember_solution(solution_cache, problem["task"], docker)
+
+            run_record = pool.workspaces.collect(docker.work_dir, record["run_id"], {"task": problem["task"]})
+            record["artifacts"] = run_record["artifacts"]
+
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    latency["total"] = time.perf_counter() - started
+    return record
+
+
+async def run_batch(input_path, output_path, concurrency):
+    """
+    Solves every problem in `input_path` with at most `concurrency` problems in flight and writes one
+    result per line to `output_path` as soon as each problem finishes.
+    """
+    problems = load_problems(input_path)
+    pool = DockerExecutorPool(min_size=min(concurrency, len(problems)), max_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_solve(problem):
+        async with semaphore:
+            return await solve_problem(pool, problem)
+
+    try:
+        pool.workspaces.gc()
+        await pool.start()
+        with open(output_path, "w", encoding="utf-8") as out:
+            for done, future in enumerate(asyncio.as_completed([bounded_solve(p) for p in problems]), start=1):
+                record = await future
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                status = record["error"] or record["stop_reason"]
+                print(f"[{done}/{len(problems)}] {record['id']}: {status} ({record['latency']['total']:.1f}s)")
+    finally:
+        await pool.close()
+        await close_model_clients()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve DSA problems from a JSONL file concurrently.")
+    parser.add_argument("input", help="JSONL file with one {\"id\": ..., \"task\": ...} object per line")
+    parser.add_argument("output", help="JSONL file to write the results to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Problems solved at the same time (default: 4)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run_batch(args.input, args.output, args.concurrency))
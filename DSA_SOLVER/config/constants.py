@@ -3,4 +3,40 @@ TEXT_MENTION_TERMINATION = 'STOP'
 DOCKER_WORK_DIR = 'tmp'
 DOCKER_TIMEOUT=120
 MAX_TURNS=15
-OPENAI_API_KEY = 'OPENAI_API_KEY'
\ No newline at end of file
+OPENAI_API_KEY = 'OPENAI_API_KEY'
+POOL_MIN_SIZE=1
+POOL_MAX_SIZE=4
+HTTP_MAX_CONNECTIONS=20
+HTTP_KEEPALIVE_EXPIRY=120
+LLM_CACHE_MODE='off'
+LLM_CACHE_DIR='.llm_cache'
+LLM_CACHE_MAX_ENTRIES=10000
+LLM_CACHE_TTL=None
+WORKSPACE_TEMPLATE_DIR=None
+WORKSPACE_USE_TMPFS=False
+TMPFS_DIR='/dev/shm'
+WORKSPACE_MAX_AGE=7*24*3600
+WORKSPACE_KEEP=200
+EXECUTOR_IMAGE='python:3-slim'
+EXECUTOR_PACKAGES=['numpy', 'matplotlib', 'imageio']
+PIP_WHEEL_CACHE_DIR='.pip_cache'
+EXECUTOR_BACKEND='docker'
+FORKSERVER_PRELOAD=['numpy', 'matplotlib', 'matplotlib.pyplot', 'imageio']
+CONTEXT_TOKEN_BUDGET=12000
+CONTEXT_KEEP_RECENT=4
+EXECUTOR_OUTPUT_HEAD_LINES=20
+EXECUTOR_OUTPUT_TAIL_LINES=40
+EXECUTOR_OUTPUT_MAX_BYTES=16*1024
+EXECUTOR_OUTPUT_LOG_DIR='logs'
+REPEATED_ERROR_LIMIT=3
+NO_NEW_CODE_TURNS=3
+RUN_TIMEOUT_SECONDS=600
+RUN_TOKEN_BUDGET=200000
+SOLUTION_FILE='solutions.py'
+TRACE_FILE='traces/spans.jsonl'
+METRICS_PORT=None
+SOLUTION_CACHE_DIR='.solution_cache'
+SOLUTION_CACHE_THRESHOLD=0.9
+SPECULATIVE_CANDIDATES=3
+# Sampling temperature of each speculative candidate, cycled; candidates also get their index as seed
+SPECULATIVE_TEMPERATURES=[0.2, 0.7, 1.0]
@@ -1,18 +1,38 @@
-from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
+from config.constants import DOCKER_TIMEOUT, EXECUTOR_IMAGE, EXECUTOR_PACKAGES, PIP_WHEEL_CACHE_DIR, EXECUTOR_BACKEND
+from common.dependencies import PrewarmedDockerExecutor
+from config.forkserver_executor import ForkServerCodeExecutor
+from config.output_capture import BoundedOutputMixin
+from config.workspace import WorkspaceManager
 
-from config.constants import DOCKER_TIMEOUT,DOCKER_WORK_DIR
 
+class SolverDockerExecutor(BoundedOutputMixin, PrewarmedDockerExecutor):
+    """PrewarmedDockerExecutor whose output is spilled to the workspace and returned as a bounded excerpt."""
 
-def get_docker_executor():
+
+def get_docker_executor(work_dir=None):
     """
     Returns a DockerCommandLineCodeExecutor instance configured with the specified work directory and timeout.
+    The container runs an image with EXECUTOR_PACKAGES pre-installed and a persistent pip wheel cache.
+    Output over EXECUTOR_OUTPUT_MAX_BYTES is cut to its head and tail; the full output stays in the workspace.
+    With EXECUTOR_BACKEND = 'forkserver' a local ForkServerCodeExecutor is returned instead (trusted code only).
+    
+    Args:
+        work_dir (str | Path | None): Host directory mounted into the container. Defaults to a new per-run workspace.
     
     Returns:
-        DockerCommandLineCodeExecutor: Configured Docker command line code executor.
+        DockerCommandLineCodeExecutor | ForkServerCodeExecutor: Configured code executor.
     """
-    docker_executor = DockerCommandLineCodeExecutor(
-
-        work_dir=DOCKER_WORK_DIR,
+    if work_dir is None:
+        work_dir = WorkspaceManager().create()
+    if EXECUTOR_BACKEND == 'forkserver':
+        return ForkServerCodeExecutor(work_dir=work_dir, timeout=DOCKER_TIMEOUT)
+    if EXECUTOR_BACKEND != 'docker':
+        raise ValueError(f"Unsupported executor backend: {EXECUTOR_BACKEND}")
+    docker_executor = SolverDockerExecutor(
+        packages=EXECUTOR_PACKAGES,
+        wheel_cache_dir=PIP_WHEEL_CACHE_DIR,
+        image=EXECUTOR_IMAGE,
+        work_dir=work_dir,
         timeout=DOCKER_TIMEOUT
     )
     return docker_executor
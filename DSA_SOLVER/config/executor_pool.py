@@ -0,0 +1,186 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from itertools import count
+
+from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock
+
+from config.constants import POOL_MAX_SIZE, POOL_MIN_SIZE
+from config.docker_utils import get_docker_executor, start_docker_executor, stop_docker_executor
+from config.workspace import WorkspaceManager
+
+
+class DockerExecutorPool:
+    """
+    A pool of pre-started Docker executors that tasks lease instead of starting their own container.
+
+    Every executor gets its own workspace slot, so leased executors never share files.
+    On release the executor is health checked, its work dir is reset and it goes back to the idle queue.
+    Unhealthy executors are stopped and replaced; when an executor cannot be started, the freed capacity is
+    handed to a waiting lease, which tries to start one itself. Collect a run's artifacts with
+    `pool.workspaces.collect(docker.work_dir, run_id)` before the lease ends.
+
+    Args:
+        min_size (int): Number of executors started up front and kept warm.
+        max_size (int): Upper bound on executors alive at once; extra leases wait for a release.
+        workspaces (WorkspaceManager | None): Where the slot work dirs live. Defaults to a new WorkspaceManager.
+    """
+
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, workspaces=None):
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.workspaces = workspaces or WorkspaceManager()
+        # Idle executors, and None for each unit of capacity freed while leases may be waiting.
+        self._idle = asyncio.Queue()
+        self._size = 0
+        # Leases blocked in `acquire` waiting for an executor to come back.
+        self._waiters = 0
+        self._slot_prefix = f"pool-{uuid.uuid4().hex[:8]}"
+        self._slot_ids = count()
+        self._started = False
+        self._closed = False
+
+    @property
+    def size(self):
+        """Number of executors currently alive, idle or leased."""
+        return self._size
+
+    async def start(self):
+        """
+        Starts `min_size` executors concurrently so the first leases do not pay for container start-up.
+        """
+        if self._started:
+            return
+        self._started = True
+        missing = self.min_size - self._size
+        self._size += missing
+        results = await asyncio.gather(*(self._create() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._free_capacity()
+                print(f"Failed to warm up Docker executor: {result}")
+            else:
+                self._idle.put_nowait(result)
+
+    def _free_capacity(self):
+        # Wakes a lease blocked in `acquire` so it can start an executor in the freed place
+        self._size -= 1
+        self._idle.put_nowait(None)
+
+    async def _create(self):
+        work_dir = self.workspaces.create_slot(f"{self._slot_prefix}-{next(self._slot_ids)}")
+        executor = get_docker_executor(work_dir=work_dir)
+        await start_docker_executor(executor)
+        return executor
+
+    async def acquire(self):
+        """
+        Leases an executor, starting a new one if none is idle and the pool is below `max_size`.
+
+        Returns:
+            DockerCommandLineCodeExecutor: A started executor with a freshly reset work dir.
+        """
+        if self._closed:
+            raise RuntimeError("Executor pool is closed.")
+        await self.start()
+
+        while True:
+            try:
+                executor = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                executor = None
+                if self._size >= self.max_size:
+                    self._waiters += 1
+                    try:
+                        executor = await self._idle.get()
+                    finally:
+                        self._waiters -= 1
+            if self._closed:
+                if executor is not None:
+                    await self._discard(executor)
+                    self._size -= 1
+                raise RuntimeError("Executor pool is closed.")
+            if executor is not None:
+                return executor
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    return await self._create()
+                except BaseException:
+                    self._free_capacity()
+                    raise
+
+    async def release(self, executor):
+        """
+        Returns a leased executor to the pool after a health check and a work dir reset.
+
+        Args:
+            executor (DockerCommandLineCodeExecutor): The executor obtained from `acquire`.
+        """
+        healthy = not self._closed and await self._is_healthy(executor)
+        self.workspaces.reset(executor.work_dir)
+
+        if healthy:
+            self._idle.put_nowait(executor)
+            return
+
+        await self._discard(executor)
+        if self._closed:
+            self._size -= 1
+            return
+
+        # Keep the pool at its size so waiting leases are not starved.
+        try:
+            self._idle.put_nowait(await self._create())
+        except Exception as e:
+            self._free_capacity()
+            print(f"Failed to replace unhealthy Docker executor: {e}")
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Async context manager around `acquire` and `release`.
+
+        Example:
+            async with pool.lease() as docker:
+                team, _ = await get_team_and_docker(docker)
+        """
+        executor = await self.acquire()
+        try:
+            yield executor
+        finally:
+            await self.release(executor)
+
+    async def close(self):
+        """
+        Stops all idle executors. Executors still leased are stopped when they are released, and leases
+        waiting for one fail with a RuntimeError.
+        """
+        self._closed = True
+        while not self._idle.empty():
+            executor = self._idle.get_nowait()
+            if executor is not None:
+                await self._discard(executor)
+                self._size -= 1
+        # Blocked leases only wake up on a queue item; a None makes each of them see the pool is closed
+        for _ in range(self._waiters):
+            self._idle.put_nowait(None)
+
+    async def _discard(self, executor):
+        await stop_docker_executor(executor)
+        self.workspaces.remove_slot(executor.work_dir)
+
+    @staticmethod
+    async def _is_healthy(executor):
+        try:
+            result = await executor.execute_code_blocks(
+                [CodeBlock(code="echo ok", language="sh")], CancellationToken()
+            )
+        except Exception:
+            return False
+        return result.exit_code == 0 and "ok" in result.output
+
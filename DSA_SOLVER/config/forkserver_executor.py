@@ -0,0 +1,341 @@
+import asyncio
+import json
+import os
+import re
+import selectors
+import signal
+import sys
+import time
+import traceback
+from hashlib import sha256
+from itertools import count
+from pathlib import Path
+
+from autogen_core.code_executor import CodeExecutor
+from autogen_ext.code_executors.local import CommandLineCodeResult
+
+from config.constants import DOCKER_TIMEOUT, FORKSERVER_PRELOAD, EXECUTOR_OUTPUT_MAX_BYTES
+from config.output_capture import log_path_for, read_output
+
+PYTHON_LANGUAGES = ('python', 'py', 'python3')
+SHELL_LANGUAGES = ('bash', 'shell', 'sh')
+TIMEOUT_EXIT_CODE = 124
+
+# Command line of the fork server process; it only imports this module and the preload list.
+SERVE_COMMAND = 'import sys; from config.forkserver_executor import serve; serve(sys.argv[1:])'
+
+
+def _run_python_file(filename, work_dir, output_path):
+    """
+    Runs one script in a freshly forked child with stdout and stderr sent to `output_path`.
+
+    Returns:
+        int: The exit code.
+    """
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.close(fd)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.chdir(work_dir)
+    sys.path.insert(0, work_dir)
+    sys.argv = [filename]
+
+    try:
+        with open(filename, encoding='utf-8') as f:
+            code = compile(f.read(), filename, 'exec')
+        exec(code, {'__name__': '__main__', '__file__': filename})
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        # Skip this frame so the traceback starts in the user's script, like `python file.py` would.
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def serve(preload):
+    """
+    Main loop of the fork server process.
+
+    Imports `preload` once, then reads one JSON request per line from stdin and forks a child per request.
+    Children are killed when their timeout expires, and one JSON line {"id", "exit_code"} is written to
+    stdout when each one ends. The loop is single threaded so forking is safe. Closing stdin kills all
+    children and ends the server.
+    """
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *args: None)
+    selector = selectors.DefaultSelector()
+    selector.register(0, selectors.EVENT_READ, 'stdin')
+    selector.register(wakeup_r, selectors.EVENT_READ, 'wakeup')
+
+    children = {}  # pid -> [request id, deadline, timed out]
+    buffer = b''
+    out = sys.stdout.buffer
+
+    def respond(message):
+        out.write(json.dumps(message).encode() + b'\n')
+        out.flush()
+
+    respond({'ready': True})
+    while True:
+        deadlines = [child[1] for child in children.values() if not child[2]]
+        timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        for key, _ in selector.select(timeout):
+            if key.data == 'wakeup':
+                try:
+                    while os.read(wakeup_r, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+
+            chunk = os.read(0, 65536)
+            if not chunk:
+                for pid in children:
+                    os.kill(pid, signal.SIGKILL)
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                request = json.loads(line)
+                if 'kill' in request:
+                    for pid, child in children.items():
+                        if child[0] == request['kill']:
+                            os.kill(pid, signal.SIGKILL)
+                    continue
+
+                pid = os.fork()
+                if pid == 0:
+                    signal.set_wakeup_fd(-1)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    selector.close()
+                    exit_code = 1
+                    try:
+                        exit_code = _run_python_file(request['filename'], request['work_dir'], request['output_path'])
+                    finally:
+                        os._exit(exit_code & 0xFF)
+                children[pid] = [request['id'], time.monotonic() + request['timeout'], False]
+
+        now = time.monotonic()
+        for pid, child in children.items():
+            if not child[2] and child[1] <= now:
+                child[2] = True
+                os.kill(pid, signal.SIGKILL)
+
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            request_id, _, timed_out = children.pop(pid)
+            exit_code = TIMEOUT_EXIT_CODE if timed_out else os.waitstatus_to_exitcode(status)
+            respond({'id': request_id, 'exit_code': exit_code})
+
+
+def _filename_from_content(code, work_dir):
+    match = re.match(r'^\s*(?:#|//)\s*filename:\s*(\S+)', code.splitlines()[0] if code else '')
+    if not match:
+        return None
+    path = (Path(work_dir) / match.group(1)).resolve()
+    if not path.is_relative_to(Path(work_dir).resolve()):
+        raise ValueError("Filename is not in the workspace")
+    return str(path.relative_to(Path(work_dir).resolve()))
+
+
+class ForkServerCodeExecutor(CodeExecutor):
+    """
+    Runs code blocks locally in processes forked from a server process that has already imported
+    FORKSERVER_PRELOAD (numpy, matplotlib, imageio), so each block starts in milliseconds.
+
+    Every block gets a fresh fork, so runs do not leak state into each other. Timeouts and output follow
+    DockerCommandLineCodeExecutor: blocks run in order, stdout and stderr are combined, execution stops at
+    the first failure and a timeout gives exit code 124 with "Timeout" appended to the output. Output goes to a
+    log in the work dir and the agent gets at most `max_output_bytes` of it, head and tail.
+
+    There is no sandbox: only use this backend for trusted workloads.
+
+    Args:
+        work_dir (str | Path): Directory the code files are written to and run in.
+        timeout (int): Seconds a block may run before it is killed.
+        preload (list[str]): Modules imported once by the fork server.
+        max_output_bytes (int): Output kept in the excerpt returned to the agent.
+    """
+
+    def __init__(self, work_dir, timeout=DOCKER_TIMEOUT, preload=FORKSERVER_PRELOAD,
+                 max_output_bytes=EXECUTOR_OUTPUT_MAX_BYTES):
+        if timeout < 1:
+            raise ValueError("Timeout must be greater than or equal to 1.")
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("The forkserver backend needs os.fork and is not available on this platform.")
+        self._work_dir = Path(work_dir)
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        self._timeout = timeout
+        self._preload = list(preload)
+        self._max_output_bytes = max_output_bytes
+        self._server = None
+        self._reader = None
+        self._pending = {}
+        self._request_ids = count()
+
+    @property
+    def work_dir(self):
+        return self._work_dir
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    async def start(self):
+        if self._server is not None:
+            return
+        package_root = str(Path(__file__).resolve().parents[1])
+        python_path = os.pathsep.join(filter(None, [package_root, os.getenv('PYTHONPATH')]))
+        self._server = await asyncio.create_subprocess_exec(
+            sys.executable, '-c', SERVE_COMMAND, *self._preload,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, 'PYTHONPATH': python_path, 'MPLBACKEND': 'Agg'},
+        )
+        # Wait until the preload imports are done so the first block does not pay for them.
+        if not await self._server.stdout.readline():
+            await self.stop()
+            raise RuntimeError("Fork server failed to start.")
+        self._reader = asyncio.create_task(self._read_responses())
+
+    async def stop(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.stdin.close()
+        try:
+            await asyncio.wait_for(server.wait(), 5)
+        except asyncio.TimeoutError:
+            server.kill()
+            await server.wait()
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    async def execute_code_blocks(self, code_blocks, cancellation_token):
+        if self._server is None:
+            raise ValueError("Fork server is not running. Must first be started with either start or a context manager.")
+        if len(code_blocks) == 0:
+            raise ValueError("No code blocks to execute.")
+
+        outputs = []
+        files = []
+        last_exit_code = 0
+        for code_block in code_blocks:
+            lang = code_block.language.lower()
+            if lang not in PYTHON_LANGUAGES + SHELL_LANGUAGES:
+                outputs.append(f"Unsupported language {lang}")
+                last_exit_code = 1
+                break
+
+            try:
+                filename = _filename_from_content(code_block.code, self._work_dir)
+            except ValueError as e:
+                outputs.append(str(e))
+                last_exit_code = 1
+                break
+            if not filename:
+                extension = 'py' if lang in PYTHON_LANGUAGES else 'sh'
+                filename = f"tmp_code_{sha256(code_block.code.encode()).hexdigest()}.{extension}"
+
+            code_path = self._work_dir / filename
+            code_path.write_text(code_block.code, encoding='utf-8')
+            files.append(code_path)
+
+            if lang in PYTHON_LANGUAGES:
+                output, exit_code = await self._run_python(filename, cancellation_token)
+            else:
+                output, exit_code = await self._run_shell(lang, filename, cancellation_token)
+            if exit_code == TIMEOUT_EXIT_CODE:
+                output += "\n Timeout"
+            outputs.append(output)
+            last_exit_code = exit_code
+            if exit_code != 0:
+                break
+
+        code_file = str(files[0]) if files else None
+        return CommandLineCodeResult(exit_code=last_exit_code, output="".join(outputs), code_file=code_file)
+
+    async def _read_responses(self):
+        stdout = self._server.stdout
+        while line := await stdout.readline():
+            response = json.loads(line)
+            future = self._pending.pop(response['id'], None)
+            if future is not None and not future.done():
+                future.set_result(response['exit_code'])
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Fork server exited."))
+        self._pending.clear()
+
+    async def _run_python(self, filename, cancellation_token):
+        output_path = log_path_for(self._work_dir, filename)
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        request = {'id': request_id, 'filename': filename, 'work_dir': str(self._work_dir.resolve()),
+                   'output_path': str(output_path.resolve()), 'timeout': self._timeout}
+        self._server.stdin.write(json.dumps(request).encode() + b'\n')
+        cancellation_token.link_future(future)
+        try:
+            exit_code = await future
+        except asyncio.CancelledError:
+            # Stop the child, then let the cancellation reach the team or task that asked for it
+            self._pending.pop(request_id, None)
+            if self._server is not None:
+                self._server.stdin.write(json.dumps({'kill': request_id}).encode() + b'\n')
+            raise
+        return read_output(output_path, self._work_dir, self._max_output_bytes), exit_code
+
+    async def _run_shell(self, lang, filename, cancellation_token):
+        output_path = log_path_for(self._work_dir, filename)
+        with output_path.open('wb') as output:
+            process = await asyncio.create_subprocess_exec(
+                'sh' if lang == 'shell' else lang, filename,
+                cwd=self._work_dir, stdin=asyncio.subprocess.DEVNULL, stdout=output, stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+        wait_task = asyncio.create_task(asyncio.wait_for(process.wait(), self._timeout))
+        cancellation_token.link_future(wait_task)
+        try:
+            exit_code = await wait_task
+        except asyncio.TimeoutError:
+            _kill_process_group(process)
+            await process.wait()
+            exit_code = TIMEOUT_EXIT_CODE
+        except asyncio.CancelledError:
+            _kill_process_group(process)
+            raise
+        return read_output(output_path, self._work_dir, self._max_output_bytes), exit_code
+
+
+def _kill_process_group(process):
+    # The script runs in its own session, so the commands it started are killed with it
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,103 @@
+import asyncio
+
+from autogen_core.models import ChatCompletionClient, CreateResult, RequestUsage
+
+
+class MeteredChatCompletionClient(ChatCompletionClient):
+    """
+    Wraps a shared model client for one consumer, e.g. one speculative candidate, and meters every request
+    it sends, whether or not the agent ever yields the response.
+
+    `usage` adds up the usage the API reported for finished requests. A request cancelled in flight reports
+    none; its prompt is counted in `cancelled_prompt_tokens` with the wrapped client's `count_tokens`
+    estimate, and its completion tokens are unknown, so completion totals are a lower bound.
+
+    Args:
+        client (ChatCompletionClient): The client to wrap. It is shared, so `close` leaves it open.
+        extra_create_args (dict | None): Arguments added to every request, e.g. {'temperature': 0.7, 'seed': 1}.
+            Arguments passed by the caller take precedence.
+    """
+
+    def __init__(self, client, extra_create_args=None):
+        self.client = client
+        self.extra_create_args = dict(extra_create_args or {})
+        self.usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self.requests = 0
+        self.cancelled_requests = 0
+        self.cancelled_prompt_tokens = 0
+
+    def _record(self, result):
+        self.usage = RequestUsage(
+            prompt_tokens=self.usage.prompt_tokens + result.usage.prompt_tokens,
+            completion_tokens=self.usage.completion_tokens + result.usage.completion_tokens,
+        )
+
+    def _record_cancelled(self, messages, tools):
+        self.cancelled_requests += 1
+        try:
+            self.cancelled_prompt_tokens += self.client.count_tokens(messages, tools=tools)
+        except Exception:
+            pass
+
+    async def create(self, messages, *, tools=[], json_output=None, extra_create_args={}, cancellation_token=None):
+        self.requests += 1
+        try:
+            result = await self.client.create(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args={**self.extra_create_args, **extra_create_args},
+                cancellation_token=cancellation_token,
+            )
+        except asyncio.CancelledError:
+            self._record_cancelled(messages, tools)
+            raise
+        self._record(result)
+        return result
+
+    def create_stream(self, messages, *, tools=[], json_output=None, extra_create_args={}, cancellation_token=None):
+        async def _generator():
+            self.requests += 1
+            finished = False
+            try:
+                async for result in self.client.create_stream(
+                    messages,
+                    tools=tools,
+                    json_output=json_output,
+                    extra_create_args={**self.extra_create_args, **extra_create_args},
+                    cancellation_token=cancellation_token,
+                ):
+                    if isinstance(result, CreateResult):
+                        finished = True
+                        self._record(result)
+                    yield result
+            except (GeneratorExit, asyncio.CancelledError):
+                # Closed or cancelled before the final result: the API never reported this request's usage
+                if not finished:
+                    self._record_cancelled(messages, tools)
+                raise
+
+        return _generator()
+
+    async def close(self):
+        pass
+
+    def actual_usage(self):
+        return self.usage
+
+    def total_usage(self):
+        return self.usage
+
+    def count_tokens(self, messages, *, tools=[]):
+        return self.client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages, *, tools=[]):
+        return self.client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):
+        return self.client.capabilities
+
+    @property
+    def model_info(self):
+        return self.client.model_info
@@ -1,17 +1,77 @@
 import os
+import httpx
 from dotenv import load_dotenv
+from openai import DefaultAsyncHttpxClient
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-from config.constants import MODEL, OPENAI_API_KEY
+from config.constants import MODEL, OPENAI_API_KEY, HTTP_KEEPALIVE_EXPIRY, HTTP_MAX_CONNECTIONS
+from config.constants import LLM_CACHE_MODE, LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL
+from common.llm_cache import CACHE_MODES, DiskLRUStore, RecordReplayChatCompletionCache
+from common.loop_clients import LoopBoundRegistry
 # Load environment variables
 load_dotenv()
 
 api_key = os.getenv(OPENAI_API_KEY)
+cache_mode = os.getenv('LLM_CACHE_MODE', LLM_CACHE_MODE)
 
+# One long-lived client per (provider, model), bound to the event loop it was first used on.
+_registry = LoopBoundRegistry(lambda client: client.close(), 'model client')
 
-def get_model_client():
-    if not api_key:
-        raise ValueError(f"Please set the {OPENAI_API_KEY} environment variable.")
-    
-    # Initialize the OpenAI model client
-    model_client = OpenAIChatCompletionClient(model=MODEL, api_key=api_key)
-    return model_client
\ No newline at end of file
+
+def _create_model_client(provider, model):
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {CACHE_MODES}, got {cache_mode!r}")
+    client = _create_base_client(provider, model)
+    if cache_mode == 'off':
+        return client
+    store = DiskLRUStore(LLM_CACHE_DIR, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL)
+    return RecordReplayChatCompletionCache(client, store, mode=cache_mode)
+
+
+def _create_base_client(provider, model):
+    if provider == 'openai':
+        if not api_key and cache_mode != 'replay':
+            raise ValueError(f"Please set the {OPENAI_API_KEY} environment variable.")
+        # Keep idle connections around long enough to be reused by the next task
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            )
+        )
+        # Replay never reaches the API, so a placeholder key is enough
+        return OpenAIChatCompletionClient(model=model, api_key=api_key or 'replay', http_client=http_client)
+
+    if provider == 'ollama':
+        from autogen_ext.models.ollama import OllamaChatCompletionClient
+        return OllamaChatCompletionClient(model=model)
+
+    raise ValueError(f"Unsupported model provider: {provider}")
+
+
+def get_model_client(model=MODEL, provider='openai'):
+    """
+    Returns the shared chat completion client for the given provider and model, creating it on first use.
+
+    When LLM_CACHE_MODE (constant or environment variable) is 'record' or 'replay', the client is wrapped in a
+    RecordReplayChatCompletionCache backed by LLM_CACHE_DIR.
+
+    The same client (and its HTTP connection pool) is handed to every team in the process. A client is only
+    rebuilt when the event loop it was bound to has been closed, e.g. after an `asyncio.run` call returned;
+    it is closed when that loop shuts down.
+
+    Args:
+        model (str): The model name. Defaults to MODEL.
+        provider (str): 'openai' or 'ollama'. Defaults to 'openai'.
+
+    Returns:
+        ChatCompletionClient: The shared model client.
+    """
+    return _registry.get((provider, model), lambda: _create_model_client(provider, model))
+
+
+async def close_model_clients():
+    """
+    Closes every registered model client and empties the registry. Call this once at shutdown.
+    """
+    await _registry.close_all()
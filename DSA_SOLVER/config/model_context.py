@@ -0,0 +1,133 @@
+import re
+
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import AssistantMessage, UserMessage
+
+from config.constants import (
+    CONTEXT_TOKEN_BUDGET, CONTEXT_KEEP_RECENT, EXECUTOR_OUTPUT_HEAD_LINES, EXECUTOR_OUTPUT_TAIL_LINES
+)
+
+CODE_BLOCK_PATTERN = re.compile(r'```[ \t]*(\w+)?[ \t]*\n(.*?)```', re.DOTALL)
+SUPERSEDED_CODE = '```\n# (code omitted: superseded by a later version)\n```'
+SUMMARY_LINE_CHARS = 200
+# Rough characters per token, used when the model client cannot count tokens.
+CHARS_PER_TOKEN = 4
+
+
+def trim_output(text, head_lines=EXECUTOR_OUTPUT_HEAD_LINES, tail_lines=EXECUTOR_OUTPUT_TAIL_LINES):
+    """
+    Keeps the first `head_lines` and last `tail_lines` lines of `text`, where the command and the error
+    usually are, and replaces the middle with a marker.
+    """
+    lines = text.splitlines()
+    if len(lines) <= head_lines + tail_lines + 1:
+        return text
+    omitted = len(lines) - head_lines - tail_lines
+    return '\n'.join(lines[:head_lines] + [f'... ({omitted} lines omitted) ...'] + lines[len(lines) - tail_lines:])
+
+
+def _first_line(text):
+    """First non-empty line outside code blocks, shortened for a summary."""
+    for line in CODE_BLOCK_PATTERN.sub('', text).splitlines():
+        line = line.strip()
+        if line:
+            return line if len(line) <= SUMMARY_LINE_CHARS else line[:SUMMARY_LINE_CHARS] + '...'
+    return '(code only)'
+
+
+def _last_line(text):
+    """Last non-empty line, which for executor output is the result or the exception."""
+    for line in reversed(text.splitlines()):
+        line = line.strip()
+        if line:
+            return line if len(line) <= SUMMARY_LINE_CHARS else line[:SUMMARY_LINE_CHARS] + '...'
+    return '(no output)'
+
+
+class CompactingChatCompletionContext(ChatCompletionContext):
+    """
+    A model context for the fix-and-retry loop between ProblemSolverExpert and CodeExecutorAgent.
+
+    The full history is stored, but every model call sees a compacted view of it:
+        1. code blocks in the agent's replies that a later reply replaced are dropped, only the latest version is kept;
+        2. executor output is cut down to its head and tail;
+        3. when the view is over `token_budget`, turns older than the last `keep_recent` messages are folded
+           into a one-line-per-turn summary, and if that is still too much the oldest recent turns go too.
+    The first message (the task) and the last message are always kept.
+
+    Args:
+        model_client (ChatCompletionClient | None): Used to count tokens. Falls back to an estimate when
+            None or when the client cannot count tokens for its model.
+        token_budget (int | None): Maximum prompt tokens of the history per call. None disables the budget.
+        keep_recent (int): Number of most recent messages never summarized.
+        executor_source (str): Name of the agent whose messages are executor output.
+        initial_messages (list[LLMMessage] | None): Messages the context starts with.
+    """
+
+    def __init__(self, model_client=None, token_budget=CONTEXT_TOKEN_BUDGET, keep_recent=CONTEXT_KEEP_RECENT,
+                 executor_source='CodeExecutorAgent', initial_messages=None):
+        super().__init__(initial_messages)
+        if token_budget is not None and token_budget <= 0:
+            raise ValueError("token_budget must be greater than 0.")
+        self._model_client = model_client
+        self._token_budget = token_budget
+        self._keep_recent = max(1, keep_recent)
+        self._executor_source = executor_source
+
+    async def get_messages(self):
+        messages = self._compact(list(self._messages))
+        if self._token_budget is None or self._count_tokens(messages) <= self._token_budget:
+            return messages
+
+        # The task is always the head, however short the history
+        head, rest = messages[:1], messages[1:]
+        older, recent = rest[:-self._keep_recent], rest[-self._keep_recent:]
+        summary = [self._summarize(older)] if older else []
+        # Drop the oldest recent messages, never the newest one, until the view fits.
+        while len(recent) > 1 and self._count_tokens(head + summary + recent) > self._token_budget:
+            older, recent = older + recent[:1], recent[1:]
+            summary = [self._summarize(older)]
+        return head + summary + recent
+
+    def _compact(self, messages):
+        compacted = []
+        latest_code = max((i for i, m in enumerate(messages) if self._has_code(m)), default=None)
+        for index, message in enumerate(messages):
+            if not isinstance(message.content, str):
+                compacted.append(message)
+                continue
+            content = message.content
+            if latest_code is not None and index < latest_code and self._has_code(message):
+                content = CODE_BLOCK_PATTERN.sub(SUPERSEDED_CODE, content)
+            if self._is_executor_output(message):
+                content = trim_output(content)
+            compacted.append(message if content == message.content else message.model_copy(update={'content': content}))
+        return compacted
+
+    def _summarize(self, messages):
+        lines = ['Summary of earlier turns (details omitted to save context):']
+        for message in messages:
+            source = getattr(message, 'source', type(message).__name__)
+            if not isinstance(message.content, str):
+                lines.append(f'- {source}: (non-text content)')
+            elif self._is_executor_output(message):
+                lines.append(f'- {source}: {_last_line(message.content)}')
+            else:
+                lines.append(f'- {source}: {_first_line(message.content)}')
+        return UserMessage(content='\n'.join(lines), source='context_summary')
+
+    def _has_code(self, message):
+        # Only the agent's own replies; code in the task itself is never dropped.
+        return (isinstance(message, AssistantMessage) and isinstance(message.content, str)
+                and CODE_BLOCK_PATTERN.search(message.content) is not None)
+
+    def _is_executor_output(self, message):
+        return isinstance(message, UserMessage) and message.source == self._executor_source
+
+    def _count_tokens(self, messages):
+        if self._model_client is not None:
+            try:
+                return self._model_client.count_tokens(messages)
+            except Exception:
+                pass
+        return sum(len(str(message.content)) for message in messages) // CHARS_PER_TOKEN
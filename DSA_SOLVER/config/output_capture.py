@@ -0,0 +1,128 @@
+import shlex
+from pathlib import Path
+
+from config.constants import EXECUTOR_OUTPUT_MAX_BYTES, EXECUTOR_OUTPUT_LOG_DIR
+
+CHUNK_SIZE = 64 * 1024
+# Share of the byte cap kept from the start of the output; the rest is kept from the end.
+HEAD_FRACTION = 0.25
+SCRATCH_PREFIX = 'tmp_code_'
+
+
+class RingBuffer:
+    """
+    Keeps the first and last bytes written to it within a fixed cap, however much is written.
+
+    Args:
+        max_bytes (int): Bytes kept in total, split between head and tail.
+    """
+
+    def __init__(self, max_bytes=EXECUTOR_OUTPUT_MAX_BYTES):
+        if max_bytes < 2:
+            raise ValueError("max_bytes must be at least 2.")
+        self.max_bytes = max_bytes
+        self.head_bytes = max(1, int(max_bytes * HEAD_FRACTION))
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        self.tail += data
+        if len(self.tail) > self.tail_bytes:
+            del self.tail[:len(self.tail) - self.tail_bytes]
+
+    @property
+    def truncated(self):
+        return self.total > len(self.head) + len(self.tail)
+
+    def excerpt(self, marker=''):
+        """Returns head and tail decoded, with `marker` between them when bytes were dropped."""
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if not self.truncated:
+            return head + tail
+        return f"{head}\n{marker}\n{tail}"
+
+
+def log_path_for(work_dir, filename):
+    """
+    Returns where the output of running `filename` is written, under EXECUTOR_OUTPUT_LOG_DIR in `work_dir`.
+    Log names drop the tmp_code_ prefix so workspace collection keeps them as artifacts.
+    """
+    stem = Path(filename).stem
+    if stem.startswith(SCRATCH_PREFIX):
+        stem = 'output_' + stem[len(SCRATCH_PREFIX):][:12]
+    log_dir = Path(work_dir) / EXECUTOR_OUTPUT_LOG_DIR
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir / f"{stem}.log"
+
+
+def read_output(log_path, work_dir, max_bytes=EXECUTOR_OUTPUT_MAX_BYTES):
+    """
+    Reads a run's output log through a RingBuffer, so memory stays flat whatever the log size.
+
+    When the output fits in `max_bytes` the log is deleted and the output returned as is. Otherwise the log is
+    kept in the workspace and an excerpt is returned that says where the full output is.
+
+    Args:
+        log_path (Path): The log written by the run.
+        work_dir (Path): The workspace, used to give the agent a relative path to the log.
+        max_bytes (int): Output kept in the excerpt.
+
+    Returns:
+        str: The output or its excerpt.
+    """
+    log_path = Path(log_path)
+    if not log_path.is_file():
+        return ''
+    buffer = RingBuffer(max_bytes)
+    with log_path.open('rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            buffer.write(chunk)
+    if not buffer.truncated:
+        log_path.unlink(missing_ok=True)
+        return buffer.excerpt()
+
+    relative = log_path.relative_to(work_dir) if log_path.is_relative_to(work_dir) else log_path
+    marker = (f"... [output truncated: {buffer.total} bytes in total, showing the first {len(buffer.head)} "
+              f"and last {len(buffer.tail)}; the full output is in {relative}] ...")
+    return buffer.excerpt(marker)
+
+
+class BoundedOutputMixin:
+    """
+    Mixin for DockerCommandLineCodeExecutor that sends each command's stdout and stderr to a log file in the
+    work dir instead of through the Docker API, and hands the agent a bounded excerpt of it.
+
+    Args:
+        max_output_bytes (int): Output kept in the excerpt returned to the agent.
+    """
+
+    def __init__(self, *args, max_output_bytes=EXECUTOR_OUTPUT_MAX_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._max_output_bytes = max_output_bytes
+
+    async def _execute_command(self, command, cancellation_token):
+        log_path = log_path_for(self.work_dir, command[-1])
+        # `exec` keeps the command line of the running process equal to `command`, which cancellation relies on.
+        relative_log = log_path.relative_to(self.work_dir).as_posix()
+        wrapped = ['sh', '-c', f'exec {shlex.join(command)} > {shlex.quote(relative_log)} 2>&1']
+        output, exit_code = await super()._execute_command(wrapped, cancellation_token)
+        if output == "Code execution was cancelled.":
+            return output, exit_code
+
+        result = read_output(log_path, self.work_dir, self._max_output_bytes)
+        # Anything left in `output` comes from sh itself, or is the "Timeout" note for exit code 124.
+        return result + output, exit_code
+
+    async def _kill_running_command(self, command):
+        if command[:2] == ['sh', '-c']:
+            # Strip the `exec` and the redirections added above.
+            command = shlex.split(command[2])[1:-3]
+        await super()._kill_running_command(command)
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock
+
+from common.termination import TEST_FAILURE_PATTERN
+from config.constants import SOLUTION_CACHE_DIR, SOLUTION_CACHE_THRESHOLD, SOLUTION_FILE
+
+INDEX_FILE = 'solutions.jsonl'
+NUM_PERM = 64
+BANDS = 16
+# Mersenne prime used by the MinHash permutations.
+PRIME = (1 << 61) - 1
+# Words that change how a question is asked but not what is asked.
+FILLER_WORDS = {
+    'a', 'an', 'the', 'can', 'could', 'you', 'please', 'me', 'give', 'write', 'python', 'code', 'program',
+    'solution', 'to', 'for', 'of', 'i', 'want', 'need', 'would', 'like', 'how', 'do', 'function', 'that', 'in',
+}
+NUMBER_WORDS = {'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5', 'six': '6',
+                'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10'}
+# Numbers as written in the problem, signs and decimals included, and spelled-out numbers.
+NUMBER_PATTERN = re.compile(r'(?<!\w)-?\d+(?:\.\d+)?|\b(?:' + '|'.join(NUMBER_WORDS) + r')\b', re.IGNORECASE)
+WORD_PATTERN = re.compile(r'\b[A-Za-z_]\w*\b')
+
+
+def normalize_problem(text):
+    """Lowercases, drops punctuation and filler words and spells numbers as digits."""
+    words = re.sub(r'[^a-z0-9]+', ' ', text.lower()).split()
+    return ' '.join(NUMBER_WORDS.get(word, word) for word in words if word not in FILLER_WORDS)
+
+
+def problem_literals(text):
+    """
+    The numbers and code identifiers (names with an underscore, a digit or an inner capital, e.g. `nums1`,
+    `maxProfit`) of a problem. Problems that differ in one of them are different problems, however similar
+    the rest of their text.
+    """
+    numbers = sorted(NUMBER_WORDS.get(number.lower(), number) for number in NUMBER_PATTERN.findall(text))
+    identifiers = sorted({word for word in WORD_PATTERN.findall(text)
+                          if '_' in word or any(c.isdigit() for c in word)
+                          or (word[1:] != word[1:].lower() and word != word.upper())})
+    return numbers, identifiers
+
+
+def same_problem(task, other):
+    """
+    Whether two problem texts ask the same thing: same numbers and identifiers, and the same words once
+    normalized. Only case, punctuation, filler words, spelled-out numbers and word order may differ.
+    """
+    if problem_literals(task) != problem_literals(other):
+        return False
+    return set(normalize_problem(task).split()) == set(normalize_problem(other).split())
+
+
+def passed(result):
+    """Whether a solution run exited with code 0 and its output reports no failed test or traceback."""
+    return result.exit_code == 0 and not TEST_FAILURE_PATTERN.search(result.output)
+
+
+def shingles(text):
+    """
+    The words of `text`, hashed to 64-bit integers. Word order is ignored, like in `same_problem`, so a
+    reordered rephrasing has the same shingles; character n-grams would set it apart.
+    """
+    return {struct.unpack('<Q', hashlib.blake2b(word.encode(), digest_size=8).digest())[0]
+            for word in set(text.split()) or {''}}
+
+
+def _permutations(num_perm):
+    # Fixed parameters so signatures stay comparable across processes.
+    params = []
+    for index in range(num_perm):
+        digest = hashlib.blake2b(f'minhash-{index}'.encode(), digest_size=16).digest()
+        a, b = struct.unpack('<QQ', digest)
+        params.append((a % (PRIME - 1) + 1, b % PRIME))
+    return params
+
+
+class MinHashIndex:
+    """
+    Finds stored texts whose shingle sets have an estimated Jaccard similarity of at least `threshold`,
+    using MinHash signatures bucketed by LSH bands so a lookup only compares a few candidates.
+
+    Args:
+        num_perm (int): Signature length.
+        bands (int): LSH bands; `num_perm` must be divisible by it.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._permutations = _permutations(num_perm)
+        self._buckets = defaultdict(set)
+        self._signatures = {}
+
+    def signature(self, text):
+        hashes = shingles(text)
+        return [min((a * h + b) % PRIME for h in hashes) for a, b in self._permutations]
+
+    def add(self, key, signature):
+        self._signatures[key] = signature
+        for band in self._bands(signature):
+            self._buckets[band].add(key)
+
+    def remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is not None:
+            for band in self._bands(signature):
+                self._buckets[band].discard(key)
+
+    def query(self, signature, threshold):
+        """
+        Returns (key, similarity) of the stored entries at or above `threshold`, most similar first.
+        """
+        candidates = set()
+        for band in self._bands(signature):
+            candidates |= self._buckets.get(band, set())
+        matches = []
+        for key in candidates:
+            stored = self._signatures[key]
+            similarity = sum(x == y for x, y in zip(signature, stored)) / self.num_perm
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _bands(self, signature):
+        return [(index, tuple(signature[index * self.rows:(index + 1) * self.rows])) for index in range(self.bands)]
+
+
+class SolutionCache:
+    """
+    Local store of verified solutions, looked up by near-duplicate problem text.
+
+    Entries are appended to `solutions.jsonl` in `cache_dir` and indexed in memory with a MinHashIndex over
+    the words of the normalized problem text. The index only proposes candidates: a hit also needs `same_problem`, so
+    "sum 1..100" never reuses the solution of "sum 1..1000", nor "first occurrence" that of "last occurrence".
+    Only solutions that ran successfully are stored.
+
+    Args:
+        cache_dir (str | Path): Directory of the store.
+        threshold (float): Minimum estimated similarity for a hit, between 0 and 1.
+    """
+
+    def __init__(self, cache_dir=SOLUTION_CACHE_DIR, threshold=SOLUTION_CACHE_THRESHOLD):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self._index = MinHashIndex()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        path = self.cache_dir / INDEX_FILE
+        if not path.is_file():
+            return
+        with path.open(encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get('removed'):
+                    self._entries.pop(entry['id'], None)
+                    self._index.remove(entry['id'])
+                    continue
+                # Signatures are recomputed rather than stored, so the store outlives changes to the shingling
+                entry.pop('signature', None)
+                self._entries[entry['id']] = entry
+                self._index.remove(entry['id'])
+                self._index.add(entry['id'], self._index.signature(normalize_problem(entry['problem'])))
+
+    def _append(self, record):
+        with (self.cache_dir / INDEX_FILE).open('a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def lookup(self, task):
+        """
+        Returns the stored entry of a rephrasing of `task`, with its 'similarity', or None.
+        """
+        with self._lock:
+            for key, similarity in self._index.query(self._index.signature(normalize_problem(task)), self.threshold):
+                entry = self._entries[key]
+                if same_problem(task, entry['problem']):
+                    return {**entry, 'similarity': similarity}
+            return None
+
+    def add(self, task, solution, output):
+        """
+        Stores a verified solution and its test output for `task`.
+
+        Returns:
+            dict: The stored entry.
+        """
+        normalized = normalize_problem(task)
+        entry = {
+            'id': hashlib.sha256(normalized.encode()).hexdigest()[:16],
+            'problem': task,
+            'solution': solution,
+            'output': output,
+            'created': time.time(),
+        }
+        with self._lock:
+            self._index.remove(entry['id'])
+            self._entries[entry['id']] = entry
+            self._index.add(entry['id'], self._index.signature(normalized))
+            self._append(entry)
+        return entry
+
+    def remove(self, key):
+        """Drops an entry, e.g. a stored solution that no longer runs."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._index.remove(key)
+                self._append({'id': key, 'removed': True})
+
+
+_cache = None
+
+
+def get_solution_cache():
+    """
+    Returns the process-wide SolutionCache, or None when SOLUTION_CACHE_DIR is None.
+    """
+    global _cache
+    if SOLUTION_CACHE_DIR is None:
+        return None
+    if _cache is None:
+        _cache = SolutionCache()
+    return _cache
+
+
+async def run_cached_solution(cache, task, executor):
+    """
+    Re-runs the stored solution of a rephrasing of `task` in `executor` and saves it as solutions.py.
+
+    Returns:
+        tuple[dict, CodeResult] | None: The entry and the run result, or None on a miss or when the stored
+        solution no longer passes (it is then dropped from the cache).
+    """
+    entry = cache.lookup(task)
+    if entry is None:
+        return None
+    result = await executor.execute_code_blocks(
+        [CodeBlock(code=entry['solution'], language='python')], CancellationToken()
+    )
+    if not passed(result):
+        cache.remove(entry['id'])
+        return None
+    (Path(executor.work_dir) / SOLUTION_FILE).write_text(entry['solution'], encoding='utf-8')
+    return entry, result
+
+
+async def remember_solution(cache, task, executor):
+    """
+    Verifies the solutions.py a run left in the executor's work dir by running it, and stores it on success.
+
+    Returns:
+        dict | None: The stored entry, or None when there is no solution or it fails.
+    """
+    path = Path(executor.work_dir) / SOLUTION_FILE
+    if not path.is_file():
+        return None
+    solution = path.read_text(encoding='utf-8')
+    result = await executor.execute_code_blocks([CodeBlock(code=solution, language='python')], CancellationToken())
+    if not passed(result):
+        return None
+    return cache.add(task, solution, result.output)
@@ -0,0 +1,199 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from config.constants import (
+    DOCKER_WORK_DIR, WORKSPACE_TEMPLATE_DIR, WORKSPACE_USE_TMPFS, TMPFS_DIR, WORKSPACE_MAX_AGE, WORKSPACE_KEEP
+)
+
+# Files written by the executor itself rather than by the generated code.
+SCRATCH_PREFIXES = ('tmp_code_',)
+RESULT_FILE = 'result.json'
+# Suffix of the marker next to each slot that holds the PID of the process using it.
+OWNER_SUFFIX = '.pid'
+
+
+def new_run_id():
+    """Returns a sortable, unique id for a run, e.g. '20250101-120000-1a2b3c4d'."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class WorkspaceManager:
+    """
+    Hands out a private directory per run so concurrent runs never overwrite each other's
+    `solutions.py`, `output.png` or `output.gif`.
+
+    Layout under `root`:
+        slots/<name>    long-lived work dirs of pooled executors, emptied between runs
+        slots/<name>.pid  PID of the process that owns the slot
+        runs/<run_id>   one directory per run holding its artifacts and a result.json record
+
+    Args:
+        root (str | Path): Base directory. Defaults to DOCKER_WORK_DIR.
+        template_dir (str | Path | None): Directory whose contents seed every new workspace.
+        use_tmpfs (bool): Place `root` under TMPFS_DIR so workspaces live in memory.
+    """
+
+    def __init__(self, root=DOCKER_WORK_DIR, template_dir=WORKSPACE_TEMPLATE_DIR, use_tmpfs=WORKSPACE_USE_TMPFS):
+        root = Path(root)
+        if use_tmpfs:
+            if not Path(TMPFS_DIR).is_dir():
+                raise ValueError(f"tmpfs directory {TMPFS_DIR} does not exist.")
+            root = Path(TMPFS_DIR) / root.resolve().name
+        self.root = root
+        self.template_dir = Path(template_dir) if template_dir else None
+        self.runs_dir = self.root / 'runs'
+        self.slots_dir = self.root / 'slots'
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.slots_dir.mkdir(parents=True, exist_ok=True)
+
+    def create(self, run_id=None):
+        """
+        Creates and seeds the workspace for a run.
+
+        Args:
+            run_id (str | None): Id of the run. A new one is generated when omitted.
+
+        Returns:
+            Path: The run's workspace directory.
+        """
+        path = self.runs_dir / (run_id or new_run_id())
+        path.mkdir(parents=True, exist_ok=False)
+        self.seed(path)
+        return path
+
+    def create_slot(self, name):
+        """
+        Creates (or reuses) the work dir of a pooled executor, emptied and seeded.
+
+        Args:
+            name (str): Slot name, e.g. 'pool-0'.
+
+        Returns:
+            Path: The slot directory.
+        """
+        path = self.slots_dir / name
+        path.mkdir(parents=True, exist_ok=True)
+        # Kept outside the slot, which is emptied between runs and mounted into the container
+        _owner_marker(path).write_text(str(os.getpid()), encoding='utf-8')
+        self.reset(path)
+        return path
+
+    def remove_slot(self, path):
+        """Deletes a slot directory once its executor has been stopped."""
+        shutil.rmtree(path, ignore_errors=True)
+        _owner_marker(path).unlink(missing_ok=True)
+
+    def seed(self, path):
+        """Copies the template directory, if any, into `path`."""
+        if self.template_dir is not None:
+            shutil.copytree(self.template_dir, path, dirs_exist_ok=True)
+
+    def reset(self, path):
+        """Empties `path` and re-seeds it from the template, keeping the directory itself."""
+        for child in Path(path).iterdir():
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                child.unlink(missing_ok=True)
+        self.seed(path)
+
+    def collect(self, work_dir, run_id, result=None):
+        """
+        Collects the artifacts a run left in `work_dir` into `runs/<run_id>` and writes its result record.
+
+        Executor scratch files (tmp_code_*) and template files are skipped. When `work_dir` already is the
+        run's workspace, nothing is copied.
+
+        Args:
+            work_dir (str | Path): The directory the run executed in.
+            run_id (str): Id of the run.
+            result (dict | None): Extra fields stored in the record, e.g. stop reason or token counts.
+
+        Returns:
+            dict: The run record, also written to `runs/<run_id>/result.json`.
+        """
+        work_dir = Path(work_dir)
+        run_dir = self.runs_dir / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        template_files = set()
+        if self.template_dir is not None:
+            template_files = {p.relative_to(self.template_dir) for p in self.template_dir.rglob('*')}
+
+        artifacts = []
+        for path in sorted(work_dir.rglob('*')):
+            relative = path.relative_to(work_dir)
+            if not path.is_file() or relative in template_files or relative.name == RESULT_FILE:
+                continue
+            if relative.name.startswith(SCRATCH_PREFIXES):
+                continue
+            if run_dir.resolve() != work_dir.resolve():
+                (run_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, run_dir / relative)
+            artifacts.append(str(relative))
+
+        solution = run_dir / 'solutions.py'
+        record = {
+            'run_id': run_id,
+            'path': str(run_dir),
+            'artifacts': artifacts,
+            'solution': solution.read_text(encoding='utf-8') if solution.is_file() else None,
+            **(result or {}),
+        }
+        (run_dir / RESULT_FILE).write_text(json.dumps(record, indent=2), encoding='utf-8')
+        return record
+
+    def gc(self, max_age=WORKSPACE_MAX_AGE, keep=WORKSPACE_KEEP):
+        """
+        Deletes run workspaces older than `max_age` seconds, and the oldest ones beyond the newest `keep`.
+        Slots left behind by crashed processes are deleted: a slot whose owning process is gone at once, a slot
+        whose owner cannot be checked (no marker, or Windows) once it is older than `max_age`. Slots of running processes are never deleted.
+
+        Returns:
+            int: Number of directories removed.
+        """
+        runs = sorted(self.runs_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+        now = time.time()
+        removed = 0
+        for index, path in enumerate(runs):
+            if index >= keep or now - path.stat().st_mtime > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        for path in self.slots_dir.iterdir():
+            if not path.is_dir():
+                continue
+            owner = _slot_owner(path)
+            running = _is_running(owner) if owner is not None else None
+            if running or running is None and now - path.stat().st_mtime <= max_age:
+                continue
+            self.remove_slot(path)
+            removed += 1
+        return removed
+
+
+def _owner_marker(slot):
+    slot = Path(slot)
+    return slot.with_name(slot.name + OWNER_SUFFIX)
+
+
+def _slot_owner(slot):
+    try:
+        return int(_owner_marker(slot).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _is_running(pid):
+    # None when it cannot be told; os.kill would terminate the process on Windows
+    if os.name == 'nt':
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
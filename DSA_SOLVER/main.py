@@ -1,30 +1,77 @@
 import asyncio
-from team.dsa_solver_team import get_team
+import sys
+from pathlib import Path
+# The repository root holds the common/ modules shared with the other projects
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from team.dsa_solver_team import get_team, get_termination_condition
 from agents.problem_solver_agent import get_problem_solver_expert
 from agents.code_executor_agent import get_code_executor_agent
 from config.docker_utils import get_docker_executor, start_docker_executor, stop_docker_executor
-from config.model_client import get_model_client
+from config.executor_pool import DockerExecutorPool
+from config.model_client import get_model_client, close_model_clients
+from config.model_context import CompactingChatCompletionContext
+from config.workspace import new_run_id
+from common.instrumentation import RunTrace, JsonlExporter, metrics_registry, start_metrics_server
+from config.constants import TRACE_FILE, METRICS_PORT
+from config.solution_cache import get_solution_cache, run_cached_solution, remember_solution
 from autogen_agentchat.messages import TextMessage
 from autogen_agentchat.base import TaskResult
 
 
-async def get_team_and_docker():
-
-    docker = get_docker_executor()
-    model_client = get_model_client()
-    problem_solver_agent = get_problem_solver_expert(model_client)
+async def get_team_and_docker(docker=None, model_client=None):
+    """
+    Builds the solver team around `docker`, a new executor when omitted, and the shared model client unless
+    another `model_client` is given (e.g. a scripted one in the benchmarks).
+    """
+    if docker is None:
+        docker = get_docker_executor()
+    if model_client is None:
+        model_client = get_model_client()
+    # Keeps retries from resending every earlier attempt and traceback on each turn.
+    model_context = CompactingChatCompletionContext(model_client)
+    problem_solver_agent = get_problem_solver_expert(model_client, model_context)
     code_executor_agent = get_code_executor_agent(docker)
 
-    team = get_team(problem_solver_agent, code_executor_agent)
+    team = get_team(problem_solver_agent, code_executor_agent, get_termination_condition(docker.work_dir))
     return team, docker
 
-async def run_team(team,task,docker):
+def new_run_trace(run_id=None):
+    """
+    Returns a RunTrace that writes its spans to TRACE_FILE and to the process-wide metrics, which are served
+    for Prometheus on METRICS_PORT when it is set.
+    """
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    exporters = [metrics_registry]
+    if TRACE_FILE:
+        exporters.append(JsonlExporter(TRACE_FILE))
+    return RunTrace(run_id or new_run_id(), exporters)
+
+async def run_team(team,task,docker,manage_docker=True,trace=None,solution_cache=None):
+    """
+    Runs the team on a task and prints its messages. With a `solution_cache`, a near-duplicate of an already
+    solved task re-runs the stored solution instead of the team, and a newly solved task is stored once its
+    solutions.py has been re-run successfully.
+    """
 
+    trace = trace or new_run_trace()
     try:
-        await start_docker_executor(docker)
+        if manage_docker:
+            with trace.span('container_start'):
+                await start_docker_executor(docker)
 
+        if solution_cache is not None:
+            with trace.span('solution_cache'):
+                cached = await run_cached_solution(solution_cache, task, docker)
+            if cached:
+                entry, result = cached
+                print('='*50)
+                print(f" Solved from cache ({entry['similarity']:.0%} match with: {entry['problem']})")
+                print(f" CodeExecutorAgent: {result.output}")
+                print('='*50)
+                return
 
-        async for message in team.run_stream(task = task):
+        async for message in trace.instrument(team.run_stream(task = task)):
             print('='*50)
             if isinstance(message, TextMessage):
                 print(msg:= f" {message.source}: {message.content}")
@@ -34,18 +81,50 @@ async def run_team(team,task,docker):
                 # yield msg
             print('='*50)
 
+        if solution_cache is not None:
+            with trace.span('solution_cache'):
+                if await remember_solution(solution_cache, task, docker):
+                    print("Verified solution stored in the solution cache.")
 
     except Exception as e:
         print(f"An error occurred: {e}")
 
     finally:
-        await stop_docker_executor(docker)
+        if manage_docker:
+            with trace.span('container_stop'):
+                await stop_docker_executor(docker)
+        print(trace.summary())
+
+async def run_pooled_task(pool, task, run_id=None):
+    """
+    Runs a task on an executor leased from the pool; the container stays warm for the next task.
+    The files the run produced are collected into its own workspace before the executor is reset.
+    """
+    run_id = run_id or new_run_id()
+    trace = new_run_trace(run_id)
+    with trace.span('lease'):
+        docker = await pool.acquire()
+    try:
+        with trace.span('setup'):
+            team, docker = await get_team_and_docker(docker)
+        await run_team(team, task, docker, manage_docker=False, trace=trace, solution_cache=get_solution_cache())
+        record = pool.workspaces.collect(docker.work_dir, run_id, {"task": task})
+    finally:
+        await pool.release(docker)
+    print(f"Run {run_id} artifacts: {record['artifacts']} in {record['path']}")
+    return record
 
 async def main():
-    team,docker = await get_team_and_docker()
+    pool = DockerExecutorPool()
     task = 'Write a Python Code to add 2 numbers'
 
-    await run_team(team, task, docker)
+    try:
+        pool.workspaces.gc()
+        await pool.start()
+        await run_pooled_task(pool, task)
+    finally:
+        await pool.close()
+        await close_model_clients()
     
 
 
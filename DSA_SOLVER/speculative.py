@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from main import get_team_and_docker
+from config.constants import SPECULATIVE_CANDIDATES, SPECULATIVE_TEMPERATURES, SOLUTION_FILE
+from config.executor_pool import DockerExecutorPool
+from config.metered_client import MeteredChatCompletionClient
+from config.model_client import get_model_client, close_model_clients
+from config.workspace import new_run_id
+from common.termination import is_successful_execution
+from autogen_core import CancellationToken
+from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.base import TaskResult
+
+
+def candidate_sampling(index):
+    """Sampling arguments of candidate `index`, so the candidates explore different solutions."""
+    return {"temperature": SPECULATIVE_TEMPERATURES[index % len(SPECULATIVE_TEMPERATURES)], "seed": index}
+
+
+async def run_candidate(pool, task, index, tokens, state):
+    """
+    Runs one candidate team on its own leased executor and sampling settings until it solves the task or is
+    cancelled.
+
+    A candidate wins when its code runs cleanly and solutions.py has been written. The first winner cancels
+    every candidate, itself included, since the rest of its conversation is only the closing summary.
+
+    Tokens are metered on the candidate's own model client, so requests whose response was never yielded
+    count too. Requests cancelled in flight add their estimated prompt tokens to `cancelled_prompt_tokens`;
+    their completion tokens are unknown.
+
+    Returns:
+        dict: The candidate's record: whether it won, turns, tokens, elapsed time, and its answer and
+        artifacts when it won.
+    """
+    record = {"candidate": index, "sampling": candidate_sampling(index), "won": False, "cancelled": False,
+              "turns": 0, "prompt_tokens": 0, "completion_tokens": 0, "cancelled_requests": 0,
+              "cancelled_prompt_tokens": 0, "stop_reason": None, "elapsed": None, "answer": None, "output": None,
+              "artifacts": [], "error": None}
+    model_client = MeteredChatCompletionClient(get_model_client(), record["sampling"])
+    started = time.perf_counter()
+    try:
+        async with pool.lease() as docker:
+            team, docker = await get_team_and_docker(docker, model_client)
+            try:
+                async for message in team.run_stream(task=task, cancellation_token=tokens[index]):
+                    if isinstance(message, TaskResult):
+                        record["stop_reason"] = message.stop_reason
+                        continue
+                    if message.source != "user":
+                        record["turns"] += 1
+                    if not isinstance(message, TextMessage):
+                        continue
+                    if message.source == "ProblemSolverExpert":
+                        record["answer"] = message.content
+                    elif (state["winner"] is None and message.source == "CodeExecutorAgent"
+                          and is_successful_execution(message.content)
+                          and (Path(docker.work_dir) / SOLUTION_FILE).is_file()):
+                        state["winner"] = index
+                        record["won"] = True
+                        record["output"] = message.content
+                        record["elapsed"] = time.perf_counter() - started
+                        for token in tokens:
+                            token.cancel()
+            except asyncio.CancelledError:
+                record["cancelled"] = True
+
+            if record["won"]:
+                run_record = pool.workspaces.collect(docker.work_dir, state["run_id"], {"task": task, "candidate": index})
+                record["artifacts"] = run_record["artifacts"]
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["prompt_tokens"] = model_client.usage.prompt_tokens
+    record["completion_tokens"] = model_client.usage.completion_tokens
+    record["cancelled_requests"] = model_client.cancelled_requests
+    record["cancelled_prompt_tokens"] = model_client.cancelled_prompt_tokens
+    if record["elapsed"] is None:
+        record["elapsed"] = time.perf_counter() - started
+    return record
+
+
+async def solve_speculatively(pool, task, candidates=SPECULATIVE_CANDIDATES, run_id=None):
+    """
+    Starts `candidates` independent ProblemSolverExpert/CodeExecutorAgent teams on the same task at once, each
+    with its own temperature and seed, and keeps the first one whose code runs and writes solutions.py; the
+    others are cancelled right away.
+
+    Returns:
+        dict: The winner's index (None when no candidate solved the task), its record, the wall-clock time,
+        the tokens spent by the losing candidates, and every candidate's record. The wasted completion
+        tokens are a lower bound: requests cancelled in flight only contribute their estimated prompt tokens.
+    """
+    if candidates > pool.max_size:
+        raise ValueError(f"{candidates} candidates need a pool of at least that size, got {pool.max_size}.")
+    state = {"winner": None, "run_id": run_id or new_run_id()}
+    tokens = [CancellationToken() for _ in range(candidates)]
+    started = time.perf_counter()
+    records = await asyncio.gather(*(run_candidate(pool, task, i, tokens, state) for i in range(candidates)))
+    losers = [r for r in records if not r["won"]]
+    return {
+        "run_id": state["run_id"],
+        "task": task,
+        "winner": state["winner"],
+        "result": records[state["winner"]] if state["winner"] is not None else None,
+        "elapsed": time.perf_counter() - started,
+        "wasted_prompt_tokens": sum(r["prompt_tokens"] + r["cancelled_prompt_tokens"] for r in losers),
+        "wasted_completion_tokens": sum(r["completion_tokens"] for r in losers),
+        "cancelled_requests": sum(r["cancelled_requests"] for r in records),
+        "wasted_turns": sum(r["turns"] for r in losers),
+        "candidates": records,
+    }
+
+
+def print_report(report):
+    print('=' * 50)
+    if report["winner"] is None:
+        print(f"No candidate solved the task in {report['elapsed']:.1f}s.")
+    else:
+        result = report["result"]
+        print(f"Candidate {report['winner']} solved the task in {result['elapsed']:.1f}s "
+              f"({result['turns']} turns, {result['prompt_tokens'] + result['completion_tokens']} tokens).")
+        print(f" ProblemSolverExpert: {result['answer']}")
+        print(f" CodeExecutorAgent: {result['output']}")
+    print(f"Spent on losing candidates: {report['wasted_turns']} turns, "
+          f"{report['wasted_prompt_tokens']} prompt + at least {report['wasted_completion_tokens']} completion tokens "
+          f"({report['cancelled_requests']} requests cancelled in flight).")
+    for record in report["candidates"]:
+        status = "won" if record["won"] else record["error"] or ("cancelled" if record["cancelled"] else record["stop_reason"])
+        print(f"  candidate {record['candidate']} (temperature {record['sampling']['temperature']}): {status}, "
+              f"{record['turns']} turns, {record['prompt_tokens'] + record['completion_tokens']} tokens, "
+              f"{record['elapsed']:.1f}s")
+    print('=' * 50)
+
+
+async def main(task, candidates):
+    pool = DockerExecutorPool(min_size=candidates, max_size=candidates)
+    try:
+        pool.workspaces.gc()
+        await pool.start()
+        print_report(await solve_speculatively(pool, task, candidates))
+    finally:
+        await pool.close()
+        await close_model_clients()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve a DSA problem with several candidate teams racing each other.")
+    parser.add_argument("task", help="The problem to solve")
+    parser.add_argument("--candidates", type=int, default=SPECULATIVE_CANDIDATES,
+                        help=f"Candidate teams started at once (default: {SPECULATIVE_CANDIDATES})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args.task, args.candidates))
@@ -1,23 +1,60 @@
 from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import TextMentionTermination
+from autogen_agentchat.conditions import TextMentionTermination, TimeoutTermination, TokenUsageTermination
+from config.constants import (
+    TEXT_MENTION_TERMINATION, MAX_TURNS, REPEATED_ERROR_LIMIT, NO_NEW_CODE_TURNS, RUN_TIMEOUT_SECONDS,
+    RUN_TOKEN_BUDGET, SOLUTION_FILE
+)
+from common.termination import ArtifactWrittenTermination, RepeatedErrorTermination, NoNewCodeTermination
 
-def get_team(problem_solver_expert, code_executor_agent):
+
+def get_termination_condition(work_dir=None):
+    """
+    Returns the condition that ends a solve: the agent says STOP, or any of the early exits below fires.
+        - the code ran and solutions.py was written (only when `work_dir` is given)
+        - the same error came back REPEATED_ERROR_LIMIT times in a row
+        - no new code for NO_NEW_CODE_TURNS turns
+        - RUN_TIMEOUT_SECONDS of wall-clock time or RUN_TOKEN_BUDGET tokens used
+    Set a limit to None to turn that exit off.
+
+    Args:
+        work_dir (str | Path | None): The executor's work dir, where solutions.py is written.
+
+    Returns:
+        TerminationCondition: The conditions combined with `|`.
+    """
+    termination_condition = TextMentionTermination(TEXT_MENTION_TERMINATION)
+    if work_dir is not None:
+        termination_condition |= ArtifactWrittenTermination(work_dir, SOLUTION_FILE)
+    if REPEATED_ERROR_LIMIT:
+        termination_condition |= RepeatedErrorTermination(REPEATED_ERROR_LIMIT)
+    if NO_NEW_CODE_TURNS:
+        termination_condition |= NoNewCodeTermination(NO_NEW_CODE_TURNS)
+    if RUN_TIMEOUT_SECONDS:
+        termination_condition |= TimeoutTermination(RUN_TIMEOUT_SECONDS)
+    if RUN_TOKEN_BUDGET:
+        termination_condition |= TokenUsageTermination(max_total_token=RUN_TOKEN_BUDGET)
+    return termination_condition
+
+
+def get_team(problem_solver_expert, code_executor_agent, termination_condition=None):
     """
     Returns a RoundRobinGroupChat team configured with the provided agents and a termination condition.
     
     Args:
         problem_solver_expert (AssistantAgent): The expert agent that solves problems.
         code_executor_agent (CodeExecutorAgent): The agent that executes code.
+        termination_condition (TerminationCondition | None): When to stop. Defaults to `get_termination_condition()`.
     
     Returns:
         RoundRobinGroupChat: Configured team for collaborative problem solving.
     """
-    termination_condition = TextMentionTermination('STOP')
+    if termination_condition is None:
+        termination_condition = get_termination_condition()
     
     team = RoundRobinGroupChat(
         participants=[problem_solver_expert, code_executor_agent],
         termination_condition=termination_condition,
-        max_turns=15
+        max_turns=MAX_TURNS
     )
     
-    return team
\ No newline at end of file
+    return team
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The solver's modules are imported from its directory, and the shared ones from the repository root
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(PROJECT_DIR), str(PROJECT_DIR.parent)]
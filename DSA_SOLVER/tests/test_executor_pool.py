@@ -0,0 +1,138 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config import executor_pool
+from config.executor_pool import DockerExecutorPool
+from config.workspace import WorkspaceManager
+
+
+class FakeExecutor:
+    """Stands in for a Docker executor; `healthy` decides how the pool's health check goes."""
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.healthy = True
+        self.started = self.stopped = False
+
+    async def execute_code_blocks(self, code_blocks, cancellation_token):
+        return SimpleNamespace(exit_code=0 if self.healthy else 1, output="ok\n" if self.healthy else "")
+
+
+class Executors(list):
+    """The executors a pool created; the next `fail_starts` starts raise."""
+
+    fail_starts = 0
+
+
+@pytest.fixture
+def executors(monkeypatch):
+    created = Executors()
+
+    async def start(executor):
+        if created.fail_starts:
+            created.fail_starts -= 1
+            raise RuntimeError("container did not start")
+        executor.started = True
+
+    async def stop(executor):
+        executor.stopped = True
+
+    def create(work_dir):
+        created.append(FakeExecutor(work_dir))
+        return created[-1]
+
+    monkeypatch.setattr(executor_pool, "get_docker_executor", create)
+    monkeypatch.setattr(executor_pool, "start_docker_executor", start)
+    monkeypatch.setattr(executor_pool, "stop_docker_executor", stop)
+    return created
+
+
+def new_pool(tmp_path, min_size=0, max_size=1):
+    workspaces = WorkspaceManager(root=tmp_path, template_dir=None, use_tmpfs=False)
+    return DockerExecutorPool(min_size=min_size, max_size=max_size, workspaces=workspaces)
+
+
+async def blocked(coroutine):
+    # Starts `coroutine` and checks that it is still waiting once the loop has run everything else
+    task = asyncio.ensure_future(coroutine)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+def test_acquire_past_max_size_waits_until_a_release(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, max_size=1)
+        first = await pool.acquire()
+        waiter = await blocked(pool.acquire())
+        await pool.release(first)
+        assert await asyncio.wait_for(waiter, 1) is first
+        assert pool.size == 1 and len(executors) == 1
+    asyncio.run(run())
+
+
+def test_unhealthy_executor_is_replaced_on_release(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, max_size=1)
+        first = await pool.acquire()
+        first.healthy = False
+        await pool.release(first)
+        second = await pool.acquire()
+        assert first.stopped and second is not first and second.started
+        assert pool.size == 1
+    asyncio.run(run())
+
+
+def test_failed_start_frees_its_capacity(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, max_size=1)
+        executors.fail_starts = 1
+        with pytest.raises(RuntimeError, match="did not start"):
+            await pool.acquire()
+        assert pool.size == 0
+        executor = await asyncio.wait_for(pool.acquire(), 1)
+        assert executor.started and pool.size == 1
+    asyncio.run(run())
+
+
+def test_failed_replacement_hands_its_capacity_to_a_waiter(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, max_size=1)
+        first = await pool.acquire()
+        waiter = await blocked(pool.acquire())
+        first.healthy = False
+        executors.fail_starts = 1
+        await pool.release(first)
+        # The replacement failed, so the waiter starts an executor itself
+        executor = await asyncio.wait_for(waiter, 1)
+        assert executor.started and executor is not first and pool.size == 1
+    asyncio.run(run())
+
+
+def test_failed_warm_up_frees_its_capacity(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, min_size=2, max_size=2)
+        executors.fail_starts = 1
+        await pool.start()
+        assert pool.size == 1
+        leased = [await asyncio.wait_for(pool.acquire(), 1) for _ in range(2)]
+        assert all(executor.started for executor in leased) and pool.size == 2
+    asyncio.run(run())
+
+
+def test_close_wakes_blocked_leases(tmp_path, executors):
+    async def run():
+        pool = new_pool(tmp_path, max_size=1)
+        first = await pool.acquire()
+        waiters = [await blocked(pool.acquire()) for _ in range(2)]
+        await pool.close()
+        for waiter in waiters:
+            with pytest.raises(RuntimeError, match="closed"):
+                await asyncio.wait_for(waiter, 1)
+        # A lease still out is stopped when it comes back
+        await pool.release(first)
+        assert first.stopped and pool.size == 0
+    asyncio.run(run())
@@ -0,0 +1,28 @@
+from config.solution_cache import SolutionCache
+
+
+def test_reordered_rephrasing_hits(tmp_path):
+    cache = SolutionCache(cache_dir=tmp_path)
+    cache.add("Find the maximum subarray sum", "print(6)", "6")
+    entry = cache.lookup("Find the maximum sum of a subarray")
+    assert entry is not None and entry['solution'] == "print(6)"
+    assert entry['similarity'] == 1.0
+    assert cache.lookup("Can you find the maximum sum of a subarray?") is not None
+
+
+def test_different_numbers_miss(tmp_path):
+    cache = SolutionCache(cache_dir=tmp_path)
+    cache.add("Find the sum of numbers from 1 to 100", "print(5050)", "5050")
+    assert cache.lookup("Find the sum of numbers from 1 to 1000") is None
+    assert cache.lookup("Find the sum of numbers from one to 100") is not None
+
+
+def test_entries_are_reloaded_and_removals_persist(tmp_path):
+    cache = SolutionCache(cache_dir=tmp_path)
+    kept = cache.add("Find the maximum subarray sum", "print(6)", "6")
+    dropped = cache.add("Reverse a linked list", "print([3, 2, 1])", "[3, 2, 1]")
+    cache.remove(dropped['id'])
+
+    reloaded = SolutionCache(cache_dir=tmp_path)
+    assert reloaded.lookup("Find the maximum sum of a subarray")['id'] == kept['id']
+    assert reloaded.lookup("Reverse a linked list") is None
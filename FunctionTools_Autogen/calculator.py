@@ -0,0 +1,213 @@
+import ast
+import functools
+import re
+
+import numpy as np
+
+# Longest expression accepted.
+MAX_EXPRESSION_LENGTH = 2000
+# Deepest nesting accepted (e.g. chained unary minuses or nested calls); deeper ones would exhaust the stack.
+# A flat chain such as a long sum counts as one level, and the parser allows at most 200 nested parentheses.
+MAX_EXPRESSION_DEPTH = 200
+
+FUNCTIONS = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10, 'sin': np.sin,
+    'cos': np.cos, 'tan': np.tan, 'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
+}
+CONSTANTS = {'pi': np.pi, 'e': np.e}
+BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+_GLOBALS = {'__builtins__': {}, **FUNCTIONS, **CONSTANTS}
+
+
+# Numeric literals; they become parameters so expressions that differ only in their numbers share a template.
+NUMBER = re.compile(r'(?<![\w.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?(?![\w.])')
+PARAMETER = re.compile(r'_c\d+')
+# A name starting with an underscore, which user expressions may not use.
+PRIVATE_NAME = re.compile(r'(?<![\w])_')
+
+
+class _Checker(ast.NodeTransformer):
+    """
+    Checks that a parsed template only uses arithmetic, numbers, parameters, variables and FUNCTIONS, is at
+    most MAX_EXPRESSION_DEPTH deep, and collects its variable names.
+    """
+
+    def __init__(self):
+        self.variables = set()
+        self._depth = 0
+
+    def visit(self, node):
+        self._depth += 1
+        if self._depth > MAX_EXPRESSION_DEPTH:
+            raise ValueError(f"Expressions may be nested at most {MAX_EXPRESSION_DEPTH} levels deep.")
+        try:
+            return super().visit(node)
+        finally:
+            self._depth -= 1
+
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BinOp(self, node):
+        # 1 + 2 + ... + n parses as a left-leaning tree as deep as the sum is long; its left spine is walked in a
+        # loop so the chain counts as one level and only real nesting is limited
+        chain = []
+        while isinstance(node, ast.BinOp):
+            if not isinstance(node.op, BINARY_OPERATORS):
+                raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+            chain.append(node)
+            node = node.left
+        chain[-1].left = self.visit(node)
+        for link in reversed(chain):
+            link.right = self.visit(link.right)
+        return chain[0]
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, UNARY_OPERATORS):
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        # Floats keep every operation bounded: 9 ** 9 ** 9 overflows at once instead of computing a huge integer
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node):
+        if node.id in FUNCTIONS:
+            raise ValueError(f"Invalid name: {node.id}")
+        if node.id not in CONSTANTS and not PARAMETER.fullmatch(node.id):
+            self.variables.add(node.id)
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords or len(node.args) != 1:
+            raise ValueError("Only single-argument calls to " + ", ".join(FUNCTIONS) + " are supported.")
+        node.args = [self.visit(node.args[0])]
+        return node
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_template(source):
+    checker = _Checker()
+    try:
+        # The checker copies the location of every node it replaces, so no fix_missing_locations pass (which
+        # recurses) is needed
+        tree = checker.visit(ast.parse(source, mode='eval'))
+        code = compile(tree, '<expression>', 'eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from None
+    except RecursionError:
+        # The parser and compiler recurse on the whole tree, flat chains included, within the interpreter's limit
+        raise ValueError("Expression is too deeply nested.") from None
+    return code, frozenset(checker.variables)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_expression(expression):
+    """
+    Turns an expression into a template with its numbers as parameters (e.g. '_c0 + _c1 * _c2'). Each
+    template is parsed, checked and compiled once; expressions that only differ in their numbers reuse it.
+
+    Returns:
+        tuple: The compiled template (code object), its numbers, the template source and the variable names.
+
+    Raises:
+        ValueError: If the expression is too long, not valid Python or uses anything but arithmetic.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expressions are limited to {MAX_EXPRESSION_LENGTH} characters.")
+    if PRIVATE_NAME.search(expression):
+        raise ValueError("Names may not start with an underscore.")
+    constants = []
+
+    def parameter(match):
+        constants.append(float(match.group()))
+        return f'_c{len(constants) - 1}'
+
+    source = NUMBER.sub(parameter, expression.strip())
+    code, variables = _compile_template(source)
+    return code, tuple(constants), source, variables
+
+
+def _run(code, names):
+    try:
+        with np.errstate(all='ignore'):
+            result = eval(code, _GLOBALS, names)
+    except (ZeroDivisionError, OverflowError) as e:
+        raise ValueError(f"Invalid expression: {str(e)}") from None
+    except TypeError:
+        # A complex intermediate, e.g. floor((-8) ** 0.5), which the real-valued functions reject
+        raise ValueError("Result is not a real number.") from None
+    # A negative number to a fractional power, e.g. (-8) ** (1 / 3), is complex for Python floats
+    if np.iscomplexobj(result):
+        raise ValueError("Result is not a real number.")
+    return result
+
+
+def evaluate(expression, variables=None):
+    """
+    Evaluates one expression; with `variables` mapping names to lists of values it is evaluated over all of
+    them at once (element-wise, lists of equal length or single values).
+
+    Returns:
+        float | list[float]: The result, or one result per element of the variables.
+
+    Raises:
+        ValueError: If the expression is invalid, a variable is missing or the result is not finite.
+    """
+    code, constants, _, names = compile_expression(expression)
+    variables = variables or {}
+    missing = names - variables.keys()
+    if missing:
+        raise ValueError(f"Missing values for: {', '.join(sorted(missing))}")
+    bindings = {f'_c{i}': value for i, value in enumerate(constants)}
+    bindings.update({name: np.asarray(variables[name], dtype=float) for name in names})
+    result = np.asarray(_run(code, bindings), dtype=float)
+    if not np.isfinite(result).all():
+        raise ValueError("Result is not a finite number.")
+    return result.tolist() if result.ndim else float(result)
+
+
+def evaluate_many(expressions):
+    """
+    Evaluates a list of expressions without variables. Expressions sharing a template (e.g. '2 + 3 * 4' and
+    '5 + 6 * 2') are evaluated together, as one NumPy operation over arrays of their numbers.
+
+    Returns:
+        list[float | str]: One result per expression, in order; invalid ones hold an 'Error: ...' message.
+    """
+    results = [None] * len(expressions)
+    groups = {}
+    for position, expression in enumerate(expressions):
+        try:
+            code, constants, source, names = compile_expression(expression)
+        except ValueError as e:
+            results[position] = f"Error: {e}"
+            continue
+        if names:
+            results[position] = f"Error: Unknown names: {', '.join(sorted(names))}"
+            continue
+        groups.setdefault(source, (code, []))[1].append((position, constants))
+
+    for code, members in groups.values():
+        columns = np.array([constants for _, constants in members], dtype=float).reshape(len(members), -1).T
+        try:
+            values = np.broadcast_to(_run(code, {f'_c{i}': column for i, column in enumerate(columns)}), len(members))
+        except ValueError as e:
+            values = [str(e)] * len(members)
+        for (position, _), value in zip(members, values):
+            if isinstance(value, str):
+                results[position] = f"Error: {value}"
+            elif not np.isfinite(value):
+                results[position] = "Error: Result is not a finite number."
+            else:
+                results[position] = float(value)
+    return results
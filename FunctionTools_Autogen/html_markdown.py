@@ -0,0 +1,102 @@
+import html2text
+from html2text.utils import pad_tables_in_text
+
+from http_client import FETCH_MAX_BYTES, get_http_client, iter_text
+from web_cache import get_web_cache
+
+# Characters of HTML handed to the converter at a time when converting a page that is already in memory.
+CHUNK_CHARS = 4 * 1024
+
+
+class StreamingMarkdownConverter(html2text.HTML2Text):
+    """
+    HTML to markdown converter that is fed the page piece by piece and reports when it has produced enough.
+
+    html2text already drops script and style contents and resolves links and images against `baseurl`, so a
+    single parse replaces the BeautifulSoup pass plus the second parse of `str(soup)`. With `max_length` set,
+    `feed` returns True as soon as more than `max_length` characters of markdown exist, and the rest of the
+    page never needs to be parsed (or downloaded).
+
+    Args:
+        baseurl (str): URL of the page, for absolute links.
+        include_images (bool): Whether to keep image references.
+        max_length (int | None): Markdown length after which conversion can stop. None converts everything.
+    """
+
+    def __init__(self, baseurl, include_images=True, max_length=None):
+        super().__init__(baseurl=baseurl, bodywidth=0)
+        self.ignore_images = not include_images
+        self.ignore_emphasis = False
+        self.ignore_links = False
+        self.ignore_tables = False
+        self.max_length = max_length
+        self.produced = 0
+        self.done = False
+
+    def outtextf(self, s):
+        super().outtextf(s)
+        self.produced += len(s)
+
+    def feed(self, data):
+        if self.done:
+            return True
+        super().feed(data)
+        if self.max_length and self.produced > self.max_length:
+            self.done = len(''.join(self.outtextlist).lstrip()) > self.max_length
+        return self.done
+
+    def result(self):
+        """Flushes the converter and returns the markdown produced so far."""
+        if self.rawdata.startswith('<'):
+            # A tag cut off where reading stopped; flushing it would emit it as text
+            self.rawdata = ''
+        markdown = self.optwrap(self.finish())
+        return pad_tables_in_text(markdown) if self.pad_tables else markdown
+
+
+def convert_html(html, url, include_images=True, max_length=None):
+    """
+    Converts an HTML string to markdown in one pass, stopping once more than `max_length` characters exist.
+    """
+    converter = StreamingMarkdownConverter(url, include_images, max_length)
+    for start in range(0, len(html), CHUNK_CHARS):
+        if converter.feed(html[start:start + CHUNK_CHARS]):
+            break
+    return converter.result()
+
+
+async def stream_markdown(url, include_images=True, max_length=None, headers=None, max_bytes=FETCH_MAX_BYTES):
+    """
+    Downloads and converts a page at the same time, and stops downloading once the markdown is long enough or
+    `max_bytes` have been read.
+
+    Raises:
+        httpx.HTTPStatusError: If the server answers with an error status.
+    """
+    converter = StreamingMarkdownConverter(url, include_images, max_length)
+    async with get_http_client().stream('GET', url, headers=headers) as response:
+        response.raise_for_status()
+        async for text in iter_text(response, max_bytes):
+            if converter.feed(text):
+                break
+    return converter.result()
+
+
+async def fetch_markdown(url, include_images=True, max_length=None, headers=None):
+    """
+    Returns the markdown of a page, holding at least `max_length` characters when the page has that many.
+
+    With the web cache enabled the (capped) page body is read in full so it can be cached and revalidated, and
+    markdown already converted from an unchanged body is reused. Without it the page is converted while it
+    downloads.
+    """
+    cache = get_web_cache()
+    if cache is None:
+        return await stream_markdown(url, include_images, max_length, headers)
+    html, digest = await cache.fetch(url, headers)
+    options = (url, headers, include_images, max_length)
+    markdown = cache.get_markdown(digest, *options)
+    if markdown is None:
+        markdown = convert_html(html, url, include_images, max_length)
+        cache.set_markdown(digest, markdown, *options)
+    return markdown
@@ -0,0 +1,158 @@
+import asyncio
+import codecs
+import importlib.util
+import os
+
+import httpx
+
+from common.loop_clients import LoopBoundRegistry
+
+# Defaults, overridable with the environment variables of the same name.
+FETCH_HTTP2 = os.getenv("FETCH_HTTP2", "1") == "1"
+FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "20"))
+FETCH_PER_HOST_LIMIT = int(os.getenv("FETCH_PER_HOST_LIMIT", "4"))
+FETCH_KEEPALIVE_EXPIRY = float(os.getenv("FETCH_KEEPALIVE_EXPIRY", "30"))
+FETCH_CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+FETCH_READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", "10"))
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+FETCH_BATCH_CONCURRENCY = int(os.getenv("FETCH_BATCH_CONCURRENCY", "8"))
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives the host slot back once the body has been read or closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport so that at most `per_host_limit` requests to the same host are in flight at once.
+
+    A request holds its slot until its response body is closed, which httpx does after reading it.
+
+    Args:
+        transport (httpx.AsyncBaseTransport): The transport doing the actual requests.
+        per_host_limit (int): Concurrent requests allowed per (scheme, host, port).
+    """
+
+    def __init__(self, transport, per_host_limit=FETCH_PER_HOST_LIMIT):
+        self._transport = transport
+        self.per_host_limit = per_host_limit
+        self._semaphores = {}
+
+    def _semaphore(self, url):
+        key = (url.scheme, url.host, url.port)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.per_host_limit)
+        return self._semaphores[key]
+
+    async def handle_async_request(self, request):
+        semaphore = self._semaphore(request.url)
+        await semaphore.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def create_http_client(http2=FETCH_HTTP2, max_connections=FETCH_MAX_CONNECTIONS, per_host_limit=FETCH_PER_HOST_LIMIT,
+                       keepalive_expiry=FETCH_KEEPALIVE_EXPIRY, connect_timeout=FETCH_CONNECT_TIMEOUT,
+                       read_timeout=FETCH_READ_TIMEOUT):
+    """
+    Builds an AsyncClient with keep-alive, optional HTTP/2 and a per-host concurrency limit.
+
+    HTTP/2 needs the `h2` package (pip install httpx[http2]); without it the client falls back to HTTP/1.1.
+
+    Returns:
+        httpx.AsyncClient: The new client.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2 and importlib.util.find_spec("h2") is not None,
+        limits=limits,
+    )
+    return httpx.AsyncClient(
+        transport=HostLimitedTransport(transport, per_host_limit),
+        headers=DEFAULT_HEADERS,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
+
+# The shared client, bound to the event loop it was first used on.
+_registry = LoopBoundRegistry(lambda client: client.aclose(), 'HTTP client')
+
+
+def get_http_client():
+    """
+    Returns the shared AsyncClient of the web tools, creating it on first use.
+
+    Every fetch reuses its connections, DNS results and TLS sessions. The client is only rebuilt when it was
+    closed or the event loop it was bound to has been closed, e.g. after an `asyncio.run` call returned; it is
+    closed when that loop shuts down.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    return _registry.get('default', create_http_client, is_stale=lambda client: client.is_closed)
+
+
+async def close_http_client():
+    """
+    Closes the shared client. Call this once at shutdown.
+    """
+    await _registry.close_all()
+
+
+async def iter_text(response, max_bytes=FETCH_MAX_BYTES):
+    """
+    Yields the decoded body of a streamed response, reading at most `max_bytes` (after content decoding).
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    received = 0
+    async for chunk in response.aiter_bytes():
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+        if received >= max_bytes:
+            break
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
@@ -1,23 +1,37 @@
 import asyncio
+import sys
+from pathlib import Path
 import os
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Union
 from dotenv import load_dotenv
 from autogen_agentchat.agents import AssistantAgent
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_core.tools import FunctionTool
 import httpx
-from bs4 import BeautifulSoup
-import html2text
-from urllib.parse import urljoin
+# The repository root holds the common/ modules shared with the other projects
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.llm_cache import DiskLRUStore, RecordReplayChatCompletionCache
+from http_client import FETCH_BATCH_CONCURRENCY, close_http_client
+from html_markdown import fetch_markdown
+from tool_runtime import ExecutorFunctionTool, shutdown_tool_executors, tool_stats
+from text_files import READ_MAX_BYTES, iter_chunks, read_lines, search_lines
+import summarizer
+from summarizer import SUMMARY_LENGTH
+from calculator import evaluate, evaluate_many
 
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
+cache_mode = os.getenv("LLM_CACHE_MODE", "off")
+if not api_key and cache_mode != "replay":
     raise ValueError("OPENAI_API_KEY environment variable is not set.")
 
 # Initialize the OpenAI model client
-openai_client = OpenAIChatCompletionClient(model="gpt-4o-mini", api_key=api_key)
+openai_client = OpenAIChatCompletionClient(model="gpt-4o-mini", api_key=api_key or "replay")
+# Optionally record responses to disk or replay them offline (LLM_CACHE_MODE=record|replay)
+if cache_mode != "off":
+    openai_client = RecordReplayChatCompletionCache(
+        openai_client, DiskLRUStore(os.getenv("LLM_CACHE_DIR", ".llm_cache")), mode=cache_mode
+    )
 
 # Define custom functions
 def reverse_string(text: str) -> str:
@@ -35,31 +49,61 @@ def reverse_string(text: str) -> str:
     return text[::-1]
 
 def summarize_text(text: str, max_length: int = 100) -> str:
-    """Summarize a text by truncating it to a specified length.
+    """Summarize a text by keeping its most central sentences within a length budget.
     
     Args:
         text: The input text to summarize.
         max_length: Maximum length of the summary (default: 100 characters).
     
     Returns:
-        str: The summarized text, truncated to max_length with '...' appended if truncated.
+        str: The text itself if it fits; otherwise its best-ranked sentences in their original order, or the
+            text truncated to max_length with '...' appended if no sentence fits.
     
     Example:
         Input: "This is a long text about AI.", max_length=20
         Output: "This is a long text..."
     """
-    if len(text) <= max_length:
-        return text
+    # Ranked locally (TF-IDF + TextRank), so long texts never need to go to the model to be condensed
+    summary = summarizer.summarize(text, max_length)
+    if summary:
+        return summary
     return text[:max_length].rsplit(" ", 1)[0] + "..."
 
-def read_text_file(file_path: str) -> str:
-    """Read the contents of a text file.
+def summarize_text_file(file_path: str, max_length: int = SUMMARY_LENGTH) -> str:
+    """Summarize a text file of any size by keeping its most central sentences within a length budget.
+    
+    Args:
+        file_path: Path to the text file (.txt or .md) to summarize.
+        max_length: Maximum length of the summary (default: SUMMARY_LENGTH, 1000 characters).
+    
+    Returns:
+        str: The file's best-ranked sentences in their original order.
+    
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a text file.
+    
+    Example:
+        Input: "notes.md", max_length=300
+        Output: The most representative sentences of notes.md, up to 300 characters.
+    """
+    # Streamed through the memory-mapped file chunk by chunk, whatever its size
+    return summarizer.summarize_chunks(iter_chunks(file_path), max_length)
+
+def read_text_file(
+    file_path: str, start_line: int = 1, end_line: Optional[int] = None, offset: Optional[int] = None, limit: int = READ_MAX_BYTES
+) -> str:
+    """Read a text file, or part of it for large files.
     
     Args:
         file_path: Path to the text file to read.
+        start_line: First line to return, 1-based (default: 1).
+        end_line: Last line to return, inclusive (if None, read until limit is reached).
+        offset: Byte offset to start at instead of start_line (if None, start_line is used).
+        limit: Maximum number of bytes to return (default: READ_MAX_BYTES).
     
     Returns:
-        str: The contents of the file.
+        str: The contents of the file, or of the requested part followed by a note on how to continue.
     
     Raises:
         FileNotFoundError: If the file does not exist.
@@ -69,22 +113,45 @@ def read_text_file(file_path: str) -> str:
         Input: "data.txt" (containing "Hello from file!")
         Output: "Hello from file!"
     """
-    if not file_path.endswith((".txt", ".md")):
-        raise ValueError("Only .txt and .md files are supported.")
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            return file.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"File not found: {file_path}")
+    # Memory-mapped with a cached line index: only the requested lines are read, whatever the file size
+    return read_lines(file_path, start_line, end_line, offset, limit)
+
+def search_text_file(
+    file_path: str, pattern: str, regex: bool = False, ignore_case: bool = False, context_lines: int = 2, max_matches: int = 50
+) -> str:
+    """Search a text file for a pattern and return the matching lines with context.
+    
+    Args:
+        file_path: Path to the text file to search.
+        pattern: Text to look for, or a regular expression if regex is True.
+        regex: Whether pattern is a regular expression (default: False).
+        ignore_case: Whether to ignore case (default: False).
+        context_lines: Lines shown before and after each match (default: 2).
+        max_matches: Maximum number of matching lines (default: 50).
+    
+    Returns:
+        str: Matching lines with their line numbers, '>' marking the matches, or "No matches.".
+    
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not a text file.
+    
+    Example:
+        Input: "server_log.txt", pattern="ERROR", context_lines=0
+        Output: ">1042: ERROR connection refused"
+    """
+    return search_lines(file_path, pattern, regex, ignore_case, context_lines, max_matches)
 
-def calculate_expression(expression: str) -> float:
-    """Evaluate a basic arithmetic expression.
+def calculate_expression(expression: str, variables: Optional[Dict[str, List[float]]] = None) -> Union[float, List[float]]:
+    """Evaluate an arithmetic expression, optionally over arrays of variable values.
     
     Args:
-        expression: A string containing a basic arithmetic expression (e.g., '2 + 3 * 4').
+        expression: An arithmetic expression (e.g., '2 + 3 * 4'), which may use variables and the functions
+            abs, sqrt, exp, log, log10, sin, cos, tan, floor, ceil, round and the constants pi and e.
+        variables: Values of the variables in the expression, as lists of equal length (if None, no variables).
     
     Returns:
-        float: The result of the evaluated expression.
+        float | list[float]: The result, or one result per position of the variable lists.
     
     Raises:
         ValueError: If the expression is invalid.
@@ -92,23 +159,39 @@ def calculate_expression(expression: str) -> float:
     Example:
         Input: "2 + 3 * 4"
         Output: 14.0
+        Input: "price * (1 + rate)", variables={"price": [10, 20], "rate": [0.1, 0.2]}
+        Output: [11.0, 24.0]
     """
-    try:
-        allowed_chars = set("0123456789 +-*/.()")
-        if not all(c in allowed_chars for c in expression):
-            raise ValueError("Invalid characters in expression.")
-        result = eval(expression, {"__builtins__": {}})  # Disable built-ins for safety
-        return float(result)
-    except Exception as e:
-        raise ValueError(f"Invalid expression: {str(e)}")
+    # Parsed and checked once per expression; variable arrays are evaluated in one vectorized pass
+    return evaluate(expression, variables)
 
-async def fetch_webpage(url: str, include_images: bool = True, max_length: Optional[int] = None) -> str:
+def calculate_expressions(expressions: List[str]) -> str:
+    """Evaluate several arithmetic expressions at once.
+    
+    Args:
+        expressions: The expressions to evaluate, e.g. ['2 + 3 * 4', '10 / 4'].
+    
+    Returns:
+        str: One line per expression, in the given order, with its result or error.
+    
+    Example:
+        Input: ["2 + 3 * 4", "10 / 0"]
+        Output: "2 + 3 * 4 = 14.0\n10 / 0 = Error: Result is not a finite number."
+    """
+    results = evaluate_many(expressions)
+    return "\n".join(f"{expression} = {result}" for expression, result in zip(expressions, results))
+
+async def fetch_webpage(
+    url: str, include_images: bool = True, max_length: Optional[int] = None, summarize: bool = False
+) -> str:
     """Fetch a webpage and convert it to markdown format.
     
     Args:
         url: The URL of the webpage to fetch.
         include_images: Whether to include image references in the markdown (default: True).
         max_length: Maximum length of the output markdown (if None, no limit).
+        summarize: Return the page's most central sentences within max_length (default SUMMARY_LENGTH if
+            max_length is None) instead of its beginning (default: False).
     
     Returns:
         str: Markdown version of the webpage content.
@@ -120,65 +203,109 @@ async def fetch_webpage(url: str, include_images: bool = True, max_length: Optio
         Input: "https://example.com", include_images=False, max_length=100
         Output: Markdown content of the webpage, truncated to 100 characters.
     """
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            for script in soup(["script", "style"]):
-                script.decompose()
-            for tag in soup.find_all(["a", "img"]):
-                if tag.get("href"):
-                    tag["href"] = urljoin(url, tag["href"])
-                if tag.get("src"):
-                    tag["src"] = urljoin(url, tag["src"])
-
-            h2t = html2text.HTML2Text()
-            h2t.body_width = 0
-            h2t.ignore_images = not include_images
-            h2t.ignore_emphasis = False
-            h2t.ignore_links = False
-            markdown = h2t.handle(str(soup))
-
-            if max_length and len(markdown) > max_length:
-                markdown = markdown[:max_length].rsplit(" ", 1)[0] + "..."
-            return markdown.strip()
+        # One streaming pass over the page, served from the on-disk cache when the page is unchanged
+        if summarize:
+            # The whole page is converted, then condensed locally before it reaches the model
+            markdown = await fetch_markdown(url, include_images)
+            return summarizer.summarize(markdown, max_length or SUMMARY_LENGTH).strip()
+        markdown = await fetch_markdown(url, include_images, max_length)
+        if max_length and len(markdown) > max_length:
+            markdown = markdown[:max_length].rsplit(" ", 1)[0] + "..."
+        return markdown.strip()
 
     except httpx.RequestError as e:
         raise ValueError(f"Failed to fetch webpage: {str(e)}")
     except Exception as e:
         raise ValueError(f"Error processing webpage: {str(e)}")
 
-# Register tools
-reverse_tool = FunctionTool(
+async def fetch_webpages(
+    urls: List[str], include_images: bool = True, max_length: Optional[int] = None, summarize: bool = False
+) -> str:
+    """Fetch several webpages concurrently and convert each of them to markdown format.
+    
+    Args:
+        urls: The URLs of the webpages to fetch.
+        include_images: Whether to include image references in the markdown (default: True).
+        max_length: Maximum length of each page's markdown (if None, no limit).
+        summarize: Return each page's most central sentences instead of its beginning (default: False).
+    
+    Returns:
+        str: One section per URL, in the given order, holding its markdown or the error that URL ran into.
+    
+    Example:
+        Input: ["https://example.com", "https://example.org"], max_length=100
+        Output: "## https://example.com\n<markdown>\n\n## https://example.org\nError: <reason>"
+    """
+    # At most FETCH_BATCH_CONCURRENCY pages at once; the shared client also limits requests per host
+    semaphore = asyncio.Semaphore(FETCH_BATCH_CONCURRENCY)
+
+    async def fetch_one(url):
+        async with semaphore:
+            try:
+                return await fetch_webpage(url, include_images, max_length, summarize)
+            except ValueError as e:
+                return f"Error: {str(e)}"
+
+    pages = await asyncio.gather(*(fetch_one(url) for url in urls))
+    return "\n\n".join(f"## {url}\n{page}" for url, page in zip(urls, pages))
+
+# Register tools; each declares where it runs: inline on the event loop or on a thread (blocking I/O,
+# NumPy work), with a per-call timeout in seconds
+reverse_tool = ExecutorFunctionTool(
     reverse_string,
-    description="Reverses the order of characters in a given text string."
+    description="Reverses the order of characters in a given text string.",
+    mode="inline"
 )
-summarize_tool = FunctionTool(
+summarize_tool = ExecutorFunctionTool(
     summarize_text,
-    description="Summarizes a given text to a specified length by truncating it."
+    description="Summarizes a given text to a specified length by keeping its most central sentences.",
+    mode="thread"
 )
-file_read_tool = FunctionTool(
+file_read_tool = ExecutorFunctionTool(
     read_text_file,
-    description="Reads the contents of a text file (.txt or .md) and returns them as a string."
+    description="Reads a text file (.txt or .md); large files are returned in parts selected by line range or byte offset.",
+    mode="thread"
+)
+file_summary_tool = ExecutorFunctionTool(
+    summarize_text_file,
+    description="Summarizes a text file (.txt or .md) of any size locally, returning its most central sentences.",
+    mode="thread",
+    timeout=None
 )
-calc_tool = FunctionTool(
+file_search_tool = ExecutorFunctionTool(
+    search_text_file,
+    description="Searches a text file (.txt or .md) for a pattern and returns only the matching lines with context.",
+    mode="thread"
+)
+calc_tool = ExecutorFunctionTool(
     calculate_expression,
-    description="Evaluates a basic arithmetic expression (e.g., '2 + 3 * 4')."
+    description="Evaluates an arithmetic expression (e.g., '2 + 3 * 4'), or one expression over lists of variable values in a single call.",
+    mode="thread",
+    timeout=5
+)
+calc_batch_tool = ExecutorFunctionTool(
+    calculate_expressions,
+    description="Evaluates a list of arithmetic expressions in one call; use it instead of repeated calculate_expression calls.",
+    mode="thread",
+    timeout=5
 )
-fetch_webpage_tool = FunctionTool(
+fetch_webpage_tool = ExecutorFunctionTool(
     fetch_webpage,
     description="Fetches a webpage and converts its content to markdown format."
 )
+fetch_webpages_tool = ExecutorFunctionTool(
+    fetch_webpages,
+    description="Fetches several webpages at once and converts each to markdown; use it instead of repeated fetch_webpage calls when more than one page is needed.",
+    timeout=None
+)
 
 # Create agent
 agent = AssistantAgent(
     name="MultiToolAgent",
     model_client=openai_client,
-    system_message="You are a helpful assistant that can reverse text, summarize text, read files, perform calculations, and fetch webpages using the provided tools.",
-    tools=[reverse_tool, summarize_tool, file_read_tool, calc_tool, fetch_webpage_tool],
+    system_message="You are a helpful assistant that can reverse text, summarize text, read and search files, perform calculations, and fetch webpages using the provided tools. When you need several webpages or calculations, batch them with fetch_webpages or calculate_expressions. To get the gist of a long page or file, use summarize=True on fetch_webpage or summarize_text_file instead of reading it whole.",
+    tools=[reverse_tool, summarize_tool, file_read_tool, file_search_tool, file_summary_tool, calc_tool, calc_batch_tool, fetch_webpage_tool, fetch_webpages_tool],
     reflect_on_tool_use=True,
 )
 
@@ -192,6 +319,11 @@ async def main():
         print(f"Agent Response: {result.messages[-1].content}")
     except Exception as e:
         print(f"Error running agent: {str(e)}")
+    finally:
+        print(tool_stats.summary())
+        await openai_client.close()
+        await close_http_client()
+        shutdown_tool_executors()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,23 +1,33 @@
 import asyncio
+import sys
+from pathlib import Path
 from autogen_agentchat.agents import AssistantAgent
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core.tools import FunctionTool
 import os
 from dotenv import load_dotenv
 from typing import Optional, Dict
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import httpx
-import html2text
+# The repository root holds the common/ modules shared with the other projects
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.llm_cache import DiskLRUStore, RecordReplayChatCompletionCache
+from http_client import DEFAULT_HEADERS, close_http_client
+from html_markdown import fetch_markdown
 
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
+cache_mode = os.getenv("LLM_CACHE_MODE", "off")
+if not api_key and cache_mode != "replay":
     raise ValueError("Please set the OPENAI_API_KEY environment variable.")
 
 # Initialize the OpenAI model client
-openai_client = OpenAIChatCompletionClient(model="gpt-4o-mini", api_key=api_key)
+openai_client = OpenAIChatCompletionClient(model="gpt-4o-mini", api_key=api_key or "replay")
+# Optionally record responses to disk or replay them offline (LLM_CACHE_MODE=record|replay)
+if cache_mode != "off":
+    openai_client = RecordReplayChatCompletionCache(
+        openai_client, DiskLRUStore(os.getenv("LLM_CACHE_DIR", ".llm_cache")), mode=cache_mode
+    )
 
 # Define a custom function to reverse a string
 def reverse_string(text: str,) -> str:
@@ -43,44 +53,17 @@ async def fetch_webpage(
     """
     # Use default headers if none provided
     if headers is None:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+        headers = DEFAULT_HEADERS
 
     try:
-        # Fetch the webpage
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            # Parse HTML
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            # Convert relative URLs to absolute
-            for tag in soup.find_all(["a", "img"]):
-                if tag.get("href"):
-                    tag["href"] = urljoin(url, tag["href"])
-                if tag.get("src"):
-                    tag["src"] = urljoin(url, tag["src"])
-
-            # Configure HTML to Markdown converter
-            h2t = html2text.HTML2Text()
-            h2t.body_width = 0  # No line wrapping
-            h2t.ignore_images = not include_images
-            h2t.ignore_emphasis = False
-            h2t.ignore_links = False
-            h2t.ignore_tables = False
-
-            # Convert to markdown
-            markdown = h2t.handle(str(soup))
-
-            # Trim if max_length is specified
-            if max_length and len(markdown) > max_length:
-                markdown = markdown[:max_length] + "\n...(truncated)"
-
-            return markdown.strip()
+        # Fetch and convert the webpage in one streaming pass; unchanged pages come from the on-disk cache
+        markdown = await fetch_markdown(url, include_images, max_length, headers)
+
+        # Trim if max_length is specified
+        if max_length and len(markdown) > max_length:
+            markdown = markdown[:max_length] + "\n...(truncated)"
+
+        return markdown.strip()
 
     except httpx.RequestError as e:
         raise ValueError(f"Failed to fetch webpage: {str(e)}") from e
@@ -104,9 +87,13 @@ task = "Reverse the text 'Hello, how are you?'"
 
 # Run the agent
 async def main():
-    result = await agent.run(task=task)
-    
-    print(f"Agent Response: {result.messages[-1].content}")
+    try:
+        result = await agent.run(task=task)
+
+        print(f"Agent Response: {result.messages[-1].content}")
+    finally:
+        await openai_client.close()
+        await close_http_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,170 @@
+import os
+import re
+
+import numpy as np
+
+# Default summary length, overridable with the environment variable of the same name.
+SUMMARY_LENGTH = int(os.getenv("SUMMARY_LENGTH", "1000"))
+# Sentences ranked together; larger inputs are ranked batch by batch, keeping each batch's best sentences.
+BATCH_SENTENCES = 400
+# Sentences shorter than this (characters or words) are navigation or list noise rather than content.
+MIN_SENTENCE_CHARS = 20
+MIN_SENTENCE_WORDS = 4
+# A sentence this similar (cosine) to one already in the summary adds nothing and is skipped.
+REDUNDANCY = 0.7
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9])')
+# Words start with a letter; bare numbers (list numbering, years) would make near-identical sentences look unrelated
+WORD = re.compile(r'[a-z][a-z0-9]*')
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or that the this to was were which with '
+    'will not can we you they he she i our their there these those been into than then also such more'.split()
+)
+
+
+def split_sentences(text):
+    """Splits text into sentences at line breaks and sentence punctuation, dropping short fragments."""
+    for line in text.splitlines():
+        for sentence in SENTENCE_END.split(line.strip()):
+            sentence = sentence.strip()
+            if len(sentence) >= MIN_SENTENCE_CHARS and len(sentence.split()) >= MIN_SENTENCE_WORDS:
+                yield sentence
+
+
+def rank_sentences(sentences):
+    """
+    TextRank over TF-IDF vectors: sentences are scored by PageRank on their cosine-similarity graph.
+
+    Returns:
+        numpy.ndarray: One score per sentence; the scores sum to 1.
+    """
+    return _rank(sentences)[0]
+
+
+def _rank(sentences):
+    # Returns the scores and the unit TF-IDF vectors restricted to shared words (None when nothing is shared)
+    count = len(sentences)
+    if count <= 2:
+        return np.full(count, 1 / max(count, 1)), None
+    vocabulary = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for word in WORD.findall(sentence.lower()):
+            if word not in STOP_WORDS:
+                rows.append(row)
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+    if not vocabulary:
+        return np.full(count, 1 / count), None
+
+    # TF-IDF weight of every (sentence, word) cell, kept sparse
+    width = len(vocabulary)
+    cells, counts = np.unique(np.asarray(rows) * width + np.asarray(columns), return_counts=True)
+    cell_rows, cell_columns = cells // width, cells % width
+    document_frequency = np.bincount(cell_columns, minlength=width)
+    weights = np.log1p(counts) * (np.log((1 + count) / (1 + document_frequency[cell_columns])) + 1)
+    norms = np.sqrt(np.bincount(cell_rows, weights ** 2, minlength=count))
+    weights /= np.where(norms > 0, norms, 1)[cell_rows]
+
+    # Words found in a single sentence add nothing to any similarity, so only shared words are laid out densely
+    shared = document_frequency > 1
+    if not shared.any():
+        return np.full(count, 1 / count), None
+    compact = np.cumsum(shared) - 1
+    keep = shared[cell_columns]
+    vectors = np.zeros((count, int(shared.sum())))
+    vectors[cell_rows[keep], compact[cell_columns[keep]]] = weights[keep]
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    # A sentence sharing no words with the others links to every sentence evenly
+    transition = np.where(totals > 0, similarity / np.where(totals > 0, totals, 1), 1 / count)
+
+    scores = np.full(count, 1 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated, vectors
+        scores = updated
+    return scores, vectors
+
+
+def _select(candidates, max_length):
+    # candidates are (position, sentence); keep the best-ranked ones that fit, in their original order.
+    # Repeated sentences (boilerplate) would reinforce each other, so only the first occurrence is ranked.
+    first = {}
+    for candidate in candidates:
+        first.setdefault(candidate[1], candidate)
+    candidates = list(first.values())
+    scores, vectors = _rank([sentence for _, sentence in candidates])
+    chosen, used = [], 0
+    for index in np.argsort(-scores, kind='stable'):
+        length = len(candidates[index][1]) + (1 if chosen else 0)
+        if used + length > max_length:
+            continue
+        if vectors is not None and chosen and (vectors[chosen] @ vectors[index]).max() >= REDUNDANCY:
+            continue
+        chosen.append(index)
+        used += length
+    return sorted(candidates[index] for index in chosen)
+
+
+def _last_sentence_start(text, scanned=0):
+    # Where the last sentence of `text` starts: it may continue in the next chunk, everything before is complete.
+    # The first `scanned` characters are known to hold no sentence end, so a long unfinished sentence is not rescanned.
+    start = text.rfind('\n') + 1
+    for match in SENTENCE_END.finditer(text, max(start, scanned)):
+        start = match.end()
+    return start
+
+
+def summarize_chunks(chunks, max_length):
+    """
+    Extractive summary of text arriving in pieces (e.g. windows of a large file), holding at most `max_length`
+    characters.
+
+    Sentences are split off as the chunks arrive, and only the trailing, possibly unfinished sentence is held
+    back. They are ranked in batches of BATCH_SENTENCES, so memory stays bounded whatever the input size, even
+    for text without line breaks; each batch only passes on the sentences that could make the summary, and
+    those are ranked again together.
+
+    Returns:
+        str: The selected sentences in their original order, joined by spaces.
+    """
+    candidates, batch, position = [], [], 0
+
+    def add(text):
+        nonlocal candidates, batch, position
+        for sentence in split_sentences(text):
+            batch.append((position, sentence))
+            position += 1
+            if len(batch) == BATCH_SENTENCES:
+                candidates.extend(_select(batch, max_length))
+                batch = []
+                if len(candidates) >= BATCH_SENTENCES:
+                    candidates = _select(candidates, max_length)
+
+    tail = ''
+    for chunk in chunks:
+        text = tail + chunk
+        cut = _last_sentence_start(text, len(tail.rstrip()))
+        tail = text[cut:]
+        add(text[:cut])
+    add(tail)
+    candidates.extend(batch)
+    chosen = _select(candidates, max_length) if candidates else []
+    return ' '.join(sentence for _, sentence in chosen)
+
+
+def summarize(text, max_length):
+    """
+    Extractive summary of `text` in at most `max_length` characters; text that already fits is returned as is.
+
+    Returns:
+        str: The best-ranked sentences in their original order, or an empty string when none fits.
+    """
+    if len(text) <= max_length:
+        return text
+    return summarize_chunks([text], max_length)
@@ -0,0 +1,82 @@
+import pytest
+
+from calculator import compile_expression, evaluate, evaluate_many
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2 + 3 * 4", 14.0),
+    ("-(2 ** 3) % 5", 2.0),
+    ("sqrt(16) + abs(-2) + floor(2.5)", 8.0),
+    ("round(pi * 100) / 100", 3.14),
+    pytest.param("1" + "+1" * 300, 301.0, id="flat sum"),
+    pytest.param("1" + "-1*2" * 300, -599.0, id="flat mixed chain"),
+])
+def test_evaluate(expression, expected):
+    assert evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "pi.real",
+    "(1).__class__",
+    "_c0 + 1",
+    "__import__('os')",
+    "x._y",
+    "print(1)",
+    "max(1, 2)",
+    "sqrt(4, 2)",
+    "abs(x=1)",
+    "(lambda: 1)()",
+    "[1, 2]",
+    "1 if x else 2",
+    "1 < 2",
+    "'text'",
+    "True + 1",
+    "2 @ 3",
+    "sqrt",
+    "-" * 300 + "1",
+    "(" * 250 + "1" + ")" * 250,
+    "1 +",
+])
+def test_disallowed_syntax_is_rejected(expression):
+    with pytest.raises(ValueError):
+        evaluate(expression, {"x": 1})
+
+
+@pytest.mark.parametrize("expression", ["(-8) ** 0.5", "(-8) ** (1 / 3)", "floor((-8) ** 0.5)"])
+def test_complex_results_are_rejected(expression):
+    with pytest.raises(ValueError, match="not a real number"):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize("expression", ["1 / 0", "log(0)", "9 ** 9 ** 9"])
+def test_non_finite_results_are_rejected(expression):
+    with pytest.raises(ValueError):
+        evaluate(expression)
+
+
+def test_variables_are_evaluated_element_wise():
+    assert evaluate("x * 2 + y", {"x": [1, 2, 3], "y": 1}) == [3.0, 5.0, 7.0]
+    with pytest.raises(ValueError, match="Missing values for: y"):
+        evaluate("x + y", {"x": 1})
+
+
+def test_expressions_differing_in_numbers_share_a_template():
+    first, second = compile_expression("2 + 3 * 4"), compile_expression("5.5 + 6 * 1e2")
+    assert first[2] == second[2] == "_c0 + _c1 * _c2"
+    assert first[0] is second[0]
+    assert second[1] == (5.5, 6.0, 100.0)
+
+
+def test_evaluate_many_batches_templates_and_keeps_order():
+    results = evaluate_many(["2 + 3 * 4", "sqrt(16)", "5 + 6 * 2", "1 / 0", "x + 1", "pi.real", "7 + 1 * 1"])
+    assert results[:3] == [14.0, 4.0, 17.0]
+    assert results[3] == "Error: Result is not a finite number."
+    assert results[4] == "Error: Unknown names: x"
+    assert results[5].startswith("Error: Unsupported syntax")
+    assert results[6] == 8.0
+
+
+def test_evaluate_many_rejects_complex_results():
+    # NumPy arrays give nan rather than a complex number, which is reported as not finite
+    results = evaluate_many(["(-8) ** 0.5", "(-27) ** 0.5", "floor((-8) ** 0.5)"])
+    assert all(result.startswith("Error: Result is not a") for result in results)
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+from autogen_core import CancellationToken
+
+from tool_runtime import ExecutorFunctionTool, ToolStats
+
+
+def blocking_sleep(seconds: float) -> str:
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+def reverse(text: str) -> str:
+    return text[::-1]
+
+
+def test_thread_tools_leave_the_event_loop_free_and_run_in_parallel():
+    stats = ToolStats()
+    tool = ExecutorFunctionTool(blocking_sleep, description="Sleeps.", mode='thread', stats=stats)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(tool.run_json({"seconds": 0.3}, CancellationToken()) for _ in range(3)))
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+    assert results == ["slept 0.3"] * 3
+    assert elapsed < 0.6
+    assert ticks >= 10
+    assert stats.calls["blocking_sleep"]["calls"] == 3
+
+
+def test_timeout_is_reported_and_recorded():
+    stats = ToolStats()
+    tool = ExecutorFunctionTool(blocking_sleep, description="Sleeps.", mode='thread', timeout=0.05, stats=stats)
+    with pytest.raises(TimeoutError, match="blocking_sleep did not finish within 0.05 seconds"):
+        asyncio.run(tool.run_json({"seconds": 0.5}, CancellationToken()))
+    assert stats.calls["blocking_sleep"]["timeouts"] == 1
+
+
+def test_inline_tools_run_on_the_loop():
+    stats = ToolStats()
+    tool = ExecutorFunctionTool(reverse, description="Reverses.", mode='inline', stats=stats)
+    assert asyncio.run(tool.run_json({"text": "abc"}, CancellationToken())) == "cba"
+    assert stats.calls["reverse"]["calls"] == 1 and stats.calls["reverse"]["errors"] == 0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="mode must be one of"):
+        ExecutorFunctionTool(reverse, description="Reverses.", mode='process')
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web_cache import DiskSizeLRU, WebCache
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 05 Oct 2026 10:00:00 GMT'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # (path, status) of every request the server answered
+    requests = []
+
+    def do_GET(self):
+        headers = {'Cache-Control': 'max-age=0'}
+        if self.path == '/etag':
+            headers['ETag'] = ETAG
+            status = 304 if self.headers.get('If-None-Match') == ETAG else 200
+            body = 'etag page'
+        elif self.path == '/last-modified':
+            headers['Last-Modified'] = LAST_MODIFIED
+            status = 304 if self.headers.get('If-Modified-Since') == LAST_MODIFIED else 200
+            body = 'dated page'
+        elif self.path == '/fresh':
+            headers['Cache-Control'] = 'max-age=3600'
+            status, body = 200, 'fresh page'
+        elif self.path == '/language':
+            headers.update({'Cache-Control': 'max-age=3600', 'Vary': 'Accept-Language'})
+            status, body = 200, f"page in {self.headers.get('Accept-Language')}"
+        elif self.path == '/anything':
+            headers.update({'Cache-Control': 'max-age=3600', 'Vary': '*'})
+            status, body = 200, 'page that varies on anything'
+        else:
+            status, body = 404, 'not found'
+
+        self.requests.append((self.path, status))
+        data = body.encode('utf-8') if status != 304 else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch_all(cache, *requests):
+    async def run():
+        return [await cache.fetch(url, headers) for url, headers in requests]
+    return asyncio.run(run())
+
+
+def test_etag_revalidation_serves_the_cached_body(server, tmp_path):
+    cache = WebCache(tmp_path)
+    first, second = fetch_all(cache, (server + '/etag', None), (server + '/etag', None))
+    assert first == second and first[0] == 'etag page'
+    assert Handler.requests == [('/etag', 200), ('/etag', 304)]
+
+
+def test_last_modified_revalidation_serves_the_cached_body(server, tmp_path):
+    cache = WebCache(tmp_path)
+    first, second = fetch_all(cache, (server + '/last-modified', None), (server + '/last-modified', None))
+    assert first == second and first[0] == 'dated page'
+    assert Handler.requests == [('/last-modified', 200), ('/last-modified', 304)]
+
+
+def test_fresh_response_is_served_without_a_request(server, tmp_path):
+    cache = WebCache(tmp_path)
+    fetch_all(cache, (server + '/fresh', None), (server + '/fresh', None))
+    assert Handler.requests == [('/fresh', 200)]
+
+
+def test_response_is_only_reused_for_the_same_varied_headers(server, tmp_path, monkeypatch):
+    import http_client
+    monkeypatch.setitem(http_client.DEFAULT_HEADERS, 'Accept-Language', 'en')
+    cache = WebCache(tmp_path)
+    english, again = fetch_all(cache, (server + '/language', None), (server + '/language', None))
+    assert english[0] == again[0] == 'page in en'
+    assert Handler.requests == [('/language', 200)]
+
+    # Same URL and request headers, but the client now sends another language
+    monkeypatch.setitem(http_client.DEFAULT_HEADERS, 'Accept-Language', 'fr')
+    french, = fetch_all(cache, (server + '/language', None))
+    assert french[0] == 'page in fr'
+    assert Handler.requests == [('/language', 200), ('/language', 200)]
+
+
+def test_vary_star_is_not_stored(server, tmp_path):
+    cache = WebCache(tmp_path)
+    fetch_all(cache, (server + '/anything', None), (server + '/anything', None))
+    assert Handler.requests == [('/anything', 200), ('/anything', 200)]
+    assert cache.store.size == 0
+
+
+def test_disk_lru_evicts_least_recently_used_entries_by_size(tmp_path):
+    store = DiskSizeLRU(tmp_path, max_bytes=30)
+    for key in ('a', 'b', 'c'):
+        store.set(key, 'x' * 6)  # 8 bytes of JSON each
+    assert store.get('a') == 'x' * 6
+    store.set('d', 'x' * 6)
+    assert store.get('b') is None
+    assert [store.get(key) for key in ('a', 'c', 'd')] == ['x' * 6] * 3
+    assert store.size <= 30
+    assert sorted(path.stem for path in tmp_path.glob('*.json')) == ['a', 'c', 'd']
+
+
+def test_disk_lru_keeps_its_order_across_restarts(tmp_path):
+    store = DiskSizeLRU(tmp_path, max_bytes=30)
+    for key in ('a', 'b', 'c'):
+        store.set(key, 'x' * 6)
+    # Last accesses as file modification times: b, then c, then a
+    for key, accessed in (('b', 1000), ('c', 2000), ('a', 3000)):
+        os.utime(tmp_path / f"{key}.json", (accessed, accessed))
+    reopened = DiskSizeLRU(tmp_path, max_bytes=20)
+    assert reopened.get('b') is None
+    assert reopened.get('a') == 'x' * 6
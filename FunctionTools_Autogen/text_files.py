@@ -0,0 +1,214 @@
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Defaults, overridable with the environment variables of the same name.
+READ_MAX_BYTES = int(os.getenv("READ_MAX_BYTES", "20000"))
+
+# Every LINE_STRIDE-th line start is kept in the index; other lines are found from the nearest one.
+LINE_STRIDE = 256
+# Bytes scanned at a time while building an index, so building it takes constant memory.
+SCAN_BYTES = 16 * 1024 * 1024
+# Files whose index is kept.
+INDEX_CACHE_SIZE = 32
+SUPPORTED_SUFFIXES = (".txt", ".md")
+
+
+class LineIndex:
+    """
+    Sparse line-offset index of a file: the byte offset of every LINE_STRIDE-th line and the line count.
+
+    Args:
+        mapped (mmap.mmap): The mapped file.
+    """
+
+    def __init__(self, mapped):
+        size = len(mapped)
+        checkpoints = [0]
+        newlines = 0
+        for start in range(0, size, SCAN_BYTES):
+            chunk = np.frombuffer(mapped, dtype=np.uint8, count=min(SCAN_BYTES, size - start), offset=start)
+            positions = np.flatnonzero(chunk == 10) + start
+            del chunk
+            ordinals = np.arange(newlines + 1, newlines + len(positions) + 1)
+            checkpoints.extend((positions[ordinals % LINE_STRIDE == 0] + 1).tolist())
+            newlines += len(positions)
+        self.checkpoints = checkpoints
+        self.size = size
+        self.line_count = newlines + (1 if size and mapped[size - 1] != 10 else 0)
+
+    def line_start(self, mapped, line):
+        """Byte offset where 0-based `line` starts; the file size for lines past the end."""
+        if line >= self.line_count:
+            return self.size
+        position = self.checkpoints[line // LINE_STRIDE]
+        for _ in range(line % LINE_STRIDE):
+            position = mapped.find(b"\n", position) + 1
+        return position
+
+    def line_of(self, mapped, position):
+        """0-based line holding byte `position`."""
+        low, high = 0, len(self.checkpoints) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.checkpoints[middle] <= position:
+                low = middle
+            else:
+                high = middle - 1
+        return low * LINE_STRIDE + mapped[self.checkpoints[low]:position].count(b"\n")
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _get_index(path, mapped):
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = LineIndex(mapped)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _check_path(file_path):
+    if not file_path.endswith(SUPPORTED_SUFFIXES):
+        raise ValueError("Only .txt and .md files are supported.")
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+
+def _open(file_path):
+    with open(file_path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _decode(data):
+    return data.decode("utf-8", errors="replace")
+
+
+def read_lines(file_path, start_line=1, end_line=None, offset=None, limit=READ_MAX_BYTES):
+    """
+    Reads part of a text file through a memory map, so only the requested bytes are loaded.
+
+    Either `start_line`/`end_line` (1-based, inclusive) or a byte `offset` selects where to start; at most
+    `limit` bytes are returned, cut at a line boundary when possible. A file that fits entirely is returned
+    as is; otherwise a footer says which part was returned and how to continue.
+
+    Returns:
+        str: The selected text.
+    """
+    _check_path(file_path)
+    if os.path.getsize(file_path) == 0:
+        return ""
+    mapped = _open(file_path)
+    try:
+        index = _get_index(file_path, mapped)
+        if offset is not None:
+            start = min(max(offset, 0), index.size)
+        else:
+            start = index.line_start(mapped, max(start_line, 1) - 1)
+        end = index.size if end_line is None else index.line_start(mapped, end_line)
+        if end - start > limit:
+            boundary = mapped.rfind(b"\n", start, start + limit)
+            end = boundary + 1 if boundary >= start else start + limit
+        text = _decode(mapped[start:end])
+        if start == 0 and end == index.size:
+            return text
+        first = index.line_of(mapped, start) + 1
+        last = max(first, index.line_of(mapped, max(end - 1, start)) + 1)
+        separator = "" if text.endswith("\n") else "\n"
+        footer = f"{separator}[lines {first}-{last} of {index.line_count}, bytes {start}-{end} of {index.size}"
+        if end < index.size and (end_line is None or last < end_line):
+            footer += f"; continue with start_line={last + 1}" if mapped[end - 1] == 10 else f"; continue with offset={end}"
+        return text + footer + "]"
+    finally:
+        mapped.close()
+
+
+def search_lines(file_path, pattern, regex=False, ignore_case=False, context_lines=2, max_matches=50):
+    """
+    Scans a text file through a memory map for `pattern` and returns only the matching lines with context.
+
+    Returns:
+        str: Matching lines prefixed with their line numbers ('>' marks a match), groups separated by '--'.
+    """
+    _check_path(file_path)
+    if os.path.getsize(file_path) == 0:
+        return "No matches."
+    # ^ and $ match at every line, since matches are reported per line
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    compiled = re.compile(pattern.encode("utf-8") if regex else re.escape(pattern.encode("utf-8")), flags)
+    mapped = _open(file_path)
+    try:
+        index = _get_index(file_path, mapped)
+        matches = []
+        position = 0
+        while len(matches) < max_matches:
+            match = compiled.search(mapped, position)
+            if match is None:
+                break
+            line = index.line_of(mapped, match.start())
+            matches.append(line)
+            # One hit per line is enough; go on from the next line
+            next_line = mapped.find(b"\n", match.start())
+            if next_line == -1:
+                break
+            position = next_line + 1
+
+        if not matches:
+            return "No matches."
+        groups = []
+        for line in matches:
+            first, last = max(line - context_lines, 0), min(line + context_lines, index.line_count - 1)
+            if groups and first <= groups[-1][1] + 1:
+                groups[-1][1] = last
+            else:
+                groups.append([first, last])
+        hits = set(matches)
+        blocks = []
+        for first, last in groups:
+            start, end = index.line_start(mapped, first), index.line_start(mapped, last + 1)
+            lines = _decode(mapped[start:end]).splitlines()
+            blocks.append("\n".join(
+                f"{'>' if first + i in hits else ' '}{first + i + 1}: {text}" for i, text in enumerate(lines)
+            ))
+        result = "\n--\n".join(blocks)
+        if len(matches) == max_matches:
+            result += f"\n[stopped after {max_matches} matches]"
+        return result
+    finally:
+        mapped.close()
+
+
+def iter_chunks(file_path, chunk_bytes=SCAN_BYTES):
+    """
+    Yields the decoded text of a file in pieces of about `chunk_bytes`, cut after a newline when possible, so
+    a large file can be processed with constant memory.
+    """
+    _check_path(file_path)
+    if os.path.getsize(file_path) == 0:
+        return
+    mapped = _open(file_path)
+    try:
+        start = 0
+        while start < len(mapped):
+            end = min(start + chunk_bytes, len(mapped))
+            if end < len(mapped):
+                boundary = mapped.rfind(b"\n", start, end)
+                end = boundary + 1 if boundary >= start else end
+            yield _decode(mapped[start:end])
+            start = end
+    finally:
+        mapped.close()
@@ -0,0 +1,121 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from autogen_core.tools import FunctionTool
+
+# Defaults, overridable with the environment variables of the same name.
+TOOL_THREAD_WORKERS = int(os.getenv("TOOL_THREAD_WORKERS", "8"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+
+EXECUTION_MODES = ('inline', 'thread')
+
+
+class ToolStats:
+    """
+    Per-tool call counts, failures, timeouts and latency.
+    """
+
+    def __init__(self):
+        self.calls = {}
+
+    def record(self, name, seconds, status):
+        entry = self.calls.setdefault(name, {'calls': 0, 'errors': 0, 'timeouts': 0, 'total': 0.0, 'max': 0.0})
+        entry['calls'] += 1
+        entry['total'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+        if status == 'error':
+            entry['errors'] += 1
+        elif status == 'timeout':
+            entry['timeouts'] += 1
+
+    def summary(self):
+        lines = [f"{'tool':<24}{'calls':>6}{'errors':>7}{'timeouts':>9}{'mean ms':>10}{'max ms':>10}"]
+        for name, entry in sorted(self.calls.items()):
+            mean = entry['total'] / entry['calls'] * 1000
+            lines.append(f"{name:<24}{entry['calls']:>6}{entry['errors']:>7}{entry['timeouts']:>9}"
+                         f"{mean:>10.1f}{entry['max'] * 1000:>10.1f}")
+        return '\n'.join(lines)
+
+
+tool_stats = ToolStats()
+
+_thread_pool = None
+
+
+def _get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=TOOL_THREAD_WORKERS, thread_name_prefix='tool')
+    return _thread_pool
+
+
+def shutdown_tool_executors():
+    """
+    Shuts down the thread pool of the tools. Call this once at shutdown.
+    """
+    global _thread_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+
+
+class ExecutorFunctionTool(FunctionTool):
+    """
+    A FunctionTool that runs its function where its declaration says, with a timeout and latency stats.
+
+    'inline' calls the function on the event loop, for functions too cheap to be worth a thread hop. 'thread'
+    runs it on the tools' own thread pool, for blocking I/O such as file reads and for NumPy work, which
+    releases the GIL. Tool calls the model makes in one turn are already run concurrently by the agent, so
+    offloaded tools run in parallel with each other and with the model stream and web fetches.
+
+    Coroutine functions are always awaited on the event loop, whatever the mode.
+
+    There is no process mode. The CPU-heavy tools are the NumPy calculators, whose array work releases the
+    GIL, and they bound their own work (expression length and nesting, a 5 second timeout). A process pool
+    would add pickling of every call and could only stop a runaway call by terminating its workers.
+
+    A call that exceeds `timeout` fails with a TimeoutError; its thread keeps running in the background, so
+    tools should bound their own work.
+
+    Args:
+        func (Callable): The tool function.
+        description (str): Tool description for the model.
+        mode (str): 'inline' or 'thread'. Defaults to 'thread'.
+        timeout (float | None): Seconds a call may take. None disables the limit. Defaults to TOOL_TIMEOUT.
+        stats (ToolStats): Where latency is recorded. Defaults to the shared `tool_stats`.
+    """
+
+    def __init__(self, func, description, mode='thread', timeout=TOOL_TIMEOUT, stats=tool_stats, **kwargs):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"mode must be one of {EXECUTION_MODES}, got {mode!r}")
+        super().__init__(func, description, **kwargs)
+        self.mode = mode
+        self.timeout = timeout
+        self.stats = stats
+
+    async def _call(self, kwargs, cancellation_token):
+        if asyncio.iscoroutinefunction(self._func):
+            return await asyncio.wait_for(self._func(**kwargs), self.timeout)
+        if self.mode == 'inline':
+            return self._func(**kwargs)
+        future = asyncio.get_running_loop().run_in_executor(_get_thread_pool(), functools.partial(self._func, **kwargs))
+        cancellation_token.link_future(future)
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def run(self, args, cancellation_token):
+        kwargs = {name: getattr(args, name) for name in self._signature.parameters if hasattr(args, name)}
+        status = 'ok'
+        started = time.perf_counter()
+        try:
+            return await self._call(kwargs, cancellation_token)
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            raise TimeoutError(f"Tool {self.name} did not finish within {self.timeout} seconds.") from None
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.stats.record(self.name, time.perf_counter() - started, status)
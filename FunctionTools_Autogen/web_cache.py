@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import httpx
+
+from http_client import FETCH_MAX_BYTES, get_http_client, iter_text
+
+# Defaults, overridable with the environment variables of the same name. FETCH_CACHE_DIR=off disables the cache.
+FETCH_CACHE_DIR = os.getenv("FETCH_CACHE_DIR", ".web_cache")
+FETCH_CACHE_MAX_BYTES = int(os.getenv("FETCH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class DiskSizeLRU:
+    """
+    A key-value store of JSON files in `cache_dir`, evicting least recently used entries once their total size
+    exceeds `max_bytes`.
+
+    File modification times record the last access, so the LRU order survives restarts.
+
+    Args:
+        cache_dir (str | Path): Directory holding the entries.
+        max_bytes (int): Total size the entries may take on disk.
+    """
+
+    def __init__(self, cache_dir, max_bytes=FETCH_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        paths = sorted(self.cache_dir.glob('*.json'), key=lambda p: p.stat().st_mtime)
+        self._index = OrderedDict((path.stem, path.stat().st_size) for path in paths)
+        self.size = sum(self._index.values())
+        self._evict()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        if key not in self._index:
+            return None
+        path = self._path(key)
+        try:
+            value = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.discard(key)
+            return None
+        self._index.move_to_end(key)
+        os.utime(path)
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        data = json.dumps(value).encode('utf-8')
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self.size += len(data) - self._index.pop(key, 0)
+        self._index[key] = len(data)
+        self._evict()
+
+    def discard(self, key):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self.size -= size
+            self._path(key).unlink(missing_ok=True)
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self.size -= size
+            self._path(key).unlink(missing_ok=True)
+
+
+def _key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _max_age(cache_control):
+    if 'no-cache' in cache_control:
+        return 0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def _vary(response):
+    """
+    The request header values a response varies on, or None when it must not be stored: `Vary: *` varies on
+    everything, and `Vary: Cookie` on the client's cookie jar, which the cache key cannot see.
+    """
+    names = [name.strip().lower() for name in response.headers.get('Vary', '').split(',') if name.strip()]
+    if '*' in names or 'cookie' in names:
+        return None
+    return {name: response.request.headers.get(name) for name in names}
+
+
+class WebCache:
+    """
+    Two-level cache for fetch_webpage.
+
+    The response level keeps page bodies with their ETag and Last-Modified headers. A page is served without
+    a request while its Cache-Control max-age lasts, and afterwards revalidated with a conditional request, so
+    an unchanged page costs a 304 instead of a download. The markdown level keeps converted markdown keyed by
+    URL and conversion options, together with the digest of the body it came from: it is reused as long as the
+    page is unchanged, so only changed pages are converted again.
+
+    A response with a Vary header is only reused for requests that send the same values of the headers it
+    names; responses that vary on `*` or Cookie are not stored.
+
+    Args:
+        cache_dir (str | Path): Directory holding both levels.
+        max_bytes (int): Total size both levels may take on disk.
+        max_page_bytes (int): Bytes of a page body that are read and kept; the rest is dropped.
+    """
+
+    def __init__(self, cache_dir=FETCH_CACHE_DIR, max_bytes=FETCH_CACHE_MAX_BYTES, max_page_bytes=FETCH_MAX_BYTES):
+        self.store = DiskSizeLRU(cache_dir, max_bytes)
+        self.max_page_bytes = max_page_bytes
+
+    async def fetch(self, url, headers=None):
+        """
+        Returns the body of `url` and its digest, from the cache when it is fresh or unchanged.
+
+        Raises:
+            httpx.HTTPStatusError: If the server answers with an error status.
+        """
+        key = 'response-' + _key(url, headers or {})
+        entry = self.store.get(key)
+        if entry is not None and entry.get('vary'):
+            # The headers the shared client would send, its defaults included
+            sent = httpx.Headers(get_http_client().headers)
+            sent.update(headers or {})
+            if any(sent.get(name) != value for name, value in entry['vary'].items()):
+                entry = None
+        if entry is not None and time.time() < entry['expires']:
+            return entry['body'], entry['digest']
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+        async with get_http_client().stream('GET', url, headers=request_headers) as response:
+            cache_control = response.headers.get('Cache-Control', '')
+            if entry is not None and response.status_code == 304:
+                entry['expires'] = time.time() + _max_age(cache_control)
+                self.store.set(key, entry)
+                return entry['body'], entry['digest']
+            response.raise_for_status()
+            body = ''.join([text async for text in iter_text(response, self.max_page_bytes)])
+
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        vary = _vary(response)
+        if 'no-store' in cache_control or vary is None:
+            self.store.discard(key)
+        else:
+            self.store.set(key, {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'vary': vary,
+                'expires': time.time() + _max_age(cache_control),
+                'digest': digest,
+                'body': body,
+            })
+        return body, digest
+
+    def get_markdown(self, digest, *options):
+        """Returns the markdown converted with `options` from the body with this digest, or None."""
+        entry = self.store.get('markdown-' + _key(*options))
+        if entry is None or entry['digest'] != digest:
+            return None
+        return entry['markdown']
+
+    def set_markdown(self, digest, markdown, *options):
+        self.store.set('markdown-' + _key(*options), {'digest': digest, 'markdown': markdown})
+
+
+_cache = None
+
+
+def get_web_cache():
+    """
+    Returns the process-wide WebCache, or None when FETCH_CACHE_DIR is 'off'.
+    """
+    global _cache
+    if FETCH_CACHE_DIR == 'off':
+        return None
+    if _cache is None:
+        _cache = WebCache()
+    return _cache
+
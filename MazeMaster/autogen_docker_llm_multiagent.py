@@ -1,15 +1,19 @@
 import asyncio
 import logging
 import os
-from autogen_agentchat.agents import CodeExecutorAgent, AssistantAgent
-from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
+import sys
+import time
+from pathlib import Path
 from autogen_agentchat.messages import TextMessage
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import TextMentionTermination
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_agentchat.base import TaskResult
 from dotenv import load_dotenv
 from docker.errors import DockerException
+# The repository root holds the common/ modules shared with the other projects
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.dependencies import PrewarmedDockerExecutor
+from common.instrumentation import RunTrace, JsonlExporter, metrics_registry, start_metrics_server
+from maze_team import get_maze_team
 
 # Configure logging for better debugging and tracking
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,64 +29,38 @@ if not api_key:
 openai_client = OpenAIChatCompletionClient(model="gpt-4o-mini", api_key=api_key)
 logger.info("OpenAI client initialized successfully.")
 
-# Define the ProblemSolverExpert agent for solving the Rat in a Maze problem
-problem_solver_expert = AssistantAgent(
-    name="ProblemSolverExpert",
-    description="An expert agent that solves the Rat in a Maze problem and generates visualizations.",
-    model_client=openai_client,
-    system_message="""
-You are an expert in solving Data Structures and Algorithms (DSA) problems, specializing in the Rat in a Maze problem.
-Your tasks are:
-1. Provide a clear explanation of how to solve the problem using a backtracking algorithm.
-2. Generate Python code in a single block to solve the problem and create a slow-moving GIF (using matplotlib and imageio) to visualize the solution path.
-3. Include three diverse test cases: a solvable maze, an unsolvable maze, and an edge-case maze (e.g., 2x2 maze).
-4. Print the output of each test case clearly.
-5. If the code fails due to missing libraries, provide a shell script with `pip install` commands to install dependencies (e.g., matplotlib, imageio).
-6. If an error occurs, provide corrected code in Python block format.
-7. Save the GIF as `output.gif` in the working directory.
-8. After successful execution, explain the results in detail, including the solution path and test case outcomes.
-9. End the conversation with the word "STOP" to terminate the chat.
-"""
-)
-
-# Define the termination condition for the agent conversation
-termination_condition = TextMentionTermination("STOP")
-logger.info("Termination condition set to stop on 'STOP' keyword.")
-
 # Initialize Docker-based code executor with a specific Python image
 try:
-    docker = DockerCommandLineCodeExecutor(
-        image="python:3.11-slim",  # Use a lightweight Python image with pre-installed dependencies
+    docker = PrewarmedDockerExecutor(
+        image="python:3.11-slim",  # Base image; matplotlib and imageio are baked into a derived image on first start
+        packages=["matplotlib", "imageio"],
+        wheel_cache_dir=".pip_cache",  # Persistent pip cache shared by every run
         work_dir="tmp",
         timeout=180,  # Increased timeout to accommodate GIF generation
     )
-    logger.info("Docker code executor initialized with python:3.11-slim image.")
+    logger.info("Docker code executor initialized with python:3.11-slim image and pre-installed dependencies.")
 except DockerException as e:
     logger.error(f"Failed to initialize Docker executor: {e}")
     raise
 
-# Define the CodeExecutorAgent for running code in a Docker container
-code_executor_agent = CodeExecutorAgent(
-    name="CodeExecutorAgent",
-    description="Executes Python code in a secure Docker container.",
-    code_executor=docker,
-)
-logger.info("CodeExecutorAgent initialized successfully.")
-
-# Set up the RoundRobinGroupChat team with the two agents
-team = RoundRobinGroupChat(
-    participants=[problem_solver_expert, code_executor_agent],
-    termination_condition=termination_condition,
-    max_turns=15
-)
+# Set up the team: ProblemSolverExpert and a CodeExecutorAgent running code in the Docker container
+team = get_maze_team(openai_client, docker)
 logger.info("RoundRobinGroupChat team initialized with max 15 turns.")
 
+# Per-turn spans go to traces/spans.jsonl; set METRICS_PORT to also serve them for Prometheus on /metrics
+metrics_port = os.getenv("METRICS_PORT")
+if metrics_port:
+    start_metrics_server(int(metrics_port))
+    logger.info("Serving metrics on http://127.0.0.1:%s/metrics", metrics_port)
+
 # Main function to run the agent team and execute the task
 async def run_code_executor_agent():
+    trace = RunTrace(time.strftime("%Y%m%d-%H%M%S"), [metrics_registry, JsonlExporter("traces/spans.jsonl")])
     try:
         # Start the Docker container
         logger.info("Starting Docker container...")
-        await docker.start()
+        with trace.span("container_start"):
+            await docker.start()
 
         # Define the task for solving the Rat in a Maze problem
         task = (
@@ -95,7 +73,7 @@ async def run_code_executor_agent():
         logger.info("Task defined: %s", task)
 
         # Run the team task and stream messages
-        async for message in team.run_stream(task=task):
+        async for message in trace.instrument(team.run_stream(task=task)):
             print("=" * 200)
             if isinstance(message, TextMessage):
                 print(f"Message from: {message.source}")
@@ -113,7 +91,11 @@ async def run_code_executor_agent():
     finally:
         # Ensure Docker container is stopped to free resources
         logger.info("Stopping Docker container...")
-        await docker.stop()
+        with trace.span("container_stop"):
+            await docker.stop()
+        # Close the model client's HTTP connections
+        await openai_client.close()
+        logger.info("Run timings:\n%s", trace.summary())
 
 # Entry point for the script
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+from autogen_agentchat.agents import CodeExecutorAgent, AssistantAgent
+from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_agentchat.conditions import TextMentionTermination, TimeoutTermination, TokenUsageTermination
+
+from common.termination import ArtifactWrittenTermination, RepeatedErrorTermination, NoNewCodeTermination
+
+
+def get_maze_team(model_client, code_executor):
+    """
+    Returns the Rat in a Maze team: a ProblemSolverExpert that writes the solver and its GIF visualization, and
+    a CodeExecutorAgent that runs the code with `code_executor`. Kept free of the runner's logging, API key
+    check and Docker set-up so the team can be built elsewhere, e.g. by the benchmarks. The repository root
+    must be on sys.path for the common/ modules.
+
+    The conversation ends on the 'STOP' keyword, or early once output.gif is written to the executor's work
+    dir, the same error repeats 3 times, no new code comes for 3 turns, or the time/token budget is spent.
+
+    Args:
+        model_client (ChatCompletionClient): Client of the ProblemSolverExpert.
+        code_executor (CodeExecutor): Runs the generated code, usually a PrewarmedDockerExecutor.
+
+    Returns:
+        RoundRobinGroupChat: The two agents, at most 15 turns.
+    """
+    problem_solver_expert = AssistantAgent(
+        name="ProblemSolverExpert",
+        description="An expert agent that solves the Rat in a Maze problem and generates visualizations.",
+        model_client=model_client,
+        system_message="""
+You are an expert in solving Data Structures and Algorithms (DSA) problems, specializing in the Rat in a Maze problem.
+Your tasks are:
+1. Provide a clear explanation of how to solve the problem using a backtracking algorithm.
+2. Generate Python code in a single block to solve the problem and create a slow-moving GIF (using matplotlib and imageio) to visualize the solution path.
+3. Include three diverse test cases: a solvable maze, an unsolvable maze, and an edge-case maze (e.g., 2x2 maze).
+4. Print the output of each test case clearly.
+5. matplotlib and imageio are pre-installed. If the code fails due to other missing libraries, provide a shell script with `pip install` commands to install them.
+6. If an error occurs, provide corrected code in Python block format.
+7. Save the GIF as `output.gif` in the working directory.
+8. After successful execution, explain the results in detail, including the solution path and test case outcomes.
+9. End the conversation with the word "STOP" to terminate the chat.
+"""
+    )
+
+    termination_condition = (
+        TextMentionTermination("STOP")
+        | ArtifactWrittenTermination(code_executor.work_dir, "output.gif")
+        | RepeatedErrorTermination(3)
+        | NoNewCodeTermination(3)
+        | TimeoutTermination(900)
+        | TokenUsageTermination(max_total_token=200000)
+    )
+
+    code_executor_agent = CodeExecutorAgent(
+        name="CodeExecutorAgent",
+        description="Executes Python code in a secure Docker container.",
+        code_executor=code_executor,
+    )
+
+    return RoundRobinGroupChat(
+        participants=[problem_solver_expert, code_executor_agent],
+        termination_condition=termination_condition,
+        max_turns=15
+    )
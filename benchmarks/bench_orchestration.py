@@ -0,0 +1,335 @@
+"""
+Offline benchmarks for the multi-agent orchestration code.
+
+The real team wiring of DSA_SOLVER (main.get_team_and_docker), the MazeMaster team and the Arxiv Document Finder
+team (review_team.get_review_team) are driven with scripted, deterministic model clients and a local fake code
+executor, so no API key, network, Docker or Streamlit is needed. What is left to measure is the framework itself:
+
+    per-turn overhead       time per turn with instant model and executor, also relative to a calibration loop
+    memory growth           bytes retained per turn over a long conversation
+    concurrency scaling     how close N concurrent solves with simulated I/O latency get to the time of one
+
+Every timing is the median of --repeats samples. A turn-overhead sample runs a team as many times as it takes
+to last MIN_SAMPLE_SECONDS, so short teams such as the two-turn Arxiv exchange are not dominated by timer and
+scheduler jitter; each is paired with a calibration sample of the same length. Only machine-independent metrics
+are compared with baselines.json: ratios (turn overhead in calibration units, slowdown, concurrency efficiency)
+and memory per turn. Absolute milliseconds are printed for information. The script exits with status 1 when a
+compared metric regresses by more than the tolerance.
+
+Usage:
+    python benchmarks/bench_orchestration.py
+    python benchmarks/bench_orchestration.py --update-baselines
+"""
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from autogen_core.code_executor import CodeExecutor
+from autogen_core.models import ModelInfo
+from autogen_ext.code_executors.local import CommandLineCodeResult
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES_FILE = Path(__file__).with_name('baselines.json')
+sys.path[:0] = [str(ROOT / 'DSA_SOLVER'), str(ROOT / 'MazeMaster')]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / 'Arxiv Document Finder'))
+
+from main import get_team_and_docker  # noqa: E402
+from maze_team import get_maze_team  # noqa: E402
+from review_team import get_review_team  # noqa: E402
+
+# Shortest duration of one timing sample; a sample repeats its workload until it lasts this long.
+MIN_SAMPLE_SECONDS = 0.25
+
+# Padding that gives scripted messages a realistic size.
+CODE_PADDING = ''.join(f'    total += values[{i}] * {i}\n' for i in range(40))
+OUTPUT_PADDING = ''.join(f'test case {i}: expected {i * 7}, got {i * 7}\n' for i in range(40))
+MODEL_INFO = ModelInfo(vision=False, function_calling=True, json_output=False, family='unknown',
+                       structured_output=False)
+
+
+class ScriptedChatCompletionClient(ReplayChatCompletionClient):
+    """
+    ReplayChatCompletionClient that waits `latency` seconds before every completion, to stand in for model I/O.
+    """
+
+    def __init__(self, chat_completions, latency=0.0):
+        super().__init__(chat_completions, model_info=MODEL_INFO)
+        self._latency = latency
+
+    async def create(self, *args, **kwargs):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return await super().create(*args, **kwargs)
+
+
+class FakeCodeExecutor(CodeExecutor):
+    """
+    Local stand-in for the Docker executor that returns a fixed output after `latency` seconds.
+    """
+
+    def __init__(self, work_dir, output=OUTPUT_PADDING, latency=0.0):
+        self.work_dir = Path(work_dir)
+        self._output = output
+        self._latency = latency
+        self.runs = 0
+
+    async def execute_code_blocks(self, code_blocks, cancellation_token):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        self.runs += 1
+        return CommandLineCodeResult(exit_code=0, output=self._output, code_file=None)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def restart(self):
+        pass
+
+
+def solver_script(responses):
+    """Model replies that each send a new version of the code, like a fix-and-retry loop, then STOP."""
+    script = [f"Attempt {i}: adjusting the solution.\n```python\ndef solve(values):\n    total = 0\n"
+              f"{CODE_PADDING}    return total + {i}\n\nprint(solve(list(range(40))))\n```" for i in range(responses)]
+    return script + ['The solution works. STOP']
+
+
+async def build_dsa_team(work_dir, responses, model_latency=0.0, executor_latency=0.0):
+    """Builds the DSA_SOLVER team with main.get_team_and_docker, with the stand-ins plugged in."""
+    model_client = ScriptedChatCompletionClient(solver_script(responses), latency=model_latency)
+    team, _ = await get_team_and_docker(FakeCodeExecutor(work_dir, latency=executor_latency), model_client)
+    return team
+
+
+def build_mazemaster_team(work_dir, responses):
+    """Builds the MazeMaster team with maze_team.get_maze_team, with the stand-ins plugged in."""
+    return get_maze_team(ScriptedChatCompletionClient(solver_script(responses)), FakeCodeExecutor(work_dir))
+
+
+def offline_arxiv_search(query: str, max_results: int = 5) -> list:
+    """Stand-in for the app's arxiv_search tool; the scripted researcher never calls it."""
+    return []
+
+
+def build_arxiv_team(papers):
+    """Builds the Arxiv Document Finder team with get_review_team and a scripted client for both agents."""
+    listing = json.dumps([{'title': f'Paper {i}', 'authors': ['A. Author'], 'summary': OUTPUT_PADDING}
+                          for i in range(papers)])
+    review = '## Review\n' + ''.join(f'- Paper {i}: key contribution.\n' for i in range(papers))
+    return get_review_team(ScriptedChatCompletionClient([listing, review]), offline_arxiv_search)
+
+
+async def calibration_sample():
+    """
+    Seconds taken by a fixed asyncio and pure-Python workload, averaged over as many runs as fit in
+    MIN_SAMPLE_SECONDS. Turn overheads are divided by it, so the compared figures do not depend on the speed of
+    the machine.
+    """
+    async def workload():
+        queue = asyncio.Queue()
+        for i in range(2000):
+            queue.put_nowait({'source': 'agent', 'content': str(i)})
+            await asyncio.sleep(0)
+            json.dumps(queue.get_nowait())
+
+    gc.collect()
+    runs = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < MIN_SAMPLE_SECONDS:
+        await workload()
+        runs += 1
+    return (time.perf_counter() - started) / runs
+
+
+async def time_run(team, task):
+    """Runs the team once and returns (seconds, turns)."""
+    started = time.perf_counter()
+    result = await team.run(task=task)
+    return time.perf_counter() - started, max(1, len(result.messages) - 1)
+
+
+async def sample_turn_seconds(build, task):
+    """
+    Seconds per turn over as many runs of a fresh team from `await build()` as fit in MIN_SAMPLE_SECONDS. Only
+    the runs are timed, not building the teams.
+    """
+    gc.collect()
+    seconds = turns = 0
+    while seconds < MIN_SAMPLE_SECONDS:
+        team = await build()
+        run_seconds, run_turns = await time_run(team, task)
+        seconds += run_seconds
+        turns += run_turns
+    return seconds / turns
+
+
+async def bench_turn_overhead(work_dir, repeats):
+    """
+    Time per turn for each team, median over `repeats` samples, with instant model and executor: in
+    milliseconds and in calibration units. Each sample is divided by a calibration sample taken right before
+    it, so a change in machine speed during the run affects both alike.
+    """
+    results = {}
+
+    async def record(name, build, task):
+        samples, relative = [], []
+        for _ in range(repeats):
+            unit = await calibration_sample()
+            seconds = await sample_turn_seconds(build, task)
+            samples.append(seconds)
+            relative.append(seconds / unit)
+        results[f'{name}_turn_overhead_ms'] = statistics.median(samples) * 1000
+        results[f'{name}_turn_overhead_rel'] = statistics.median(relative)
+
+    async def dsa_team():
+        return await build_dsa_team(work_dir, responses=20)
+
+    async def mazemaster_team():
+        return build_mazemaster_team(work_dir, responses=20)
+
+    async def arxiv_team():
+        return build_arxiv_team(5)
+
+    await record('dsa', dsa_team, 'Add two numbers.')
+    await record('mazemaster', mazemaster_team, 'Solve the Rat in a Maze problem.')
+    await record('arxiv', arxiv_team, 'Conduct a literature review on Autogen.')
+    return results
+
+
+async def bench_memory_growth(work_dir, rounds, repeats):
+    """
+    Continues one DSA conversation for `rounds` runs without resetting it and reports the memory retained per
+    turn, and the median time per turn of the last third of the runs compared with that of the first third.
+    Both are the median over `repeats` conversations.
+    """
+    growth, slowdown = [], []
+    third = max(1, rounds // 3)
+    for _ in range(repeats):
+        team = await build_dsa_team(work_dir, responses=rounds * 10)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            turn_seconds = []
+            baseline_memory = None
+            total_turns = 0
+            for index in range(rounds):
+                seconds, turns = await time_run(team, 'Keep improving the solution.')
+                gc.collect()
+                current, _ = tracemalloc.get_traced_memory()
+                if index == 0:
+                    baseline_memory = current
+                else:
+                    total_turns += turns
+                turn_seconds.append(seconds / turns)
+        finally:
+            tracemalloc.stop()
+        growth.append((current - baseline_memory) / max(1, total_turns))
+        slowdown.append(statistics.median(turn_seconds[-third:]) / statistics.median(turn_seconds[:third]))
+    return {
+        'memory_growth_bytes_per_turn': statistics.median(growth),
+        'long_conversation_slowdown': statistics.median(slowdown),
+    }
+
+
+async def bench_concurrency(work_dir, levels, repeats, model_latency=0.02, executor_latency=0.01):
+    """
+    Runs N DSA solves at once, each with simulated model and executor latency, and reports the time of one
+    solve divided by the time of N concurrent solves (1.0 is perfect scaling), each the median of `repeats` runs.
+    """
+    results = {}
+    single = None
+    for level in levels:
+        samples = []
+        for _ in range(repeats):
+            teams = [await build_dsa_team(work_dir, 6, model_latency, executor_latency) for _ in range(level)]
+            started = time.perf_counter()
+            await asyncio.gather(*(team.run(task='Add two numbers.') for team in teams))
+            samples.append(time.perf_counter() - started)
+        elapsed = statistics.median(samples)
+        if single is None:
+            single = elapsed
+        results[f'concurrency_{level}_efficiency'] = single / elapsed
+    return results
+
+
+# Metrics compared with the baselines; absolute timings (_ms) depend on the machine and are only printed.
+COMPARED = ('_rel', '_efficiency', '_slowdown', '_bytes_per_turn')
+# Whether a larger value of the metric is better.
+HIGHER_IS_BETTER = ('_efficiency',)
+
+
+def compare(results, baselines, tolerance):
+    """
+    Returns the compared metrics that regressed by more than `tolerance` (a fraction) against the baselines.
+    """
+    regressions = []
+    for name, baseline in baselines.items():
+        if name not in results or not name.endswith(COMPARED):
+            continue
+        value = results[name]
+        if name.endswith(HIGHER_IS_BETTER):
+            regressed = value < baseline * (1 - tolerance)
+        else:
+            regressed = value > baseline * (1 + tolerance)
+        if regressed:
+            regressions.append((name, baseline, value))
+    return regressions
+
+
+async def run_benchmarks(repeats, rounds, levels):
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = {}
+        results.update(await bench_turn_overhead(work_dir, repeats))
+        results.update(await bench_memory_growth(work_dir, rounds, repeats))
+        results.update(await bench_concurrency(work_dir, levels, repeats))
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the agent teams.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per team for the turn overhead (default: 5)")
+    parser.add_argument("--rounds", type=int, default=10, help="Runs in the long conversation (default: 10)")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32], help="Concurrency levels (default: 1 8 32)")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed regression as a fraction (default: 0.3)")
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = asyncio.run(run_benchmarks(args.repeats, args.rounds, args.levels))
+    baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.is_file() else {}
+
+    print(f"{'metric':<36}{'value':>12}{'baseline':>12}")
+    for name, value in results.items():
+        baseline = format(baselines[name], '.3f') if name in baselines and name.endswith(COMPARED) else '-'
+        print(f"{name:<36}{value:>12.3f}{baseline:>12}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+
+    if args.update_baselines:
+        compared = {name: value for name, value in results.items() if name.endswith(COMPARED)}
+        BASELINES_FILE.write_text(json.dumps(compared, indent=2, sort_keys=True) + '\n')
+        print(f"Baselines written to {BASELINES_FILE}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    for name, baseline, value in regressions:
+        print(f"REGRESSION {name}: {value:.3f} vs baseline {baseline:.3f}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
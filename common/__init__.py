@@ -0,0 +1 @@
+"""Modules shared by the projects of this repository; each entry script puts the repository root on sys.path."""
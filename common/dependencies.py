@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import io
+import re
+import shlex
+import threading
+from pathlib import Path
+
+import docker
+from docker.errors import ImageNotFound
+from autogen_core.code_executor import CodeBlock
+from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
+from autogen_ext.code_executors.local import CommandLineCodeResult
+
+SHELL_LANGUAGES = ('bash', 'shell', 'sh')
+# pip flags that do not change what ends up installed
+NEUTRAL_PIP_FLAGS = {'-q', '-qq', '-qqq', '--quiet', '--no-cache-dir', '--user', '--disable-pip-version-check',
+                     '--root-user-action=ignore', '--no-warn-script-location'}
+PIP_CACHE_MOUNT = '/root/.cache/pip'
+
+_build_lock = threading.Lock()
+
+
+def normalize_package(name):
+    """Normalizes a distribution name the way pip compares them (PEP 503)."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def image_tag(base_image, packages):
+    """Returns a tag that is stable for a given base image and package set."""
+    digest = hashlib.sha256(' '.join([base_image, *sorted(packages)]).encode()).hexdigest()[:12]
+    return f"autogen-executor-deps:{digest}"
+
+
+def ensure_executor_image(base_image, packages):
+    """
+    Builds, once per base image and package set, an image with the packages pre-installed.
+
+    Args:
+        base_image (str): Image to start from, e.g. 'python:3.11-slim'.
+        packages (list[str]): Packages to pip install into the image.
+
+    Returns:
+        str: Tag of the image to run executors from. The base image itself when `packages` is empty.
+    """
+    if not packages:
+        return base_image
+    tag = image_tag(base_image, packages)
+    client = docker.from_env()
+    with _build_lock:
+        try:
+            client.images.get(tag)
+            return tag
+        except ImageNotFound:
+            pass
+        print(f"Building executor image {tag} with {', '.join(packages)}...")
+        dockerfile = (
+            f"FROM {base_image}\n"
+            f"RUN pip install --no-cache-dir --disable-pip-version-check {' '.join(map(shlex.quote, packages))}\n"
+        )
+        client.images.build(fileobj=io.BytesIO(dockerfile.encode()), tag=tag, rm=True)
+    return tag
+
+
+def wheel_cache_volume(cache_dir):
+    """Returns an `extra_volumes` entry mounting a persistent host pip cache into the container."""
+    path = Path(cache_dir).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    return {str(path): {'bind': PIP_CACHE_MOUNT, 'mode': 'rw'}}
+
+
+def parse_pip_install(code):
+    """
+    Returns the packages requested by a shell block made only of plain `pip install` lines, or None when the
+    block does anything else (other commands, version specifiers, upgrades, requirement files...).
+    """
+    packages = []
+    for line in code.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            return None
+        if words[:3] in (['python', '-m', 'pip'], ['python3', '-m', 'pip']):
+            words = ['pip'] + words[3:]
+        if words[:2] not in (['pip', 'install'], ['pip3', 'install']):
+            return None
+        for word in words[2:]:
+            if word.startswith('-'):
+                if word not in NEUTRAL_PIP_FLAGS:
+                    return None
+            elif re.fullmatch(r'[A-Za-z0-9][A-Za-z0-9._-]*', word):
+                packages.append(word)
+            else:
+                return None
+    return packages or None
+
+
+class PrewarmedDockerExecutor(DockerCommandLineCodeExecutor):
+    """
+    A DockerCommandLineCodeExecutor that runs on an image with `packages` pre-installed, shares a persistent
+    wheel cache with the host, and answers `pip install` blocks for packages that are already present without
+    running them.
+
+    Args:
+        packages (list[str]): Packages baked into the image.
+        wheel_cache_dir (str | Path | None): Host directory used as pip's cache inside the container.
+        image (str): Base image the dependency image is built from.
+        **kwargs: Passed on to DockerCommandLineCodeExecutor.
+    """
+
+    def __init__(self, packages=(), wheel_cache_dir=None, image='python:3-slim', **kwargs):
+        extra_volumes = dict(kwargs.pop('extra_volumes', None) or {})
+        if wheel_cache_dir is not None:
+            extra_volumes.update(wheel_cache_volume(wheel_cache_dir))
+        self._base_image = image
+        self._packages = list(packages)
+        super().__init__(image=image_tag(image, self._packages) if self._packages else image,
+                         extra_volumes=extra_volumes, **kwargs)
+        self._installed = None
+
+    async def start(self):
+        # Building the image is slow the first time only; keep it off the event loop.
+        await asyncio.to_thread(ensure_executor_image, self._base_image, self._packages)
+        await super().start()
+
+    async def execute_code_blocks(self, code_blocks, cancellation_token):
+        if not code_blocks:
+            return await super().execute_code_blocks(code_blocks, cancellation_token)
+
+        skipped = []
+        for code_block in code_blocks:
+            requested = None
+            if code_block.language.lower() in SHELL_LANGUAGES:
+                requested = parse_pip_install(code_block.code)
+            if requested is None:
+                break
+            installed = await self._installed_packages(cancellation_token)
+            if not all(normalize_package(name) in installed for name in requested):
+                break
+            skipped.append(requested)
+
+        if len(skipped) == len(code_blocks):
+            output = ''.join(f"Requirement already satisfied: {name}\n" for names in skipped for name in names)
+            return CommandLineCodeResult(exit_code=0, output=output, code_file=None)
+
+        result = await super().execute_code_blocks(code_blocks, cancellation_token)
+        if any(code_block.language.lower() in SHELL_LANGUAGES and 'pip' in code_block.code
+               for code_block in code_blocks):
+            # Something may have been installed; look again on the next check.
+            self._installed = None
+        return result
+
+    async def restart(self):
+        self._installed = None
+        await super().restart()
+
+    async def _installed_packages(self, cancellation_token):
+        if self._installed is None:
+            result = await super().execute_code_blocks(
+                [CodeBlock(code='pip list --format=freeze --disable-pip-version-check', language='sh')],
+                cancellation_token,
+            )
+            self._installed = {
+                normalize_package(line.split('==')[0]) for line in result.output.splitlines() if '==' in line
+            }
+        return self._installed
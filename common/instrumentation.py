@@ -0,0 +1,236 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from autogen_agentchat.base import TaskResult
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Consumer pauses shorter than this are not worth a span.
+MIN_IDLE_SECONDS = 0.001
+
+
+class RunTrace:
+    """
+    Records one span per agent turn and per stage of a team run, e.g. model calls, code execution,
+    container start-up, and the idle time the caller spends handling each message.
+
+    Every span is a dict with run_id, stage, agent, turn, start (epoch seconds), duration (seconds),
+    prompt_tokens and completion_tokens, and is handed to each exporter as soon as it ends.
+
+    Args:
+        run_id (str): Id of the run the spans belong to.
+        exporters (list): Objects with an `export(span)` method, e.g. JsonlExporter or MetricsRegistry.
+        stages (dict[str, str] | None): Stage name per agent. Agents not listed are 'model' when their
+            message carries token usage and 'agent' otherwise.
+    """
+
+    def __init__(self, run_id, exporters=(), stages=None):
+        self.run_id = run_id
+        self.spans = []
+        self.stop_reason = None
+        self._exporters = list(exporters)
+        self._stages = {'CodeExecutorAgent': 'execute', **(stages or {})}
+
+    def record(self, stage, agent, start, duration, prompt_tokens=0, completion_tokens=0, **attributes):
+        """Adds a finished span and exports it."""
+        span = {'run_id': self.run_id, 'stage': stage, 'agent': agent, 'start': start, 'duration': duration,
+                'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens, **attributes}
+        self.spans.append(span)
+        for exporter in self._exporters:
+            exporter.export(span)
+        return span
+
+    @contextmanager
+    def span(self, stage, agent=None, **attributes):
+        """
+        Times the body of a `with` block as one span.
+
+        Example:
+            with trace.span('container_start'):
+                await start_docker_executor(docker)
+        """
+        start, started = time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, agent, start, time.perf_counter() - started, **attributes)
+
+    async def instrument(self, stream):
+        """
+        Wraps `team.run_stream(...)`, yielding the same messages while recording a span per turn.
+
+        The time between two messages is charged to the agent that produced the second one; the time the
+        caller takes before asking for the next message is recorded as an 'idle' span.
+        """
+        turn = 0
+        run_start, run_started = time.time(), time.perf_counter()
+        last = run_started
+        try:
+            async for message in stream:
+                now = time.perf_counter()
+                if isinstance(message, TaskResult):
+                    self.stop_reason = message.stop_reason
+                elif message.source != 'user':
+                    turn += 1
+                    usage = message.models_usage
+                    stage = self._stages.get(message.source, 'model' if usage else 'agent')
+                    self.record(stage, message.source, run_start + (last - run_started), now - last,
+                                prompt_tokens=usage.prompt_tokens if usage else 0,
+                                completion_tokens=usage.completion_tokens if usage else 0, turn=turn)
+
+                yield message
+                resumed = time.perf_counter()
+                if resumed - now >= MIN_IDLE_SECONDS:
+                    self.record('idle', None, run_start + (now - run_started), resumed - now, turn=turn)
+                last = resumed
+        finally:
+            self.record('run', None, run_start, time.perf_counter() - run_started,
+                        prompt_tokens=sum(s['prompt_tokens'] for s in self.spans),
+                        completion_tokens=sum(s['completion_tokens'] for s in self.spans),
+                        turns=turn, stop_reason=self.stop_reason)
+
+    def summary(self):
+        """
+        Returns a table of time and tokens per stage and agent, slowest first.
+        """
+        totals = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])  # count, total, max, prompt, completion
+        run = None
+        for span in self.spans:
+            if span['stage'] == 'run':
+                run = span
+                continue
+            row = totals[(span['stage'], span['agent'] or '-')]
+            row[0] += 1
+            row[1] += span['duration']
+            row[2] = max(row[2], span['duration'])
+            row[3] += span['prompt_tokens']
+            row[4] += span['completion_tokens']
+
+        lines = []
+        if run is not None:
+            lines.append(f"Run {self.run_id}: {run['duration']:.2f}s, {run['turns']} turns, "
+                         f"{run['prompt_tokens']} prompt + {run['completion_tokens']} completion tokens, "
+                         f"stop reason: {run['stop_reason']}")
+        lines.append(f"{'stage':<16}{'agent':<22}{'count':>6}{'total s':>10}{'mean s':>9}{'max s':>9}{'tokens':>9}")
+        for (stage, agent), (n, total, longest, prompt, completion) in sorted(
+                totals.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"{stage:<16}{agent:<22}{n:>6}{total:>10.2f}{total / n:>9.2f}{longest:>9.2f}"
+                         f"{prompt + completion:>9}")
+        return '\n'.join(lines)
+
+
+class JsonlExporter:
+    """
+    Appends every span as one JSON line to `path`.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span, default=str) + '\n'
+        with self._lock, self.path.open('a', encoding='utf-8') as f:
+            f.write(line)
+
+
+class MetricsRegistry:
+    """
+    Aggregates spans of every run in the process into Prometheus metrics:
+        autogen_span_duration_seconds   histogram by stage and agent
+        autogen_tokens_total            counter by agent and kind (prompt or completion)
+        autogen_runs_total              counter by stop reason
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._tokens = defaultdict(int)
+        self._runs = defaultdict(int)
+
+    def export(self, span):
+        with self._lock:
+            if span['stage'] == 'run':
+                self._runs[str(span.get('stop_reason'))] += 1
+                return
+            key = (span['stage'], span['agent'] or '')
+            histogram = self._durations.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if span['duration'] <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += span['duration']
+            histogram['count'] += 1
+            if span['prompt_tokens']:
+                self._tokens[(key[1], 'prompt')] += span['prompt_tokens']
+            if span['completion_tokens']:
+                self._tokens[(key[1], 'completion')] += span['completion_tokens']
+
+    def render(self):
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = ['# HELP autogen_span_duration_seconds Time spent per stage and agent.',
+                 '# TYPE autogen_span_duration_seconds histogram']
+        with self._lock:
+            for (stage, agent), histogram in sorted(self._durations.items()):
+                labels = f'stage="{_escape(stage)}",agent="{_escape(agent)}"'
+                for bound, value in zip(self.buckets, histogram['buckets']):
+                    lines.append(f'autogen_span_duration_seconds_bucket{{{labels},le="{bound}"}} {value}')
+                lines.append(f'autogen_span_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+                lines.append(f'autogen_span_duration_seconds_sum{{{labels}}} {histogram["sum"]}')
+                lines.append(f'autogen_span_duration_seconds_count{{{labels}}} {histogram["count"]}')
+            lines += ['# HELP autogen_tokens_total Model tokens used per agent.', '# TYPE autogen_tokens_total counter']
+            for (agent, kind), value in sorted(self._tokens.items()):
+                lines.append(f'autogen_tokens_total{{agent="{_escape(agent)}",kind="{kind}"}} {value}')
+            lines += ['# HELP autogen_runs_total Finished team runs per stop reason.', '# TYPE autogen_runs_total counter']
+            for reason, value in sorted(self._runs.items()):
+                lines.append(f'autogen_runs_total{{stop_reason="{_escape(reason)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every run in the process so the metrics endpoint sees all of them.
+metrics_registry = MetricsRegistry()
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def start_metrics_server(port, registry=metrics_registry, host='127.0.0.1'):
+    """
+    Serves `registry.render()` on http://host:port/metrics from a daemon thread. Calling it again for the
+    same port returns the running server.
+
+    Returns:
+        ThreadingHTTPServer: The server.
+    """
+    with _servers_lock:
+        if port in _servers:
+            return _servers[port]
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _servers[port] = server
+        return server
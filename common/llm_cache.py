@@ -0,0 +1,168 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from autogen_core import CacheStore
+from autogen_core.models import CreateResult
+from autogen_ext.models.cache import ChatCompletionCache
+
+CACHE_MODES = ('off', 'record', 'replay')
+
+# Client settings that change the completion and therefore belong in the cache key.
+SAMPLING_KEYS = (
+    'model', 'temperature', 'top_p', 'max_tokens', 'seed', 'stop',
+    'frequency_penalty', 'presence_penalty', 'response_format',
+)
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def _encode(value):
+    if isinstance(value, CreateResult):
+        return {'result': value.model_dump(mode='json')}
+    return [{'chunk': item} if isinstance(item, str) else {'result': item.model_dump(mode='json')} for item in value]
+
+
+def _is_complete(value):
+    # A recorded stream ends with its CreateResult
+    if isinstance(value, list):
+        return bool(value) and isinstance(value[-1], CreateResult)
+    return value is not None
+
+
+def _decode(data):
+    if isinstance(data, dict):
+        return CreateResult.model_validate(data['result'])
+    return [item['chunk'] if 'chunk' in item else CreateResult.model_validate(item['result']) for item in data]
+
+
+class DiskLRUStore(CacheStore):
+    """
+    A CacheStore that keeps one JSON file per entry with LRU and TTL eviction.
+
+    File modification times record the last access, so the LRU order survives restarts.
+
+    Args:
+        cache_dir (str | Path): Directory holding the entries.
+        max_entries (int): Least recently used entries beyond this count are deleted.
+        ttl_seconds (float | None): Entries older than this are treated as missing. None disables expiry.
+    """
+
+    def __init__(self, cache_dir, max_entries=10000, ttl_seconds=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        paths = sorted(self.cache_dir.glob('*.json'), key=lambda p: p.stat().st_mtime)
+        self._index = OrderedDict((path.stem, path) for path in paths)
+        self._evict()
+
+    def get(self, key, default=None):
+        path = self._index.get(key)
+        if path is None:
+            return default
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self._discard(key)
+            return default
+        if self.ttl_seconds is not None and time.time() - entry['created'] > self.ttl_seconds:
+            self._discard(key)
+            return default
+
+        self._index.move_to_end(key)
+        os.utime(path)
+        return self._load(entry['value'])
+
+    def set(self, key, value):
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'created': time.time(), 'value': self._dump(value)}), encoding='utf-8')
+        os.replace(tmp_path, path)
+        self._index[key] = path
+        self._index.move_to_end(key)
+        self._evict()
+
+    def _dump(self, value):
+        # Converts a value to JSON-compatible data; subclasses storing other values override this and _load.
+        return _encode(value)
+
+    def _load(self, data):
+        return _decode(data)
+
+    def _discard(self, key):
+        path = self._index.pop(key, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        while len(self._index) > self.max_entries:
+            _, path = self._index.popitem(last=False)
+            path.unlink(missing_ok=True)
+
+
+class RecordReplayChatCompletionCache(ChatCompletionCache):
+    """
+    A ChatCompletionCache whose key also covers the model and sampling settings of the wrapped client.
+
+    In 'record' mode misses go to the wrapped client and are stored. In 'replay' mode a miss raises
+    CacheMissError, so a run either reproduces recorded traffic exactly or fails without calling the API.
+    A stream is stored once it has ended with its CreateResult; an entry without one counts as a miss.
+
+    Args:
+        client (ChatCompletionClient): The client to wrap.
+        store (CacheStore): Where responses are kept, usually a DiskLRUStore.
+        mode (str): 'record' or 'replay'.
+    """
+
+    def __init__(self, client, store, mode='record'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unsupported cache mode: {mode}")
+        super().__init__(client, store)
+        self.mode = mode
+        try:
+            config = client.dump_component().config
+        except Exception:
+            config = {}
+        self._key_args = {key: config[key] for key in SAMPLING_KEYS if config.get(key) is not None}
+
+    def _check_cache(self, messages, tools, json_output, extra_create_args):
+        # The key arguments only feed the hash; the wrapped client still receives extra_create_args unchanged.
+        cached_result, cache_key = super()._check_cache(
+            messages, tools, json_output, {**self._key_args, **extra_create_args}
+        )
+        if not _is_complete(cached_result):
+            # A stream recorded by an interrupted run is a miss, not a response
+            cached_result = None
+        if cached_result is None and self.mode == 'replay':
+            raise CacheMissError(f"No recorded response for request {cache_key[:12]} in replay mode.")
+        return cached_result, cache_key
+
+    def create_stream(self, messages, *, tools=[], json_output=None, extra_create_args={}, cancellation_token=None):
+        async def _generator():
+            cached_result, cache_key = self._check_cache(messages, tools, json_output, extra_create_args)
+            if cached_result is not None:
+                for result in cached_result:
+                    if isinstance(result, CreateResult):
+                        result.cached = True
+                    yield result
+                return
+
+            results = []
+            async for result in self.client.create_stream(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            ):
+                results.append(result)
+                yield result
+            # Stored only once the stream is complete, so an interrupted recording leaves nothing behind
+            self.store.set(cache_key, results)
+
+        return _generator()
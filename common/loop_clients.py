@@ -0,0 +1,110 @@
+import asyncio
+
+
+def running_loop():
+    """Returns the running event loop, or None when called outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _Entry:
+    def __init__(self, client):
+        self.client = client
+        self.loop = None
+        self.hook = None
+
+
+class LoopBoundRegistry:
+    """
+    Long-lived clients shared by the whole process (model clients, HTTP clients), one per key, each bound to the
+    event loop it was first used on.
+
+    A client is rebuilt when its loop has been closed, e.g. after an `asyncio.run` call returned, or when
+    `is_stale` says it can no longer be used. Its connections belong to that loop, so it is closed while the loop
+    still runs: binding a client registers an async generator on its loop, and the loop's shutdown of async
+    generators, which `asyncio.run` performs before closing the loop, closes the client. A client whose loop was
+    closed without that shutdown is closed on the current loop as far as still possible.
+
+    Args:
+        close (Callable[[object], Awaitable]): Closes a client, e.g. `lambda client: client.close()`.
+        name (str): What the clients are, for error messages.
+    """
+
+    def __init__(self, close, name='client'):
+        self._close = close
+        self._name = name
+        self._entries = {}
+        self._closing = set()
+
+    def get(self, key, create, is_stale=None):
+        """
+        Returns the client registered under `key`, creating it with `create()` when there is none or it is stale.
+
+        Args:
+            key (Hashable): e.g. (provider, model).
+            create (Callable[[], object]): Builds a new client.
+            is_stale (Callable[[object], bool] | None): Whether a registered client can no longer be used.
+
+        Returns:
+            object: The shared client.
+        """
+        loop = running_loop()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if (entry.loop is None or not entry.loop.is_closed()) and not (is_stale and is_stale(entry.client)):
+                if entry.loop is None:
+                    self._bind(key, entry, loop)
+                return entry.client
+            del self._entries[key]
+            self._close_late(entry, loop)
+
+        entry = _Entry(create())
+        self._entries[key] = entry
+        self._bind(key, entry, loop)
+        return entry.client
+
+    def _bind(self, key, entry, loop):
+        if loop is None:
+            return
+        entry.loop = loop
+        entry.hook = self._close_at_shutdown(key, entry)
+        # The first step registers the generator with the running loop and stops at its yield
+        try:
+            entry.hook.asend(None).send(None)
+        except StopIteration:
+            pass
+
+    async def _close_at_shutdown(self, key, entry):
+        try:
+            yield
+        finally:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+                await self._close_quietly(entry.client)
+
+    def _close_late(self, entry, loop):
+        # The client's loop is gone; closing it elsewhere releases what does not depend on that loop
+        if loop is None or (entry.loop is not None and not entry.loop.is_closed()):
+            return
+        task = loop.create_task(self._close_quietly(entry.client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_quietly(self, client):
+        try:
+            await self._close(client)
+        except Exception as e:
+            print(f"Failed to close {self._name}: {e}")
+
+    async def close_all(self):
+        """
+        Closes every registered client and empties the registry. Call this once at shutdown.
+        """
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            if entry.loop is not None and entry.loop.is_closed():
+                continue
+            await self._close_quietly(entry.client)
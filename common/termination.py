@@ -0,0 +1,188 @@
+import hashlib
+import re
+import time
+from pathlib import Path
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import StopMessage, TextMessage
+
+# Messages CodeExecutorAgent puts on a run that failed, printed nothing or had nothing to run.
+EXECUTION_ERROR_PATTERN = re.compile(r'The script ran, then exited with an error \(POSIX exit code: (-?\d+)\)')
+NO_OUTPUT_PATTERN = re.compile(r'The script ran but produced no output to console\. The POSIX exit code was: (-?\d+)')
+NO_CODE_PREFIX = 'No code blocks found'
+# Output of a run that exited cleanly but reports a failed test or a caught exception ('0 failed' is fine).
+TEST_FAILURE_PATTERN = re.compile(r'(?<!\b0 )\bfail(?:s|ed|ure|ures)?\b|Traceback \(most recent call last\)', re.IGNORECASE)
+CODE_BLOCK_PATTERN = re.compile(r'```[ \t]*(\w+)?[ \t]*\n(.*?)```', re.DOTALL)
+# Parts of an error line that change between otherwise identical failures.
+VOLATILE_PATTERN = re.compile(r'0x[0-9a-fA-F]+|line \d+|tmp_code_\w+')
+
+
+def exit_code(content):
+    """
+    Exit code of the run a CodeExecutorAgent message reports: parsed from its error and no-output messages,
+    0 for plain output, None when there was no code to run.
+    """
+    if content.startswith(NO_CODE_PREFIX):
+        return None
+    match = EXECUTION_ERROR_PATTERN.match(content) or NO_OUTPUT_PATTERN.match(content)
+    return int(match.group(1)) if match else 0
+
+
+def is_execution_error(content):
+    code = exit_code(content)
+    return code is not None and code != 0
+
+
+def is_successful_execution(content):
+    """True when the run exited with code 0 and its output shows no failed test."""
+    return exit_code(content) == 0 and TEST_FAILURE_PATTERN.search(content) is None
+
+
+def error_signature(content):
+    """
+    Returns the last non-empty line of a failed run's output, usually 'SomeError: message', with addresses,
+    line numbers and temp file names removed so the same failure always gives the same signature.
+    """
+    for line in reversed(content.splitlines()):
+        line = line.strip()
+        if line:
+            return VOLATILE_PATTERN.sub('_', line)
+    return ''
+
+
+class _MessageTermination(TerminationCondition):
+    """
+    Base for the conditions below: handles the terminated flag and the StopMessage, subclasses look at one
+    TextMessage at a time in `_check` and return the stop reason or None.
+    """
+
+    def __init__(self):
+        self._terminated = False
+
+    @property
+    def terminated(self):
+        return self._terminated
+
+    async def __call__(self, messages):
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if not isinstance(message, TextMessage):
+                continue
+            reason = self._check(message)
+            if reason:
+                self._terminated = True
+                return StopMessage(content=reason, source=type(self).__name__)
+        return None
+
+    def _check(self, message):
+        raise NotImplementedError
+
+    async def reset(self):
+        self._terminated = False
+
+
+class ArtifactWrittenTermination(_MessageTermination):
+    """
+    Stops once the code exited with code 0, its output shows no failed test and `filename` has been written in
+    `work_dir` during this run, e.g. the tests passed and solutions.py was saved. The agent's closing summary is
+    skipped.
+
+    Args:
+        work_dir (str | Path): The executor's work dir.
+        filename (str): File whose creation marks the work as done.
+        executor_source (str): Name of the code executor agent.
+    """
+
+    def __init__(self, work_dir, filename='solutions.py', executor_source='CodeExecutorAgent'):
+        super().__init__()
+        self._path = Path(work_dir) / filename
+        self._executor_source = executor_source
+        self._started_at = time.time()
+
+    def _check(self, message):
+        if message.source != self._executor_source or not is_successful_execution(message.content):
+            return None
+        # Allow for coarse file system timestamps.
+        if self._path.is_file() and self._path.stat().st_mtime >= self._started_at - 1:
+            return f"Code ran successfully and {self._path.name} was written"
+        return None
+
+    async def reset(self):
+        await super().reset()
+        self._started_at = time.time()
+
+
+class RepeatedErrorTermination(_MessageTermination):
+    """
+    Stops when the executor fails with the same error signature `max_repeats` times in a row.
+
+    Args:
+        max_repeats (int): Consecutive identical failures allowed.
+        executor_source (str): Name of the code executor agent.
+    """
+
+    def __init__(self, max_repeats=3, executor_source='CodeExecutorAgent'):
+        super().__init__()
+        if max_repeats < 1:
+            raise ValueError("max_repeats must be at least 1.")
+        self._max_repeats = max_repeats
+        self._executor_source = executor_source
+        self._last_signature = None
+        self._repeats = 0
+
+    def _check(self, message):
+        if message.source != self._executor_source:
+            return None
+        if not is_execution_error(message.content):
+            self._last_signature, self._repeats = None, 0
+            return None
+        signature = error_signature(message.content)
+        self._repeats = self._repeats + 1 if signature == self._last_signature else 1
+        self._last_signature = signature
+        if self._repeats >= self._max_repeats:
+            return f"Same error {self._repeats} times in a row: {signature}"
+        return None
+
+    async def reset(self):
+        await super().reset()
+        self._last_signature, self._repeats = None, 0
+
+
+class NoNewCodeTermination(_MessageTermination):
+    """
+    Stops when the agent has gone `max_turns` turns without sending a code block it has not sent before.
+    Resubmitting identical code counts as no new code.
+
+    Args:
+        max_turns (int): Turns without new code allowed.
+        agent_source (str): Name of the agent writing the code.
+    """
+
+    def __init__(self, max_turns=3, agent_source='ProblemSolverExpert'):
+        super().__init__()
+        if max_turns < 1:
+            raise ValueError("max_turns must be at least 1.")
+        self._max_turns = max_turns
+        self._agent_source = agent_source
+        self._seen = set()
+        self._idle_turns = 0
+
+    def _check(self, message):
+        if message.source != self._agent_source:
+            return None
+        digests = {hashlib.sha256(code.strip().encode()).hexdigest()
+                   for _, code in CODE_BLOCK_PATTERN.findall(message.content)}
+        if digests - self._seen:
+            self._seen |= digests
+            self._idle_turns = 0
+            return None
+        self._idle_turns += 1
+        if self._idle_turns >= self._max_turns:
+            return f"No new code for {self._idle_turns} turns"
+        return None
+
+    async def reset(self):
+        await super().reset()
+        self._seen = set()
+        self._idle_turns = 0